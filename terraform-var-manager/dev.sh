@@ -31,6 +31,9 @@ show_help() {
     echo "Commands:"
     echo "  install     Install all dependencies"
     echo "  test        Run tests with coverage"
+    echo "  bench       Run benchmarks against the saved baseline (--save to record)"
+    echo "  load        Run the load test against a local fake Terraform Cloud"
+    echo "  startup     Time CLI startup for --help and usage errors"
     echo "  lint        Run linting (placeholder)"
     echo "  build       Build the package"
     echo "  clean       Clean build artifacts"
@@ -55,6 +58,27 @@ case "${1:-help}" in
         print_success "Tests completed"
         ;;
     
+    bench)
+        print_header "Running Benchmarks"
+        shift
+        uv run python -m tests.benchmarks.run "$@"
+        print_success "Benchmarks completed"
+        ;;
+
+    load)
+        print_header "Running Load Test"
+        shift
+        uv run python -m tests.benchmarks.load "$@"
+        print_success "Load test completed"
+        ;;
+
+    startup)
+        print_header "Running Startup Benchmark"
+        shift
+        uv run python -m tests.benchmarks.startup "$@"
+        print_success "Startup benchmark completed"
+        ;;
+
     lint)
         print_header "Running Linting"
         echo "Linting configuration can be added here (ruff, black, etc.)"
@@ -3,25 +3,131 @@ Terraform Variables Manager
 
 A powerful tool to manage Terraform Cloud variables with advanced features
 like comparison, synchronization, and tagging.
+
+Public names are imported from their modules on first access, so importing
+the package (as the CLI does before parsing its arguments) does not load
+``requests`` or ``aiohttp``.
 """
+from __future__ import annotations
 
-from importlib.metadata import PackageNotFoundError, version
+import importlib
+from typing import TYPE_CHECKING, Any
 
-try:
-    __version__ = version("terraform-var-manager")
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
+if TYPE_CHECKING:
+    from .api_client import TerraformCloudClient
+    from .async_client import AsyncTerraformCloudClient
+    from .async_manager import AsyncVariableManager
+    from .cache import ParseCache, SnapshotCache
+    from .changeset import Changeset
+    from .deadline import Deadline, deadline_scope
+    from .exceptions import DeadlineExceeded, TerraformCloudError
+    from .ledger import FingerprintLedger
+    from .metrics import RequestEvent, RequestMetrics
+    from .operations import (
+        DeleteSummary,
+        DownloadSummary,
+        OperationResult,
+        UploadSummary,
+        VariableOperation,
+        apply_operations,
+    )
+    from .profiling import PhaseProfiler
+    from .rate_limit import RateLimiter
+    from .retry import RetryPolicy
+    from .tfvars import iter_tfvars, load_tfvars
+    from .utils import (
+        extract_group,
+        format_var_line,
+        group_and_format_vars_for_tfvars,
+        write_tfvars,
+    )
+    from .variable_manager import VariableManager
+    from .workspace_index import WorkspaceIndex
 
-from .api_client import TerraformCloudClient
-from .exceptions import TerraformCloudError
-from .utils import extract_group, format_var_line, group_and_format_vars_for_tfvars
-from .variable_manager import VariableManager
+# Public name -> module that defines it
+_EXPORTS = {
+    "AsyncTerraformCloudClient": "async_client",
+    "AsyncVariableManager": "async_manager",
+    "Changeset": "changeset",
+    "Deadline": "deadline",
+    "DeadlineExceeded": "exceptions",
+    "DeleteSummary": "operations",
+    "DownloadSummary": "operations",
+    "FingerprintLedger": "ledger",
+    "OperationResult": "operations",
+    "ParseCache": "cache",
+    "PhaseProfiler": "profiling",
+    "RateLimiter": "rate_limit",
+    "RequestEvent": "metrics",
+    "RequestMetrics": "metrics",
+    "RetryPolicy": "retry",
+    "SnapshotCache": "cache",
+    "TerraformCloudError": "exceptions",
+    "TerraformCloudClient": "api_client",
+    "UploadSummary": "operations",
+    "VariableManager": "variable_manager",
+    "VariableOperation": "operations",
+    "WorkspaceIndex": "workspace_index",
+    "apply_operations": "operations",
+    "deadline_scope": "deadline",
+    "extract_group": "utils",
+    "format_var_line": "utils",
+    "group_and_format_vars_for_tfvars": "utils",
+    "iter_tfvars": "tfvars",
+    "load_tfvars": "tfvars",
+    "write_tfvars": "utils",
+}
 
 __all__ = [
+    "AsyncTerraformCloudClient",
+    "AsyncVariableManager",
+    "Changeset",
+    "Deadline",
+    "DeadlineExceeded",
+    "DeleteSummary",
+    "DownloadSummary",
+    "FingerprintLedger",
+    "OperationResult",
+    "ParseCache",
+    "PhaseProfiler",
+    "RateLimiter",
+    "RequestEvent",
+    "RequestMetrics",
+    "RetryPolicy",
+    "SnapshotCache",
     "TerraformCloudError",
     "TerraformCloudClient",
+    "UploadSummary",
     "VariableManager",
+    "VariableOperation",
+    "WorkspaceIndex",
+    "apply_operations",
+    "deadline_scope",
     "extract_group",
     "format_var_line",
     "group_and_format_vars_for_tfvars",
+    "iter_tfvars",
+    "load_tfvars",
+    "write_tfvars",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            value: Any = version("terraform-var-manager")
+        except PackageNotFoundError:  # pragma: no cover
+            value = "unknown"
+    elif name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__, "__version__"])
@@ -6,62 +6,614 @@ from __future__ import annotations
 import json
 import logging
 import os
-from typing import Any
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Optional
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from .exceptions import TerraformCloudError
+from .cache import SnapshotCache
+from .deadline import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    Deadline,
+    current_deadline,
+    submit,
+)
+from .exceptions import DeadlineExceeded, TerraformCloudError
+from .metrics import RequestHook, _body_size, _emit, _RequestTrace
+from .rate_limit import DEFAULT_RATE_LIMIT, RateLimiter, retry_after_seconds
+from .retry import RetryPolicy, RetryStats
+from .workspace_index import WorkspaceIndex
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_RATE_LIMIT_RETRIES = 5
+DEFAULT_RETRY_AFTER = 1.0
+VARSET_PREFIX = "varset-"
+
+# A request for one page of results: the URL and its query parameters.
+_PageRequest = tuple[str, Optional[dict[str, Any]]]
+
+
+def _next_page_request(
+    body: dict[str, Any], url: str, params: dict[str, Any] | None
+) -> _PageRequest | None:
+    """Work out the request for the page after ``body``, if there is one.
+
+    Prefers the JSON:API ``links.next`` URL and falls back to
+    ``meta.pagination.next-page`` with the current page size.
+    """
+    next_link = (body.get("links") or {}).get("next")
+    if next_link:
+        return next_link, None
+
+    pagination = (body.get("meta") or {}).get("pagination") or {}
+    next_page = pagination.get("next-page")
+    if next_page and params is not None:
+        base_url = url.split("?", 1)[0]
+        return base_url, {**params, "page[number]": next_page}
+    return None
+
+
+def _variables_url(base_url: str, owner_id: str, variable_id: str = "") -> str:
+    """URL of the variables of a workspace or, for ``varset-`` IDs, a variable set.
+
+    Both collections hold the same ``vars`` resources, so every variable
+    operation works on either owner.
+    """
+    if owner_id.startswith(VARSET_PREFIX):
+        url = f"{base_url}/varsets/{owner_id}/relationships/vars"
+        return f"{url}/{variable_id}" if variable_id else url
+    return f"{base_url}/workspaces/{owner_id}/vars/{variable_id}"
+
+
+def load_credentials_token() -> str:
+    """Load the app.terraform.io token from the Terraform CLI credentials file."""
+    try:
+        token_path = os.path.expanduser("~/.terraform.d/credentials.tfrc.json")
+        with open(token_path) as file:
+            token: str = json.load(file)["credentials"]["app.terraform.io"]["token"]
+        return token
+    except Exception as e:
+        raise TerraformCloudError(f"Error loading credentials: {e}")
+
 
 class TerraformCloudClient:
-    """Client for interacting with Terraform Cloud API."""
+    """Client for interacting with Terraform Cloud API.
+
+    The client owns a connection-pooled ``requests.Session`` so that every call
+    reuses warm keep-alive connections instead of paying a new TCP+TLS
+    handshake. Use it as a context manager (or call :meth:`close`) to release
+    the pool when done.
+
+    Requests are paced by a token-bucket :class:`RateLimiter` (30 requests per
+    second by default, matching Terraform Cloud's per-token limit). Pass
+    ``rate_limit=None`` to disable pacing, or share one ``rate_limiter`` between
+    clients that use the same token.
+
+    Transient failures are retried with exponential backoff and jitter as
+    described by ``retry_policy``; per-attempt statistics are kept in
+    ``retry_stats``.
+
+    With a :class:`SnapshotCache`, ``get_variables`` / ``iter_variables``
+    results are served from disk while fresh (unless ``use_cache=False``,
+    which callers about to write pass to list the live variables), and every
+    write through this client invalidates the snapshot of the workspace it
+    touched.
+
+    Every variable method also accepts a variable set ID (``varset-...``) in
+    place of a workspace ID, and :meth:`attach_varset` / :meth:`detach_varset`
+    apply a variable set to many workspaces at once.
+
+    With a :class:`WorkspaceIndex`, :meth:`resolve_workspace` turns
+    ``organization/name`` references into workspace IDs without any request
+    once the organization has been listed. When a workspace ID answered by
+    the index turns out not to exist (the workspace was deleted or
+    recreated), the entry is dropped and the name resolved once more, and
+    the error names the workspace's current ID.
+
+    Every call is reported to each of ``hooks`` as a :class:`RequestEvent`
+    (method, endpoint template, status, latency, bytes, retries and rate
+    limit waits); see :class:`RequestMetrics` for a ready-made aggregator.
+
+    Every attempt gives up after ``connect_timeout`` seconds without a
+    connection or ``read_timeout`` seconds without data from the server
+    (None waits forever). Under a deadline (see :func:`deadline_scope`),
+    typically set by a :class:`VariableManager` for the length of one
+    operation, no request is started, retried or rate limited past it,
+    timeouts are shortened to the time left, and a request cut short by it
+    raises :class:`DeadlineExceeded`. The deadline belongs to the calling
+    context, not to the client, so a client can be shared by operations
+    with different deadlines.
+
+    Without a ``token``, the credentials file is read on first use (the
+    first request, or accessing :attr:`token` / :attr:`headers`), not when
+    the client is created.
+    """
 
     def __init__(
         self,
         token: str | None = None,
         base_url: str = "https://app.terraform.io/api/v2",
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        session: requests.Session | None = None,
+        rate_limit: float | None = DEFAULT_RATE_LIMIT,
+        rate_limiter: RateLimiter | None = None,
+        max_rate_limit_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+        retry_policy: RetryPolicy | None = None,
+        cache: SnapshotCache | None = None,
+        workspace_index: WorkspaceIndex | None = None,
+        hooks: Iterable[RequestHook] | None = None,
+        connect_timeout: float | None = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float | None = DEFAULT_READ_TIMEOUT,
     ) -> None:
-        """Initialize the client with authentication token."""
+        """Initialize the client with authentication token and HTTP session."""
         self.base_url = base_url
-        self.token = token or self._load_token()
-        self.headers = {
-            "Content-Type": "application/vnd.api+json",
-            "Authorization": f"Bearer {self.token}",
-        }
+        self._token = token or None
+        self._headers: dict[str, str] | None = None
+        self.keep_alive = keep_alive
+        self.pool_size = pool_size
+        self.session = session or self._create_session(pool_size)
+        self.rate_limiter = rate_limiter or (
+            RateLimiter(rate_limit) if rate_limit else None
+        )
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self.cache = cache
+        self.cache_host = urlsplit(base_url).netloc or base_url
+        # Bumped by every write so that a fetch overlapping a write to the same
+        # workspace does not store a snapshot that may predate the write.
+        self._cache_generations: dict[str, int] = {}
+        self._cache_lock = threading.Lock()
+        self.workspace_index = workspace_index
+        # Workspace ID -> (organization, name), for IDs answered by the index.
+        self._indexed_workspaces: dict[str, tuple[str, str]] = {}
+        self.hooks: list[RequestHook] = list(hooks or ())
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    def __enter__(self) -> TerraformCloudClient:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """Create a session whose HTTPS pool can hold ``pool_size`` connections."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self) -> None:
+        """Close the underlying session and its pooled connections."""
+        self.session.close()
 
     def _load_token(self) -> str:
         """Load token from credentials file."""
+        return load_credentials_token()
+
+    @property
+    def token(self) -> str:
+        """The API token, loaded from the credentials file on first access."""
+        if self._token is None:
+            self._token = self._load_token()
+        return self._token
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Headers sent with every request."""
+        if self._headers is None:
+            headers = {
+                "Content-Type": "application/vnd.api+json",
+                "Authorization": f"Bearer {self.token}",
+            }
+            if not self.keep_alive:
+                headers["Connection"] = "close"
+            self._headers = headers
+        return self._headers
+
+    @property
+    def rate_budget(self) -> float | None:
+        """Requests that can be sent right now without waiting, if rate limited."""
+        return self.rate_limiter.available if self.rate_limiter else None
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a rate-limited request through the pooled session, with retries.
+
+        A 429 response pauses the shared limiter for ``Retry-After`` seconds
+        and the request is sent again, up to ``max_rate_limit_retries`` times.
+        Transient failures (5xx, connection errors, timeouts) are retried as
+        allowed by ``retry_policy`` and the current deadline. Every attempt is
+        recorded in ``retry_stats``, and the outcome is reported to ``hooks``.
+        """
+        trace = _RequestTrace(method, url)
         try:
-            token_path = os.path.expanduser("~/.terraform.d/credentials.tfrc.json")
-            with open(token_path) as file:
-                token: str = json.load(file)["credentials"]["app.terraform.io"]["token"]
-            return token
+            response = self._send(trace, **kwargs)
         except Exception as e:
-            raise TerraformCloudError(f"Error loading credentials: {e}")
+            if self.hooks:
+                _emit(self.hooks, trace.event(self.base_url, e))
+            raise
+        if self.hooks:
+            _emit(self.hooks, trace.event(self.base_url))
+        return response
+
+    def _send(self, trace: _RequestTrace, **kwargs: Any) -> requests.Response:
+        """The retry loop of :meth:`_request`, filling in ``trace``."""
+        method, url = trace.method, trace.url
+        # Loads the token, if needed, before any rate limit budget is spent.
+        headers = self.headers
+        policy = self.retry_policy
+        deadline = current_deadline()
+        started = time.monotonic()
+        attempt = 0
+        throttled = 0
+        while True:
+            attempt += 1
+            trace.attempts = attempt
+            trace.status = None
+            try:
+                if deadline is not None:
+                    deadline.check(f"{method} {url}")
+                if self.rate_limiter:
+                    trace.rate_limit_wait += self._acquire(deadline, f"{method} {url}")
+                    if deadline is not None:
+                        # The wait may have used up the rest of the deadline.
+                        deadline.check(f"{method} {url}")
+                timeout = self._timeout(deadline, f"{method} {url}")
+            except DeadlineExceeded as e:
+                # Only an earlier attempt can have reached the server.
+                e.sent = attempt > 1
+                raise
+            try:
+                response = self.session.request(
+                    method, url, headers=headers, timeout=timeout, **kwargs
+                )
+            except requests.RequestException as e:
+                outcome = type(e).__name__
+                delay = policy.backoff(attempt)
+                if not policy.retries_error(method, e) or not self._can_retry(
+                    attempt, started, delay, deadline
+                ):
+                    self.retry_stats.record(method, url, attempt, outcome, gave_up=True)
+                    if deadline is not None and deadline.expired:
+                        raise deadline.error(f"{method} {url}: {e}") from e
+                    raise
+                self._wait_before_retry(method, url, attempt, outcome, delay)
+                continue
+
+            if self.rate_limiter:
+                self.rate_limiter.observe(response.headers)
+            status = response.status_code
+            trace.status = status
+            if self.hooks:
+                trace.bytes_sent += _body_size(getattr(response.request, "body", None))
+                trace.bytes_received += _body_size(response.content)
+
+            if status == 429 and throttled < self.max_rate_limit_retries:
+                throttled += 1
+                delay = retry_after_seconds(response.headers) or DEFAULT_RETRY_AFTER
+                # 429s have their own retry budget; only the deadline applies.
+                if self._can_retry(0, started, delay, deadline):
+                    self.retry_stats.record(method, url, attempt, "429", delay)
+                    logger.warning(
+                        f"Rate limited on {method} {url}, retrying in {delay:.2f}s "
+                        f"({throttled}/{self.max_rate_limit_retries})"
+                    )
+                    if self.rate_limiter:
+                        self.rate_limiter.pause(delay)
+                    else:
+                        trace.rate_limit_wait += delay
+                        time.sleep(delay)
+                    continue
+
+            if policy.retries_status(method, status):
+                delay = policy.backoff(attempt)
+                if self._can_retry(attempt, started, delay, deadline):
+                    self._wait_before_retry(method, url, attempt, str(status), delay)
+                    continue
+
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                self.retry_stats.record(method, url, attempt, str(status), gave_up=True)
+                raise
+            self.retry_stats.record(method, url, attempt, "ok")
+            return response
+
+    def _acquire(self, deadline: Deadline | None, what: str) -> float:
+        """Wait for the rate limiter, but not past the deadline."""
+        assert self.rate_limiter is not None
+        if deadline is None:
+            return self.rate_limiter.acquire()
+        try:
+            return self.rate_limiter.acquire(timeout=deadline.remaining())
+        except TimeoutError as e:
+            raise deadline.error(f"{what}: {e}") from e
+
+    def _timeout(
+        self, deadline: Deadline | None, what: str
+    ) -> tuple[float | None, float | None]:
+        """The (connect, read) timeouts of the next attempt.
 
-    def get_variables(self, workspace_id: str) -> list[dict[str, Any]]:
-        """Get all variables from a workspace."""
+        Raises :class:`DeadlineExceeded` when no time is left, e.g. after the
+        rate limit wait used it up, since requests rejects zero timeouts.
+        """
+        if deadline is None:
+            return self.connect_timeout, self.read_timeout
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise deadline.error(what)
+        connect, read = self.connect_timeout, self.read_timeout
+        return (
+            remaining if connect is None else min(connect, remaining),
+            remaining if read is None else min(read, remaining),
+        )
+
+    def _can_retry(
+        self, attempt: int, started: float, delay: float, deadline: Deadline | None
+    ) -> bool:
+        """Whether another attempt fits in the attempt cap and the deadlines."""
+        policy = self.retry_policy
+        if attempt >= policy.max_attempts:
+            return False
+        if deadline is not None and delay >= deadline.remaining():
+            return False
+        if policy.deadline is None:
+            return True
+        return time.monotonic() - started + delay < policy.deadline
+
+    def _wait_before_retry(
+        self, method: str, url: str, attempt: int, outcome: str, delay: float
+    ) -> None:
+        self.retry_stats.record(method, url, attempt, outcome, delay)
+        logger.warning(
+            f"{method} {url} failed ({outcome}), retrying in {delay:.2f}s "
+            f"(attempt {attempt}/{self.retry_policy.max_attempts})"
+        )
+        time.sleep(delay)
+
+    def get_variables(
+        self, workspace_id: str, use_cache: bool = True
+    ) -> list[dict[str, Any]]:
+        """Get all variables from a workspace, following every page."""
+        return list(self.iter_variables(workspace_id, use_cache=use_cache))
+
+    def iter_variables(
+        self,
+        workspace_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+        use_cache: bool = True,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the variables of a workspace one at a time.
+
+        Pages are requested lazily and the JSON:API ``links.next`` /
+        ``meta.pagination`` fields are followed until the last page, so only
+        one page (two with ``prefetch``) is held in memory at a time. With
+        ``prefetch`` enabled the next page is fetched in the background while
+        the caller consumes the current one.
+
+        With a ``cache``, a fresh snapshot is yielded without any request;
+        otherwise the fetched variables are kept and stored as the new
+        snapshot once the last page has been consumed. ``use_cache=False``
+        always lists the live variables (still refreshing the snapshot), as
+        plans and deletes must: a snapshot may be up to ``ttl`` seconds old.
+        """
+        if self.cache is None:
+            yield from self._iter_remote_variables(workspace_id, page_size, prefetch)
+            return
+
+        cached = self.cache.get(self.cache_host, workspace_id) if use_cache else None
+        if cached is not None:
+            yield from cached
+            return
+
+        generation = self._cache_generation(workspace_id)
+        fetched: list[dict[str, Any]] = []
+        for var in self._iter_remote_variables(workspace_id, page_size, prefetch):
+            fetched.append(var)
+            yield var
+        if self._cache_generation(workspace_id) == generation:
+            self.cache.put(self.cache_host, workspace_id, fetched)
+
+    def _iter_remote_variables(
+        self, workspace_id: str, page_size: int, prefetch: bool
+    ) -> Iterator[dict[str, Any]]:
+        """Yield a workspace's variables from the API, page by page."""
+        url = _variables_url(self.base_url, workspace_id)
+        return self._iter_pages(url, page_size, prefetch, "variables")
+
+    def iter_workspaces(
+        self,
+        organization: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the workspaces of an organization one at a time, page by page."""
+        url = f"{self.base_url}/organizations/{organization}/workspaces"
+        return self._iter_pages(url, page_size, prefetch, "workspaces")
+
+    def resolve_workspace(self, reference: str) -> str:
+        """Return the ID of a workspace given as an ID or as ``organization/name``.
+
+        IDs are returned unchanged. Names are looked up in the workspace index:
+        a fresh index answers without any request, a name missing from it is
+        fetched on its own and added, and a stale or missing index is rebuilt
+        from a full listing of the organization. Without an index every name
+        costs one request.
+        """
+        organization, slash, name = reference.partition("/")
+        if not slash:
+            return reference
+        if not organization or not name or "/" in name:
+            raise TerraformCloudError(f"Invalid workspace reference: {reference!r}")
+
+        index = self.workspace_index
+        workspace_id: str | None
+        if index is None:
+            workspace_id = self._find_workspace(organization, name)
+        elif index.is_fresh(self.cache_host, organization):
+            workspace_id = index.lookup(self.cache_host, organization, name)
+            if workspace_id is not None:
+                self._indexed_workspaces[workspace_id] = (organization, name)
+            else:
+                workspace_id = self._find_workspace(organization, name)
+                if workspace_id is not None:
+                    index.add(self.cache_host, organization, name, workspace_id)
+        else:
+            logger.info(f"Indexing the workspaces of organization {organization}")
+            workspaces = {
+                ws["attributes"]["name"]: ws["id"]
+                for ws in self.iter_workspaces(organization)
+            }
+            index.replace(self.cache_host, organization, workspaces)
+            workspace_id = workspaces.get(name)
+
+        if workspace_id is None:
+            raise TerraformCloudError(f"Workspace not found: {reference}")
+        return workspace_id
+
+    def _failure(
+        self, what: str, url: str, e: requests.RequestException
+    ) -> TerraformCloudError:
+        """The error for a failed call, correcting the workspace index on a 404.
+
+        A 404 for a workspace whose ID came from the index means the index is
+        out of date: the entry is dropped and the name resolved once more, so
+        the next resolution is right and the error can name the current ID.
+        """
+        message = f"Failed to {what}: {e}"
+        response = getattr(e, "response", None)
+        prefix = f"{self.base_url}/workspaces/"
+        if (
+            response is None
+            or response.status_code != 404
+            or not url.startswith(prefix)
+        ):
+            return TerraformCloudError(message)
+        workspace_id = url[len(prefix) :].split("/", 1)[0]
+        indexed = self._indexed_workspaces.pop(workspace_id, None)
+        if indexed is None or self.workspace_index is None:
+            return TerraformCloudError(message)
+
+        organization, name = indexed
+        self.workspace_index.forget(self.cache_host, organization, name)
+        try:
+            current = self._find_workspace(organization, name)
+        except TerraformCloudError as lookup_error:
+            logger.warning(f"Could not resolve {organization}/{name}: {lookup_error}")
+            return TerraformCloudError(message)
+        if current is None:
+            return TerraformCloudError(
+                f"{message} (workspace {organization}/{name} no longer exists)"
+            )
+        self.workspace_index.add(self.cache_host, organization, name, current)
+        if current == workspace_id:
+            return TerraformCloudError(message)
+        return TerraformCloudError(
+            f"{message} (workspace {organization}/{name} is now {current}; "
+            f"the workspace index had {workspace_id})"
+        )
+
+    def _find_workspace(self, organization: str, name: str) -> str | None:
+        """Look up one workspace by name; None if the organization has none."""
+        url = f"{self.base_url}/organizations/{organization}/workspaces/{name}"
         try:
-            url = f"{self.base_url}/workspaces/{workspace_id}/vars/"
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()["data"]  # type: ignore[no-any-return]
+            body: dict[str, Any] = self._request("GET", url).json()
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise TerraformCloudError(f"Failed to get workspace: {e}")
         except requests.RequestException as e:
-            raise TerraformCloudError(f"Failed to get variables: {e}")
+            raise TerraformCloudError(f"Failed to get workspace: {e}")
+        workspace_id: str = body["data"]["id"]
+        return workspace_id
+
+    def _iter_pages(
+        self, url: str, page_size: int, prefetch: bool, what: str
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the items of a paginated collection, optionally prefetching."""
+        first: _PageRequest = (url, {"page[number]": 1, "page[size]": page_size})
+
+        if not prefetch:
+            page_request: _PageRequest | None = first
+            while page_request is not None:
+                data, page_request = self._get_page(*page_request, what)
+                yield from data
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future: Future[tuple[list[dict[str, Any]], _PageRequest | None]] | None
+            future = submit(executor, self._get_page, *first, what)
+            while future is not None:
+                data, page_request = future.result()
+                future = (
+                    submit(executor, self._get_page, *page_request, what)
+                    if page_request is not None
+                    else None
+                )
+                yield from data
+
+    def _cache_generation(self, workspace_id: str) -> int:
+        with self._cache_lock:
+            return self._cache_generations.get(workspace_id, 0)
+
+    def invalidate_cache(self, workspace_id: str) -> None:
+        """Forget the cached snapshot of a workspace, if there is a cache.
+
+        Called for every write; call it directly to force the next listing of
+        the workspace to come from the API.
+        """
+        if self.cache is None:
+            return
+        with self._cache_lock:
+            self._cache_generations[workspace_id] = (
+                self._cache_generations.get(workspace_id, 0) + 1
+            )
+        self.cache.invalidate(self.cache_host, workspace_id)
+
+    def _get_page(
+        self, url: str, params: dict[str, Any] | None, what: str = "variables"
+    ) -> tuple[list[dict[str, Any]], _PageRequest | None]:
+        """Fetch one page of a collection and work out the request for the next."""
+        try:
+            body: dict[str, Any] = self._request("GET", url, params=params).json()
+        except requests.RequestException as e:
+            raise self._failure(f"get {what}", url, e)
+
+        data: list[dict[str, Any]] = body["data"]
+        return data, _next_page_request(body, url, params)
 
     def create_variable(
         self, workspace_id: str, variable_data: dict[str, Any]
     ) -> dict[str, Any]:
         """Create a new variable in a workspace."""
         try:
-            url = f"{self.base_url}/workspaces/{workspace_id}/vars/"
-            response = requests.post(url, headers=self.headers, json=variable_data)
-            response.raise_for_status()
+            url = _variables_url(self.base_url, workspace_id)
+            response = self._request("POST", url, json=variable_data)
             return response.json()  # type: ignore[no-any-return]
         except requests.RequestException as e:
-            raise TerraformCloudError(f"Failed to create variable: {e}")
+            raise self._failure("create variable", url, e)
+        finally:
+            self.invalidate_cache(workspace_id)
 
     def update_variable(
         self,
@@ -71,19 +623,39 @@ class TerraformCloudClient:
     ) -> dict[str, Any]:
         """Update an existing variable."""
         try:
-            url = f"{self.base_url}/workspaces/{workspace_id}/vars/{variable_id}"
-            response = requests.patch(url, headers=self.headers, json=variable_data)
-            response.raise_for_status()
+            url = _variables_url(self.base_url, workspace_id, variable_id)
+            response = self._request("PATCH", url, json=variable_data)
             return response.json()  # type: ignore[no-any-return]
         except requests.RequestException as e:
-            raise TerraformCloudError(f"Failed to update variable: {e}")
+            raise self._failure("update variable", url, e)
+        finally:
+            self.invalidate_cache(workspace_id)
 
     def delete_variable(self, workspace_id: str, variable_id: str) -> bool:
         """Delete a variable from a workspace."""
         try:
-            url = f"{self.base_url}/workspaces/{workspace_id}/vars/{variable_id}"
-            response = requests.delete(url, headers=self.headers)
-            response.raise_for_status()
+            url = _variables_url(self.base_url, workspace_id, variable_id)
+            response = self._request("DELETE", url)
             return response.status_code == 204
         except requests.RequestException as e:
-            raise TerraformCloudError(f"Failed to delete variable: {e}")
+            raise self._failure("delete variable", url, e)
+        finally:
+            self.invalidate_cache(workspace_id)
+
+    def attach_varset(self, varset_id: str, workspace_ids: list[str]) -> None:
+        """Apply a variable set to many workspaces with a single request."""
+        self._varset_workspaces("POST", varset_id, workspace_ids, "attach")
+
+    def detach_varset(self, varset_id: str, workspace_ids: list[str]) -> None:
+        """Remove a variable set from many workspaces with a single request."""
+        self._varset_workspaces("DELETE", varset_id, workspace_ids, "detach")
+
+    def _varset_workspaces(
+        self, method: str, varset_id: str, workspace_ids: list[str], verb: str
+    ) -> None:
+        url = f"{self.base_url}/varsets/{varset_id}/relationships/workspaces"
+        body = {"data": [{"type": "workspaces", "id": ws} for ws in workspace_ids]}
+        try:
+            self._request(method, url, json=body)
+        except requests.RequestException as e:
+            raise TerraformCloudError(f"Failed to {verb} variable set: {e}")
@@ -0,0 +1,356 @@
+"""
+Asynchronous Terraform Cloud API client for managing variables.
+
+Requires the optional ``aiohttp`` dependency
+(``pip install "terraform-var-manager[async]"``).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Iterable
+from types import TracebackType
+from typing import Any
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised only without the extra
+    aiohttp = None  # type: ignore[assignment]
+
+from .api_client import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_RATE_LIMIT_RETRIES,
+    DEFAULT_RETRY_AFTER,
+    _next_page_request,
+    _PageRequest,
+    _variables_url,
+    load_credentials_token,
+)
+from .deadline import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from .exceptions import TerraformCloudError
+from .metrics import RequestHook, _emit, _RequestTrace
+from .rate_limit import DEFAULT_RATE_LIMIT, RateLimiter, retry_after_seconds
+from .retry import RetryPolicy, RetryStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ASYNC_CONCURRENCY = 50
+
+
+class AsyncTerraformCloudClient:
+    """asyncio client for the Terraform Cloud variables API.
+
+    Offers the same operations as :class:`TerraformCloudClient`. At most
+    ``concurrency`` requests are in flight at once across every coroutine
+    using the client, so one client can drive many workspaces from a single
+    event loop. Rate limiting and retries follow the same
+    :class:`RateLimiter` and :class:`RetryPolicy` as the blocking client,
+    and every call is reported to ``hooks`` in the same way. As there, a
+    missing ``token`` is loaded from the credentials file on first use, and
+    each attempt gives up after ``connect_timeout`` / ``read_timeout``
+    seconds; wrap calls in :func:`asyncio.wait_for` for an overall deadline.
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        base_url: str = "https://app.terraform.io/api/v2",
+        concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+        session: aiohttp.ClientSession | None = None,
+        rate_limit: float | None = DEFAULT_RATE_LIMIT,
+        rate_limiter: RateLimiter | None = None,
+        max_rate_limit_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+        retry_policy: RetryPolicy | None = None,
+        hooks: Iterable[RequestHook] | None = None,
+        connect_timeout: float | None = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float | None = DEFAULT_READ_TIMEOUT,
+    ) -> None:
+        """Initialize the client; the HTTP session is opened on first use."""
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncTerraformCloudClient requires aiohttp: "
+                'pip install "terraform-var-manager[async]"'
+            )
+        self.base_url = base_url
+        self._token = token or None
+        self._headers: dict[str, str] | None = None
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = rate_limiter or (
+            RateLimiter(rate_limit) if rate_limit else None
+        )
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self.hooks: list[RequestHook] = list(hooks or ())
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        self._session = session
+        # Created lazily so they bind to the event loop that uses them.
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @property
+    def token(self) -> str:
+        """The API token, loaded from the credentials file on first access."""
+        if self._token is None:
+            self._token = load_credentials_token()
+        return self._token
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Headers sent with every request."""
+        if self._headers is None:
+            self._headers = {
+                "Content-Type": "application/vnd.api+json",
+                "Authorization": f"Bearer {self.token}",
+            }
+        return self._headers
+
+    async def __aenter__(self) -> AsyncTerraformCloudClient:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> tuple[int, Any]:
+        """Send a rate-limited request with retries; return (status, JSON body).
+
+        Mirrors :meth:`TerraformCloudClient._request`: 429s wait for
+        ``Retry-After``, transient failures are retried per ``retry_policy``,
+        and other HTTP errors raise ``aiohttp.ClientResponseError``.
+        """
+        trace = _RequestTrace(method, url)
+        try:
+            result = await self._send(trace, **kwargs)
+        except Exception as e:
+            if self.hooks:
+                _emit(self.hooks, trace.event(self.base_url, e))
+            raise
+        if self.hooks:
+            _emit(self.hooks, trace.event(self.base_url))
+        return result
+
+    async def _send(self, trace: _RequestTrace, **kwargs: Any) -> tuple[int, Any]:
+        """The retry loop of :meth:`_request`, filling in ``trace``."""
+        method, url = trace.method, trace.url
+        # Loads the token, if needed, before any rate limit budget is spent.
+        request_headers = self.headers
+        policy = self.retry_policy
+        started = time.monotonic()
+        attempt = 0
+        throttled = 0
+        sent = 0
+        if self.hooks and "json" in kwargs:
+            sent = len(json.dumps(kwargs["json"]).encode())
+        while True:
+            attempt += 1
+            trace.attempts = attempt
+            trace.status = None
+            if self.rate_limiter:
+                wait = self.rate_limiter.reserve()
+                trace.rate_limit_wait += wait
+                await asyncio.sleep(wait)
+            try:
+                async with self._get_semaphore():
+                    async with self._get_session().request(
+                        method,
+                        url,
+                        headers=request_headers,
+                        timeout=self._timeout,
+                        **kwargs,
+                    ) as response:
+                        status = response.status
+                        headers = response.headers
+                        trace.status = status
+                        trace.bytes_sent += sent
+                        trace.bytes_received += response.content_length or 0
+                        body = (
+                            await response.json(content_type=None)
+                            if status < 400 and status != 204
+                            else None
+                        )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                outcome = type(e).__name__
+                delay = policy.backoff(attempt)
+                if not self._retries_error(method, e) or not self._can_retry(
+                    attempt, started, delay
+                ):
+                    self.retry_stats.record(method, url, attempt, outcome, gave_up=True)
+                    raise
+                await self._wait_before_retry(method, url, attempt, outcome, delay)
+                continue
+
+            if self.rate_limiter:
+                self.rate_limiter.observe(headers)
+
+            if status == 429 and throttled < self.max_rate_limit_retries:
+                throttled += 1
+                delay = retry_after_seconds(headers) or DEFAULT_RETRY_AFTER
+                # 429s have their own retry budget; only the deadline applies.
+                if self._can_retry(0, started, delay):
+                    self.retry_stats.record(method, url, attempt, "429", delay)
+                    logger.warning(
+                        f"Rate limited on {method} {url}, retrying in {delay:.2f}s "
+                        f"({throttled}/{self.max_rate_limit_retries})"
+                    )
+                    if self.rate_limiter:
+                        self.rate_limiter.pause(delay)
+                    else:
+                        trace.rate_limit_wait += delay
+                        await asyncio.sleep(delay)
+                    continue
+
+            if policy.retries_status(method, status):
+                delay = policy.backoff(attempt)
+                if self._can_retry(attempt, started, delay):
+                    await self._wait_before_retry(
+                        method, url, attempt, str(status), delay
+                    )
+                    continue
+
+            if status >= 400:
+                self.retry_stats.record(method, url, attempt, str(status), gave_up=True)
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=status,
+                    message=response.reason or "",
+                    headers=headers,
+                )
+            self.retry_stats.record(method, url, attempt, "ok")
+            return status, body
+
+    def _retries_error(self, method: str, error: BaseException) -> bool:
+        """Async counterpart of :meth:`RetryPolicy.retries_error`."""
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return True  # the connection was never made
+        return self.retry_policy.retries_method(method)
+
+    def _can_retry(self, attempt: int, started: float, delay: float) -> bool:
+        """Whether another attempt fits in the attempt cap and the deadline."""
+        policy = self.retry_policy
+        if attempt >= policy.max_attempts:
+            return False
+        if policy.deadline is None:
+            return True
+        return time.monotonic() - started + delay < policy.deadline
+
+    async def _wait_before_retry(
+        self, method: str, url: str, attempt: int, outcome: str, delay: float
+    ) -> None:
+        self.retry_stats.record(method, url, attempt, outcome, delay)
+        logger.warning(
+            f"{method} {url} failed ({outcome}), retrying in {delay:.2f}s "
+            f"(attempt {attempt}/{self.retry_policy.max_attempts})"
+        )
+        await asyncio.sleep(delay)
+
+    async def get_variables(self, workspace_id: str) -> list[dict[str, Any]]:
+        """Get all variables from a workspace, following every page."""
+        return [var async for var in self.iter_variables(workspace_id)]
+
+    async def iter_variables(
+        self,
+        workspace_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield the variables of a workspace one at a time, page by page.
+
+        With ``prefetch`` enabled the next page is requested as a background
+        task while the caller consumes the current one.
+        """
+        url = _variables_url(self.base_url, workspace_id)
+        first: _PageRequest = (url, {"page[number]": 1, "page[size]": page_size})
+        next_task: asyncio.Task[Any] | None = None
+        try:
+            data, page_request = await self._get_variables_page(*first)
+            while True:
+                if prefetch and page_request is not None:
+                    next_task = asyncio.ensure_future(
+                        self._get_variables_page(*page_request)
+                    )
+                for var in data:
+                    yield var
+                if page_request is None:
+                    return
+                if next_task is not None:
+                    data, page_request = await next_task
+                    next_task = None
+                else:
+                    data, page_request = await self._get_variables_page(*page_request)
+        finally:
+            if next_task is not None:
+                next_task.cancel()
+
+    async def _get_variables_page(
+        self, url: str, params: dict[str, Any] | None
+    ) -> tuple[list[dict[str, Any]], _PageRequest | None]:
+        """Fetch one page of variables and work out the request for the next one."""
+        try:
+            _, body = await self._request("GET", url, params=params)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TerraformCloudError(f"Failed to get variables: {e}")
+
+        data: list[dict[str, Any]] = body["data"]
+        return data, _next_page_request(body, url, params)
+
+    async def create_variable(
+        self, workspace_id: str, variable_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Create a new variable in a workspace."""
+        try:
+            url = _variables_url(self.base_url, workspace_id)
+            _, body = await self._request("POST", url, json=variable_data)
+            return body  # type: ignore[no-any-return]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TerraformCloudError(f"Failed to create variable: {e}")
+
+    async def update_variable(
+        self,
+        workspace_id: str,
+        variable_id: str,
+        variable_data: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Update an existing variable."""
+        try:
+            url = _variables_url(self.base_url, workspace_id, variable_id)
+            _, body = await self._request("PATCH", url, json=variable_data)
+            return body  # type: ignore[no-any-return]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TerraformCloudError(f"Failed to update variable: {e}")
+
+    async def delete_variable(self, workspace_id: str, variable_id: str) -> bool:
+        """Delete a variable from a workspace."""
+        try:
+            url = _variables_url(self.base_url, workspace_id, variable_id)
+            status, _ = await self._request("DELETE", url)
+            return status == 204
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TerraformCloudError(f"Failed to delete variable: {e}")
@@ -0,0 +1,284 @@
+"""
+High-level asyncio variable management operations.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from collections.abc import Awaitable
+from types import TracebackType
+from typing import Any, Callable, TypeVar, cast
+
+from .async_client import AsyncTerraformCloudClient
+from .deadline import Deadline, current_deadline, deadline_scope
+from .operations import (
+    CREATE,
+    DELETE,
+    UPDATE,
+    OperationResult,
+    VariableOperation,
+    plan_upload_operations,
+    report_results,
+    select_variables,
+)
+from .utils import open_output, write_tfvars
+from .variable_manager import VariableManager
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+_F = TypeVar("_F", bound=Callable[..., Awaitable[Any]])
+
+
+def _within_deadline(method: _F) -> _F:
+    """Run a manager coroutine under a new deadline of ``operation_timeout``.
+
+    Like its :class:`VariableManager` counterpart, the deadline is set for the
+    calling task only, and operations awaited by another operation share the
+    caller's deadline.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self: AsyncVariableManager, *args: Any, **kwargs: Any) -> Any:
+        if self.operation_timeout is None or current_deadline() is not None:
+            return await method(self, *args, **kwargs)
+        with deadline_scope(Deadline(self.operation_timeout)):
+            return await method(self, *args, **kwargs)
+
+    return cast(_F, wrapper)
+
+
+class AsyncVariableManager:
+    """asyncio counterpart of :class:`VariableManager`.
+
+    Operations on many workspaces can run concurrently on one event loop; the
+    client's ``concurrency`` bounds the requests in flight across all of them.
+
+    With an ``operation_timeout``, every operation must finish within that
+    many seconds: fetches past it raise :class:`DeadlineExceeded`, and the
+    variable operations still pending are cancelled and reported as such.
+    """
+
+    def __init__(
+        self,
+        client: AsyncTerraformCloudClient | None = None,
+        operation_timeout: float | None = None,
+    ) -> None:
+        """Initialize with an async API client.
+
+        ``operation_timeout`` is the deadline of each operation, in seconds.
+        """
+        if operation_timeout is not None and operation_timeout <= 0:
+            raise ValueError("operation_timeout must be positive")
+        self._owns_client = client is None
+        self.client = client or AsyncTerraformCloudClient()
+        self.operation_timeout = operation_timeout
+
+    async def __aenter__(self) -> AsyncVariableManager:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the API client if this manager created it."""
+        if self._owns_client:
+            await self.client.close()
+
+    @_within_deadline
+    async def download(
+        self, workspace_id: str, output_file: str = "variables.tfvars"
+    ) -> bool:
+        """Download variables from a workspace to a .tfvars file."""
+        try:
+            vars_dict = await self._fetch(workspace_id)
+            with open_output(output_file) as f:
+                write_tfvars(vars_dict, f)
+
+            logger.info(f"Downloaded {len(vars_dict)} variables to {output_file}")
+            return True
+        except Exception as e:
+            logger.error(f"Download failed: {e}")
+            return False
+
+    @_within_deadline
+    async def upload(
+        self,
+        workspace_id: str,
+        tfvars_file: str,
+        remove_missing: bool = False,
+    ) -> bool:
+        """Upload variables from a .tfvars file to a workspace."""
+        try:
+            # Reading and parsing the file blocks, so keep it off the event loop
+            variables_to_upload = await asyncio.to_thread(
+                VariableManager._parse_tfvars_file, tfvars_file
+            )
+            existing_vars_dict = await self._fetch(workspace_id)
+
+            operations = plan_upload_operations(
+                variables_to_upload, existing_vars_dict, remove_missing
+            )
+            results = await self._apply(workspace_id, operations)
+            return report_results(results)
+
+        except Exception as e:
+            logger.error(f"Upload failed: {e}")
+            return False
+
+    @_within_deadline
+    async def compare(
+        self,
+        workspace1_id: str,
+        workspace2_id: str,
+        output_file: str = "comparison.tfvars",
+    ) -> bool:
+        """Compare variables between two workspaces, fetching both at once."""
+        try:
+            vars1_dict, vars2_dict = await asyncio.gather(
+                self._fetch(workspace1_id), self._fetch(workspace2_id)
+            )
+
+            merged_vars: dict[str, dict[str, Any]] = {}
+            for key in sorted(set(vars1_dict).union(vars2_dict)):
+                merged_var = VariableManager._merge_variable_for_comparison(
+                    vars1_dict.get(key), vars2_dict.get(key), key
+                )
+                if merged_var:
+                    merged_vars[key] = merged_var
+
+            with open_output(output_file) as f:
+                write_tfvars(merged_vars, f)
+
+            logger.info(f"Comparison saved to {output_file}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Comparison failed: {e}")
+            return False
+
+    @_within_deadline
+    async def delete_all(
+        self,
+        workspace_id: str,
+        key_pattern: str | None = None,
+        group: str | None = None,
+    ) -> bool:
+        """Delete all variables (or those matching the filters) from a workspace."""
+        try:
+            selected, skipped = select_variables(
+                await self._list(workspace_id), key_pattern, group
+            )
+            operations = [
+                VariableOperation(
+                    DELETE, var["attributes"]["key"], variable_id=var["id"]
+                )
+                for var in selected
+            ]
+            results = await self._apply(workspace_id, operations)
+
+            failed = 0
+            cancelled = []
+            for result in results:
+                if result.success:
+                    logger.info(f"Deleted variable: {result.operation.key}")
+                elif result.cancelled:
+                    cancelled.append(result.operation.key)
+                else:
+                    failed += 1
+                    logger.error(f"Failed to delete variable: {result.operation.key}")
+
+            logger.info(f"Processed {len(results)} variables, skipped {len(skipped)}.")
+            if cancelled:
+                logger.error(
+                    f"{len(cancelled)} variables were not deleted before "
+                    "the deadline: " + ", ".join(sorted(cancelled))
+                )
+            return not failed and not cancelled
+
+        except Exception as e:
+            logger.error(f"Failed to delete variables: {e}")
+            return False
+
+    async def _fetch(self, workspace_id: str) -> dict[str, dict[str, Any]]:
+        """Fetch a workspace's variables keyed by variable name."""
+        return {var["attributes"]["key"]: var for var in await self._list(workspace_id)}
+
+    async def _list(self, workspace_id: str) -> list[dict[str, Any]]:
+        """Fetch a workspace's variables, every page, within the deadline."""
+
+        async def collect() -> list[dict[str, Any]]:
+            return [var async for var in self.client.iter_variables(workspace_id)]
+
+        return await _before_deadline(collect(), f"list variables of {workspace_id}")
+
+    async def _apply(
+        self, workspace_id: str, operations: list[VariableOperation]
+    ) -> list[OperationResult]:
+        """Run all operations concurrently; results keep the input order.
+
+        Operations still pending when the current deadline passes are
+        cancelled and returned as cancelled results.
+        """
+        deadline = current_deadline()
+        if deadline is None or not operations:
+            return list(
+                await asyncio.gather(
+                    *(self._apply_one(workspace_id, op) for op in operations)
+                )
+            )
+
+        tasks = [
+            asyncio.ensure_future(self._apply_one(workspace_id, op))
+            for op in operations
+        ]
+        _, pending = await asyncio.wait(tasks, timeout=deadline.remaining())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        error = str(deadline.error())
+        return [
+            OperationResult(op, False, error, cancelled=True)
+            if task in pending
+            else task.result()
+            for op, task in zip(operations, tasks)
+        ]
+
+    async def _apply_one(
+        self, workspace_id: str, op: VariableOperation
+    ) -> OperationResult:
+        """Apply one operation, capturing any error in the result."""
+        try:
+            if op.action == CREATE:
+                await self.client.create_variable(workspace_id, op.payload or {})
+            elif op.action == UPDATE:
+                await self.client.update_variable(
+                    workspace_id, op.variable_id or "", op.payload or {}
+                )
+            elif op.action == DELETE:
+                if not await self.client.delete_variable(
+                    workspace_id, op.variable_id or ""
+                ):
+                    return OperationResult(op, False, "deletion was not confirmed")
+            else:
+                return OperationResult(op, False, f"unknown action {op.action!r}")
+        except Exception as e:
+            return OperationResult(op, False, str(e))
+        return OperationResult(op, True)
+
+
+async def _before_deadline(awaitable: Awaitable[_T], what: str) -> _T:
+    """Await ``awaitable``, cut short by the current deadline, if any."""
+    deadline = current_deadline()
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining())
+    except asyncio.TimeoutError:
+        raise deadline.error(what) from None
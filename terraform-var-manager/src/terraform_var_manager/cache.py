@@ -0,0 +1,243 @@
+"""
+On-disk caches of workspace snapshots and parsed .tfvars files.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable
+
+from .utils import write_atomically
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_TTL = 300.0
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_PARSE_CACHE_ENTRIES = 64
+
+
+def default_cache_dir(kind: str = "snapshots") -> str:
+    """Directory used when no cache directory is given.
+
+    ``$XDG_CACHE_HOME/terraform-var-manager/<kind>``, falling back to
+    ``~/.cache`` when ``XDG_CACHE_HOME`` is not set.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "terraform-var-manager", kind)
+
+
+class _FileCache:
+    """A directory of JSON entries, evicted least recently used first.
+
+    Recency is the file modification time, refreshed on every hit. Entries
+    are written atomically with owner-only permissions.
+    """
+
+    def __init__(self, directory: str, max_entries: int) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        for path in self._entries():
+            self._remove(path)
+
+    def _path(self, *key: str) -> str:
+        digest = hashlib.sha256("\0".join(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _read(self, path: str) -> dict[str, Any] | None:
+        """Load an entry; unreadable entries are removed and count as misses."""
+        try:
+            with open(path) as f:
+                entry: dict[str, Any] = json.load(f)
+            if not isinstance(entry, dict):
+                raise TypeError("entry is not an object")
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        return entry
+
+    def _write(self, path: str, entry: dict[str, Any], now: float) -> None:
+        """Store an entry as just used and evict the oldest beyond the limit."""
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            text = json.dumps(entry, separators=(",", ":"))
+            write_atomically(path, text, mode=0o600)
+            self._touch(path, now)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
+            return
+        self._evict()
+
+    def _entries(self) -> list[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in names
+            if name.endswith(".json")
+        ]
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries beyond ``max_entries``."""
+        with self._lock:
+            entries = self._entries()
+            if len(entries) <= self.max_entries:
+                return
+            by_use: list[tuple[float, str]] = []
+            for path in entries:
+                try:
+                    by_use.append((os.stat(path).st_mtime, path))
+                except FileNotFoundError:
+                    continue
+            by_use.sort()
+            for _, path in by_use[: len(by_use) - self.max_entries]:
+                self._remove(path)
+
+    @staticmethod
+    def _touch(path: str, now: float) -> None:
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove cache entry {path}: {e}")
+
+
+class SnapshotCache(_FileCache):
+    """Snapshots of ``get_variables`` results, shared by processes on one host.
+
+    Each workspace of each API host is stored as one JSON file, so separate
+    CLI runs (e.g. jobs on the same CI runner) reuse each other's fetches.
+    Snapshots older than ``ttl`` seconds are ignored. At most ``max_entries``
+    snapshots are kept; the least recently used ones are evicted first, using
+    the file modification time, which is refreshed on every hit.
+
+    Files are written atomically with owner-only permissions. Terraform Cloud
+    never returns the values of sensitive variables, so none are stored.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if ttl < 0:
+            raise ValueError("ttl must not be negative")
+        super().__init__(directory or default_cache_dir(), max_entries)
+        self.ttl = ttl
+        self._clock = clock
+
+    def get(self, host: str, workspace_id: str) -> list[dict[str, Any]] | None:
+        """Return the cached variables, or None if missing or expired."""
+        path = self._path(host, workspace_id)
+        entry = self._read(path)
+        if entry is None:
+            return None
+        try:
+            stored_at = float(entry["stored_at"])
+            variables: list[dict[str, Any]] = entry["variables"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+
+        now = self._clock()
+        if now - stored_at > self.ttl:
+            self._remove(path)
+            return None
+        self._touch(path, now)
+        logger.debug(f"Cache hit for workspace {workspace_id} on {host}")
+        return variables
+
+    def put(
+        self, host: str, workspace_id: str, variables: list[dict[str, Any]]
+    ) -> None:
+        """Store a snapshot of a workspace's variables and evict old entries."""
+        now = self._clock()
+        entry = {
+            "host": host,
+            "workspace_id": workspace_id,
+            "stored_at": now,
+            "variables": variables,
+        }
+        self._write(self._path(host, workspace_id), entry, now)
+
+    def invalidate(self, host: str, workspace_id: str) -> None:
+        """Drop the snapshot of a workspace, e.g. after writing to it."""
+        self._remove(self._path(host, workspace_id))
+
+
+class ParseCache(_FileCache):
+    """Parsed .tfvars files keyed by a digest of their content.
+
+    The digest is computed by the parser and covers its version, so a parser
+    change never serves stale results and an unchanged file is never parsed
+    twice, whatever its path. Variables are stored as compact rows, and at
+    most ``max_entries`` files are kept, least recently used evicted first.
+
+    tfvars files may hold secrets, so entries are readable only by their
+    owner, like the files they were parsed from.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_entries: int = DEFAULT_PARSE_CACHE_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(directory or default_cache_dir("parsed"), max_entries)
+        self._clock = clock
+
+    def get(self, digest: str) -> dict[str, dict[str, Any]] | None:
+        """Return the variables parsed from content with this digest, if cached."""
+        path = self._path(digest)
+        entry = self._read(path)
+        if entry is None:
+            return None
+        try:
+            variables = {
+                key: {
+                    "value": value,
+                    "description": description,
+                    "sensitive": bool(sensitive),
+                    "hcl": bool(hcl),
+                }
+                for key, value, description, sensitive, hcl in entry["rows"]
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        self._touch(path, self._clock())
+        return variables
+
+    def put(self, digest: str, variables: dict[str, dict[str, Any]]) -> None:
+        """Store the variables parsed from content with this digest."""
+        rows = [
+            [key, v["value"], v["description"], int(v["sensitive"]), int(v["hcl"])]
+            for key, v in variables.items()
+        ]
+        self._write(self._path(digest), {"rows": rows}, self._clock())
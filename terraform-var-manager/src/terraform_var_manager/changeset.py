@@ -0,0 +1,120 @@
+"""
+Serializable upload plans: the operations that bring a workspace in line.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from .exceptions import TerraformCloudError
+from .operations import CREATE, DELETE, UPDATE, VariableOperation
+from .utils import write_atomically
+
+CHANGESET_VERSION = 1
+
+
+@dataclass
+class Changeset:
+    """The creates, updates and deletes planned for one workspace.
+
+    ``remote_digest`` fingerprints the remote variables the plan was computed
+    from, so that applying it later can detect a workspace that has changed
+    in the meantime. Payloads include the planned values, sensitive ones too:
+    saved changesets are written readable only by their owner and should be
+    handled like the tfvars file they came from.
+    """
+
+    workspace_id: str
+    operations: list[VariableOperation] = field(default_factory=list)
+    remote_digest: str = ""
+
+    @property
+    def is_empty(self) -> bool:
+        """True when applying the changeset would change nothing."""
+        return not self.operations
+
+    def counts(self) -> dict[str, int]:
+        """Number of operations per action, e.g. for a plan summary."""
+        counts = Counter(op.action for op in self.operations)
+        return {action: counts[action] for action in (CREATE, UPDATE, DELETE)}
+
+    def describe(self) -> str:
+        """One-line human-readable summary of the changeset."""
+        counts = self.counts()
+        return (
+            f"{self.workspace_id}: {counts[CREATE]} to create, "
+            f"{counts[UPDATE]} to update, {counts[DELETE]} to delete"
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the changeset as JSON-serializable data."""
+        return {
+            "version": CHANGESET_VERSION,
+            "workspace_id": self.workspace_id,
+            "remote_digest": self.remote_digest,
+            "operations": [
+                {
+                    "action": op.action,
+                    "key": op.key,
+                    "payload": op.payload,
+                    "variable_id": op.variable_id,
+                }
+                for op in self.operations
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Changeset:
+        """Rebuild a changeset from :meth:`to_dict` output."""
+        if data.get("version") != CHANGESET_VERSION:
+            raise TerraformCloudError(
+                f"Unsupported changeset version: {data.get('version')!r}"
+            )
+        try:
+            operations = [
+                VariableOperation(
+                    op["action"], op["key"], op.get("payload"), op.get("variable_id")
+                )
+                for op in data["operations"]
+            ]
+            for op in operations:
+                if op.action not in (CREATE, UPDATE, DELETE):
+                    raise ValueError(f"unknown action {op.action!r}")
+            return cls(data["workspace_id"], operations, data.get("remote_digest", ""))
+        except (KeyError, TypeError, ValueError) as e:
+            raise TerraformCloudError(f"Invalid changeset: {e}")
+
+    def save(self, path: str) -> None:
+        """Write the changeset as JSON, readable only by its owner."""
+        write_atomically(path, json.dumps(self.to_dict(), indent=2) + "\n", 0o600)
+
+    @classmethod
+    def load(cls, path: str) -> Changeset:
+        """Read a changeset written by :meth:`save`."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise TerraformCloudError(f"Failed to read changeset {path}: {e}")
+        if not isinstance(data, dict):
+            raise TerraformCloudError(f"Invalid changeset: {path}")
+        return cls.from_dict(data)
+
+
+def remote_digest(existing_vars_dict: dict[str, dict[str, Any]]) -> str:
+    """Fingerprint the remote state an upload plan was computed from."""
+    state = sorted(
+        (
+            key,
+            var["id"],
+            var["attributes"].get("value"),
+            var["attributes"].get("description"),
+            bool(var["attributes"].get("hcl")),
+            bool(var["attributes"].get("sensitive")),
+        )
+        for key, var in existing_vars_dict.items()
+    )
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()
@@ -0,0 +1,98 @@
+"""
+Request timeouts and operation-wide deadlines shared by every request and
+worker of an operation.
+
+The deadline of the running operation is held in a context variable rather
+than on the client, so operations sharing one client (from several managers
+or threads) each see only their own deadline.
+"""
+from __future__ import annotations
+
+import contextvars
+import time
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any, Callable, TypeVar
+
+from .exceptions import DeadlineExceeded
+
+_T = TypeVar("_T")
+
+# Seconds an attempt may wait to connect, and between bytes of the response.
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+
+
+class Deadline:
+    """The point in time by which an operation must be finished.
+
+    One deadline is shared by every request an operation makes, from any
+    thread: requests are not started, retried or waited for past it, and
+    their timeouts are shortened to the time that is left.
+    """
+
+    def __init__(
+        self, seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if seconds <= 0:
+            raise ValueError("seconds must be positive")
+        self.seconds = float(seconds)
+        self._clock = clock
+        self.expires_at = clock() + self.seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(self.expires_at - self._clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    def check(self, what: str = "") -> None:
+        """Raise :class:`DeadlineExceeded` if the deadline has passed."""
+        if self.expired:
+            raise self.error(what)
+
+    def error(self, what: str = "") -> DeadlineExceeded:
+        """The error reporting that the deadline passed, during ``what``."""
+        message = f"Operation deadline of {self.seconds:g}s exceeded"
+        return DeadlineExceeded(f"{message} ({what})" if what else message)
+
+    def clamp(self, timeout: float | None) -> float:
+        """``timeout`` shortened to the time left (the time left if None)."""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+_current: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar(
+    "terraform_var_manager_deadline", default=None
+)
+
+
+def current_deadline() -> Deadline | None:
+    """The deadline of the operation running in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline | None) -> Iterator[None]:
+    """Run the block under ``deadline`` (or under none, if None).
+
+    Requests made in the block, including from threads started with
+    :func:`submit` and from asyncio tasks created in it, see the deadline.
+    """
+    token = _current.set(deadline)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def submit(executor: Executor, fn: Callable[..., _T], *args: Any) -> Future[_T]:
+    """Submit ``fn(*args)`` to run in a copy of the current context.
+
+    Executor threads do not inherit the caller's context; this carries the
+    current deadline over to the worker.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
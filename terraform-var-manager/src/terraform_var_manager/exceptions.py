@@ -5,3 +5,15 @@ from __future__ import annotations
 
 class TerraformCloudError(Exception):
     """Raised when a Terraform Cloud API operation fails."""
+
+
+class DeadlineExceeded(TerraformCloudError):
+    """Raised when an operation runs past its deadline.
+
+    ``sent`` is False when the request was given up before any attempt of it
+    was sent, so it cannot have reached Terraform Cloud.
+    """
+
+    def __init__(self, message: str = "", sent: bool = True) -> None:
+        super().__init__(message)
+        self.sent = sent
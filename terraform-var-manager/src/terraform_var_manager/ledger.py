@@ -0,0 +1,178 @@
+"""
+Ledger of salted fingerprints of the sensitive values last uploaded.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+from typing import Any
+
+from .utils import write_atomically
+
+logger = logging.getLogger(__name__)
+
+LEDGER_VERSION = 1
+
+
+def default_ledger_path() -> str:
+    """File used when no ledger path is given.
+
+    ``$XDG_STATE_HOME/terraform-var-manager/secret-ledger.json``, falling back
+    to ``~/.local/state`` when ``XDG_STATE_HOME`` is not set.
+    """
+    base = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(base, "terraform-var-manager", "secret-ledger.json")
+
+
+class FingerprintLedger:
+    """Remembers what was last pushed to each sensitive variable.
+
+    Terraform Cloud never returns sensitive values, so an upload cannot tell
+    whether a secret changed. The ledger stores, per (workspace, key), an
+    HMAC-SHA256 of the value, description and hcl flag that this machine last
+    uploaded, keyed with a random salt kept in the ledger file. Values
+    themselves are never written, and the salt makes the fingerprints useless
+    for matching secrets across ledgers.
+
+    A fingerprint only proves what *this* ledger last sent: a secret changed
+    elsewhere (the UI, another machine) is not noticed until an upload with
+    ``force_resync`` or a local change to the value.
+
+    :meth:`save` merges this instance's changes into the file as it is on
+    disk, so concurrent uploads to different workspaces keep each other's
+    fingerprints.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or default_ledger_path()
+        self._lock = threading.Lock()
+        self._salt: bytes | None = None
+        self._entries: dict[str, dict[str, str]] = {}
+        # Fingerprints recorded (or None for forgotten) since the last save.
+        self._changes: dict[tuple[str, str], str | None] = {}
+
+    def is_unchanged(
+        self,
+        workspace_id: str,
+        key: str,
+        existing_attrs: dict[str, Any],
+        new_data: dict[str, Any],
+    ) -> bool:
+        """Whether a sensitive variable already holds ``new_data`` remotely.
+
+        True only when the remote variable is still sensitive with the same
+        description and hcl flag, and the fingerprint of ``new_data`` matches
+        the one recorded for the last upload.
+        """
+        if not (new_data["sensitive"] and existing_attrs.get("sensitive")):
+            return False
+        if existing_attrs.get("description") != new_data["description"] or bool(
+            existing_attrs.get("hcl")
+        ) != bool(new_data["hcl"]):
+            return False
+        with self._lock:
+            salt = self._load()
+            recorded = self._entries.get(workspace_id, {}).get(key)
+            return recorded is not None and hmac.compare_digest(
+                recorded, _fingerprint(salt, new_data)
+            )
+
+    def record(self, workspace_id: str, key: str, data: dict[str, Any]) -> None:
+        """Remember the value just uploaded to a sensitive variable."""
+        with self._lock:
+            fingerprint = _fingerprint(self._load(), data)
+            _set_entry(self._entries, workspace_id, key, fingerprint)
+            self._changes[workspace_id, key] = fingerprint
+
+    def forget(self, workspace_id: str, key: str) -> None:
+        """Drop the fingerprint of a variable (deleted or no longer sensitive)."""
+        with self._lock:
+            self._load()
+            _set_entry(self._entries, workspace_id, key, None)
+            self._changes[workspace_id, key] = None
+
+    def save(self) -> None:
+        """Write the ledger atomically, readable only by its owner."""
+        with self._lock:
+            if not self._changes or self._salt is None:
+                return
+            entries = self._entries
+            on_disk = self._read()
+            if on_disk is not None and on_disk[0] == self._salt:
+                entries = on_disk[1]
+                for (workspace_id, key), fingerprint in self._changes.items():
+                    _set_entry(entries, workspace_id, key, fingerprint)
+            document = {
+                "version": LEDGER_VERSION,
+                "salt": self._salt.hex(),
+                "workspaces": entries,
+            }
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            text = json.dumps(document, indent=2, sort_keys=True)
+            write_atomically(self.path, text, mode=0o600)
+            self._entries = entries
+            self._changes.clear()
+
+    def _load(self) -> bytes:
+        """Read the ledger on first use; start a new one if missing or invalid.
+
+        Returns the salt.
+        """
+        if self._salt is None:
+            on_disk = self._read()
+            if on_disk is None:
+                # Starting over only costs one full resync of the secrets.
+                self._salt, self._entries = secrets.token_bytes(32), {}
+            else:
+                self._salt, self._entries = on_disk
+        return self._salt
+
+    def _read(self) -> tuple[bytes, dict[str, dict[str, str]]] | None:
+        """Return the salt and entries stored on disk, if readable."""
+        try:
+            with open(self.path) as f:
+                document = json.load(f)
+            if document.get("version") != LEDGER_VERSION:
+                raise ValueError(f"unsupported version {document.get('version')}")
+            salt = bytes.fromhex(document["salt"])
+            entries = {
+                str(ws): {str(k): str(v) for k, v in keys.items()}
+                for ws, keys in document["workspaces"].items()
+            }
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable secret ledger {self.path}: {e}")
+            return None
+        return salt, entries
+
+
+def _set_entry(
+    entries: dict[str, dict[str, str]],
+    workspace_id: str,
+    key: str,
+    fingerprint: str | None,
+) -> None:
+    """Set or (with None) remove one fingerprint, dropping empty workspaces."""
+    if fingerprint is not None:
+        entries.setdefault(workspace_id, {})[key] = fingerprint
+        return
+    workspace = entries.get(workspace_id)
+    if workspace is not None:
+        workspace.pop(key, None)
+        if not workspace:
+            del entries[workspace_id]
+
+
+def _fingerprint(salt: bytes, data: dict[str, Any]) -> str:
+    """Salted HMAC of the value, description and hcl flag of a variable."""
+    message = json.dumps(
+        [str(data["value"]), data["description"], bool(data["hcl"])]
+    ).encode()
+    return hmac.new(salt, message, hashlib.sha256).hexdigest()
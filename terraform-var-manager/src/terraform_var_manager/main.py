@@ -6,15 +6,94 @@ from __future__ import annotations
 import argparse
 import logging
 import sys
+from typing import TYPE_CHECKING
 
+from .cache import DEFAULT_CACHE_TTL
+from .deadline import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
 from .exceptions import TerraformCloudError
-from .variable_manager import VariableManager
+from .utils import DEFAULT_MAX_AGE
+from .workspace_index import DEFAULT_INDEX_TTL
+
+# The manager, and with it the HTTP stack, is only imported by main() once
+# the arguments are valid, so --help and usage errors return quickly.
+if TYPE_CHECKING:
+    from .metrics import RequestMetrics
+    from .profiling import PhaseProfiler
+    from .variable_manager import VariableManager
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _positive_int(value: str) -> int:
+    """Argparse type for options that must be an integer >= 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _non_negative_float(value: str) -> float:
+    """Argparse type for options that must be a number >= 0."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {value}")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    """Argparse type for options that must be a number > 0."""
+    number = _non_negative_float(value)
+    if number == 0:
+        raise argparse.ArgumentTypeError("must be greater than 0")
+    return number
+
+
+def _read_workspace_list(path: str) -> list[str]:
+    """Read workspace IDs, one per line; blank lines and # comments are ignored."""
+    try:
+        with open(path) as f:
+            lines = [line.split("#", 1)[0].strip() for line in f]
+    except OSError as e:
+        raise TerraformCloudError(f"Failed to read workspace list {path}: {e}")
+    return [line for line in lines if line]
+
+
+def _resolve_workspace(manager: VariableManager, reference: str) -> str:
+    """Turn an ``organization/name`` reference into an ID; IDs pass through."""
+    if "/" not in reference:
+        return reference
+    return manager.client.resolve_workspace(reference)
+
+
+def _download_file_names(given_as: dict[str, str]) -> dict[str, str]:
+    """Name bulk download files after the references they were given as.
+
+    ``organization/name`` is written to ``name.tfvars`` and an ID to
+    ``<id>.tfvars``. Raises ValueError when two references would share a file
+    (e.g. ``org-a/app`` and ``org-b/app``), as one would overwrite the other.
+    """
+    file_names = {
+        workspace_id: f"{reference.rpartition('/')[2]}.tfvars"
+        for workspace_id, reference in given_as.items()
+    }
+    by_file: dict[str, list[str]] = {}
+    for workspace_id, file_name in file_names.items():
+        by_file.setdefault(file_name, []).append(given_as[workspace_id])
+    clashes = [refs for refs in by_file.values() if len(refs) > 1]
+    if clashes:
+        raise ValueError(
+            "Workspaces would be downloaded to the same file: "
+            + "; ".join(", ".join(refs) for refs in clashes)
+        )
+    return file_names
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Create and configure the argument parser."""
     parser = argparse.ArgumentParser(
@@ -22,96 +101,512 @@ def create_parser() -> argparse.ArgumentParser:
         prog="terraform-var-manager",
     )
 
-    parser.add_argument("--id", help="workspace id")
+    parser.add_argument(
+        "--id",
+        action="extend",
+        nargs="+",
+        metavar="workspace",
+        help=(
+            "workspace id, organization/name or variable set id "
+            "(--upload, --download and --attach/--detach-varset accept several)"
+        ),
+    )
+    parser.add_argument(
+        "--workspaces-file",
+        metavar="PATH",
+        help="File listing one workspace per line (for commands taking several)",
+    )
     parser.add_argument(
         "--download", action="store_true", help="Download variables from workspace"
     )
     parser.add_argument(
         "--upload", action="store_true", help="Upload variables to workspace"
     )
-    parser.add_argument("--tfvars", help="path to the .tfvars file for upload")
+    parser.add_argument(
+        "--attach-varset",
+        metavar="VARSET_ID",
+        help="Apply a variable set to the given workspaces",
+    )
+    parser.add_argument(
+        "--detach-varset",
+        metavar="VARSET_ID",
+        help="Remove a variable set from the given workspaces",
+    )
+    parser.add_argument(
+        "--tfvars", help="path to the .tfvars file for upload (- for stdin)"
+    )
+    parser.add_argument(
+        "--plan-out",
+        metavar="PATH",
+        help="With --upload, save the planned changes to PATH instead of applying",
+    )
+    parser.add_argument(
+        "--apply-plan",
+        metavar="PATH",
+        help="Apply changes saved with --plan-out",
+    )
     parser.add_argument(
         "--compare",
-        nargs=2,
-        metavar=("workspace1_id", "workspace2_id"),
-        help="Compare variables between two workspaces",
+        nargs="+",
+        metavar="workspace",
+        help="Compare variables between two or more workspaces",
+    )
+    parser.add_argument(
+        "--output", default="default.tfvars", help="Output file name (- for stdout)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        metavar="DIR",
+        help="With --download, write one <workspace>.tfvars per workspace to DIR",
+    )
+    parser.add_argument(
+        "--organization",
+        metavar="ORG",
+        help="With --download --output-dir, download every workspace of ORG",
+    )
+    parser.add_argument(
+        "--name-pattern",
+        metavar="GLOB",
+        help="With --organization, only download workspaces whose name matches",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=_non_negative_float,
+        default=DEFAULT_MAX_AGE,
+        metavar="SECONDS",
+        help=(
+            "With --output-dir, skip files downloaded less than SECONDS ago "
+            f"(default: {DEFAULT_MAX_AGE:g}, 0 downloads everything again)"
+        ),
     )
-    parser.add_argument("--output", default="default.tfvars", help="Output file name")
     parser.add_argument(
         "--delete-all-variables",
         action="store_true",
         help="Delete all variables in the given workspace",
     )
+    parser.add_argument(
+        "--key-pattern",
+        metavar="GLOB",
+        help="With --delete-all-variables, only delete keys matching this glob",
+    )
+    parser.add_argument(
+        "--group",
+        help="With --delete-all-variables, only delete variables in this [group]",
+    )
     parser.add_argument(
         "--remove",
         action="store_true",
         help="Remove variables from remote that are not in tfvars",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="Number of variable operations to run in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=_positive_float,
+        metavar="SECONDS",
+        help=(
+            "Deadline for the whole operation; work not done by then is "
+            "cancelled and reported (default: none)"
+        ),
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=_positive_float,
+        default=DEFAULT_CONNECT_TIMEOUT,
+        metavar="SECONDS",
+        help=(
+            "Time allowed to connect to the API, per request "
+            f"(default: {DEFAULT_CONNECT_TIMEOUT:g})"
+        ),
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=_positive_float,
+        default=DEFAULT_READ_TIMEOUT,
+        metavar="SECONDS",
+        help=(
+            "Time allowed between bytes of an API response "
+            f"(default: {DEFAULT_READ_TIMEOUT:g})"
+        ),
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse recent workspace snapshots from the local cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Snapshot cache directory (default: ~/.cache/terraform-var-manager)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=_non_negative_float,
+        default=DEFAULT_CACHE_TTL,
+        metavar="SECONDS",
+        help=f"Maximum age of a cached snapshot (default: {DEFAULT_CACHE_TTL:g})",
+    )
+    parser.add_argument(
+        "--parse-cache",
+        action="store_true",
+        help="Reuse parse results of unchanged .tfvars files (--upload)",
+    )
+    parser.add_argument(
+        "--index-ttl",
+        type=_non_negative_float,
+        default=DEFAULT_INDEX_TTL,
+        metavar="SECONDS",
+        help=(
+            "Maximum age of the cached workspace listing used to resolve "
+            f"organization/name references (default: {DEFAULT_INDEX_TTL:g})"
+        ),
+    )
+    parser.add_argument(
+        "--secret-ledger",
+        action="store_true",
+        help="With --upload, skip sensitive variables unchanged since the last upload",
+    )
+    parser.add_argument(
+        "--ledger-file",
+        metavar="PATH",
+        help="Secret ledger file (default: ~/.local/state/terraform-var-manager)",
+    )
+    parser.add_argument(
+        "--force-resync",
+        action="store_true",
+        help="With --upload, send every sensitive variable even if unchanged",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Print API call counts and a latency histogram when done",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        metavar="PATH",
+        help="Write per-endpoint request metrics to PATH as JSON when done",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        metavar="PATH",
+        help="Write request metrics to PATH in the Prometheus textfile format",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time, CPU and API calls of each phase when done",
+    )
+    parser.add_argument(
+        "--profile-report",
+        metavar="PATH",
+        help="Write the phase profile to PATH as JSON (implies --profile)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Track peak memory per phase with tracemalloc (slower)",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        metavar="PATH",
+        help="Run under cProfile and write its stats to PATH for pstats/snakeviz",
+    )
 
     return parser
 
 
+def _report_metrics(metrics: RequestMetrics, args: argparse.Namespace) -> None:
+    """Print and export the request metrics of a run, as asked for."""
+    if args.metrics:
+        print(metrics.summary(), file=sys.stderr)
+    for path, write in (
+        (args.metrics_json, metrics.write_json),
+        (args.metrics_prom, metrics.write_prometheus),
+    ):
+        if not path:
+            continue
+        try:
+            write(path)
+        except OSError as e:
+            logger.error(f"Failed to write metrics to {path}: {e}")
+
+
+def _operation(args: argparse.Namespace) -> str:
+    """Name of the operation a command line runs, or "" when it runs none."""
+    for option in (
+        "delete_all_variables",
+        "download",
+        "compare",
+        "upload",
+        "attach_varset",
+        "detach_varset",
+        "apply_plan",
+    ):
+        if getattr(args, option):
+            return option
+    return ""
+
+
+def _usage_error(args: argparse.Namespace) -> str | None:
+    """The error of a command line missing options its operation needs.
+
+    Only the arguments are looked at, so these errors are reported before
+    the HTTP stack is imported or any workspace is resolved.
+    """
+    has_workspaces = bool(args.id or args.workspaces_file)
+    if args.delete_all_variables:
+        if not has_workspaces:
+            return "--id is required when using --delete-all-variables"
+    elif args.download:
+        several = args.organization or len(set(args.id or [])) > 1
+        if several and not args.output_dir:
+            return "Downloading several workspaces needs --output-dir"
+        if args.output_dir and not (args.organization or has_workspaces):
+            return "--id or --organization is required with --output-dir"
+        if not has_workspaces and not args.organization:
+            return "--id is required when using --download"
+    elif args.compare:
+        if len(args.compare) < 2:
+            return "--compare requires at least two workspaces"
+    elif args.upload:
+        if not has_workspaces:
+            return "--id is required when using --upload"
+        if not args.tfvars:
+            return "Please specify the path to the .tfvars file using --tfvars."
+    elif args.attach_varset or args.detach_varset:
+        if args.attach_varset and args.detach_varset:
+            return "Use either --attach-varset or --detach-varset"
+        if not has_workspaces:
+            return "--id or --workspaces-file is required with a varset"
+    return None
+
+
+def _report_profile(profiler: PhaseProfiler, args: argparse.Namespace) -> None:
+    """Print and write the phase profile of a run, as asked for."""
+    print(profiler.summary(), file=sys.stderr)
+    try:
+        if args.profile_report:
+            profiler.write_json(args.profile_report)
+        if args.profile_cprofile:
+            profiler.dump_stats(args.profile_cprofile)
+    except OSError as e:
+        logger.error(f"Failed to write the profile: {e}")
+
+
 def main() -> None:
     """Main entry point for the CLI."""
     parser = create_parser()
     args = parser.parse_args()
+    if not _operation(args):
+        parser.print_help()
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    usage_error = _usage_error(args)
+    if usage_error:
+        logger.error(usage_error)
+        sys.exit(1)
+
+    from .cache import ParseCache, SnapshotCache
+    from .changeset import Changeset
+    from .ledger import FingerprintLedger
+    from .metrics import RequestMetrics
+    from .profiling import PhaseProfiler
+    from .variable_manager import VariableManager
+    from .workspace_index import WorkspaceIndex
 
+    profiler = None
+    if (
+        args.profile
+        or args.profile_report
+        or args.profile_memory
+        or args.profile_cprofile
+    ):
+        profiler = PhaseProfiler(
+            trace_memory=args.profile_memory,
+            cprofile=bool(args.profile_cprofile),
+            operation=_operation(args),
+        )
+        profiler.start()
+
+    metrics = (
+        RequestMetrics()
+        if args.metrics or args.metrics_json or args.metrics_prom
+        else None
+    )
     try:
         # Initialize the variable manager
-        manager = VariableManager()
+        cache = (
+            SnapshotCache(args.cache_dir, ttl=args.cache_ttl) if args.cache else None
+        )
+        ledger = FingerprintLedger(args.ledger_file) if args.secret_ledger else None
+        manager = VariableManager(
+            concurrency=args.concurrency,
+            cache=cache,
+            ledger=ledger,
+            workspace_index=WorkspaceIndex(ttl=args.index_ttl),
+            parse_cache=ParseCache() if args.parse_cache else None,
+            hooks=[metrics] if metrics else None,
+            profiler=profiler,
+            operation_timeout=args.timeout,
+            connect_timeout=args.connect_timeout,
+            read_timeout=args.read_timeout,
+        )
+
+        references = list(args.id or [])
+        if args.workspaces_file:
+            references += _read_workspace_list(args.workspaces_file)
+        # Workspace ID -> how it was given, which names bulk download files
+        given_as: dict[str, str] = {}
+        for reference in references:
+            given_as.setdefault(_resolve_workspace(manager, reference), reference)
+        workspace_ids = list(given_as)
+        varset_id = args.attach_varset or args.detach_varset
+        if len(workspace_ids) > 1 and not (args.upload or args.download or varset_id):
+            logger.error(
+                "Only --upload, --download and --attach/--detach-varset "
+                "accept several workspaces"
+            )
+            sys.exit(1)
+        workspace_id = workspace_ids[0] if workspace_ids else None
 
         # Handle delete all variables operation
         if args.delete_all_variables:
-            if not args.id:
+            if not workspace_id:
                 logger.error("--id is required when using --delete-all-variables")
                 sys.exit(1)
 
+            selection = "all variables"
+            if args.key_pattern or args.group:
+                filters = [
+                    f"key matching '{args.key_pattern}'" if args.key_pattern else "",
+                    f"group [{args.group}]" if args.group else "",
+                ]
+                selection = "variables with " + " and ".join(f for f in filters if f)
             confirm = input(
-                f"Are you sure you want to delete all variables from workspace "
-                f'"{args.id}"? (yes/[no]): '
+                f"Are you sure you want to delete {selection} from workspace "
+                f'"{workspace_id}"? (yes/[no]): '
             )
             if confirm.strip().lower() != "yes":
                 logger.info("Operation aborted by user.")
                 sys.exit(0)
 
-            success = manager.delete_all_variables(args.id)
+            success = manager.delete_all_variables(
+                workspace_id, key_pattern=args.key_pattern, group=args.group
+            )
             sys.exit(0 if success else 1)
 
         # Handle download operation
         elif args.download:
-            if not args.id:
+            if args.organization or args.output_dir or len(workspace_ids) > 1:
+                if not args.output_dir:
+                    logger.error("Downloading several workspaces needs --output-dir")
+                    sys.exit(1)
+                if args.organization:
+                    summary = manager.download_organization(
+                        args.organization,
+                        args.output_dir,
+                        name_pattern=args.name_pattern,
+                        max_age=args.max_age,
+                    )
+                elif workspace_ids:
+                    try:
+                        file_names = _download_file_names(given_as)
+                    except ValueError as e:
+                        logger.error(f"{e}; download them into separate directories")
+                        sys.exit(1)
+                    summary = manager.download_workspaces(
+                        file_names, args.output_dir, max_age=args.max_age
+                    )
+                else:
+                    logger.error("--id or --organization is required with --output-dir")
+                    sys.exit(1)
+                sys.exit(0 if summary.ok else 1)
+
+            if not workspace_id:
                 logger.error("--id is required when using --download")
                 sys.exit(1)
 
-            success = manager.download_variables(args.id, args.output)
+            success = manager.download_variables(workspace_id, args.output)
             sys.exit(0 if success else 1)
 
         # Handle comparison operation
         elif args.compare:
-            workspace1_id, workspace2_id = args.compare
-            success = manager.compare_workspaces(
-                workspace1_id, workspace2_id, args.output
-            )
+            compare_ids = [_resolve_workspace(manager, ws) for ws in args.compare]
+            if len(compare_ids) == 2:
+                workspace1_id, workspace2_id = compare_ids
+                success = manager.compare_workspaces(
+                    workspace1_id, workspace2_id, args.output
+                )
+            else:
+                success = manager.compare_workspace_matrix(compare_ids, args.output)
             sys.exit(0 if success else 1)
 
         # Handle upload operation
         elif args.upload:
-            if not args.id:
+            if not workspace_id:
                 logger.error("--id is required when using --upload")
                 sys.exit(1)
 
-            if not args.tfvars:
-                logger.error(
-                    "Please specify the path to the .tfvars file using --tfvars."
+            if len(workspace_ids) > 1:
+                if args.plan_out:
+                    logger.error("--plan-out takes a single workspace")
+                    sys.exit(1)
+                summaries = manager.upload_to_workspaces(
+                    workspace_ids,
+                    args.tfvars,
+                    args.remove,
+                    force_resync=args.force_resync,
+                )
+                success = all(summary.ok for summary in summaries.values())
+                sys.exit(0 if success else 1)
+
+            if args.plan_out:
+                changeset = manager.plan_upload(
+                    workspace_id,
+                    args.tfvars,
+                    args.remove,
+                    force_resync=args.force_resync,
                 )
+                changeset.save(args.plan_out)
+                logger.info(f"Plan {changeset.describe()}; saved to {args.plan_out}")
+                sys.exit(0)
+
+            success = manager.upload_variables(
+                workspace_id, args.tfvars, args.remove, force_resync=args.force_resync
+            )
+            sys.exit(0 if success else 1)
+
+        # Handle attaching or detaching a variable set
+        elif varset_id:
+            if not workspace_ids:
+                logger.error("--id or --workspaces-file is required with a varset")
                 sys.exit(1)
 
-            success = manager.upload_variables(args.id, args.tfvars, args.remove)
+            if args.attach_varset:
+                success = manager.attach_varset(varset_id, workspace_ids)
+            else:
+                success = manager.detach_varset(varset_id, workspace_ids)
             sys.exit(0 if success else 1)
 
-        else:
-            parser.print_help()
-            sys.exit(1)
+        # Handle applying a saved plan
+        elif args.apply_plan:
+            changeset = Changeset.load(args.apply_plan)
+            if workspace_id and workspace_id != changeset.workspace_id:
+                logger.error(
+                    f"Plan is for workspace {changeset.workspace_id}, "
+                    f"not {workspace_id}"
+                )
+                sys.exit(1)
+
+            logger.info(f"Applying plan {changeset.describe()}")
+            success = manager.apply_changeset(changeset)
+            sys.exit(0 if success else 1)
 
     except TerraformCloudError as e:
         logger.error(f"Terraform Cloud API error: {e}")
@@ -122,6 +617,12 @@ def main() -> None:
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            _report_profile(profiler, args)
+        if metrics is not None:
+            _report_metrics(metrics, args)
 
 
 if __name__ == "__main__":
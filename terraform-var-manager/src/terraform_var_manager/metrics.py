@@ -0,0 +1,382 @@
+"""
+Per-request instrumentation hooks and a latency histogram aggregator.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+from .utils import write_atomically
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "terraform_var_manager"
+
+# Path segments that are resource IDs, by prefix; "varset-" before "var-".
+_ID_SEGMENTS = [
+    ("varset-", "{varset_id}"),
+    ("var-", "{variable_id}"),
+    ("ws-", "{workspace_id}"),
+]
+_LABEL_ESCAPES = re.compile(r'[\\"\n]')
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """One API call as seen by the caller, retries and waits included.
+
+    ``endpoint`` is the URL path below the API root with IDs and names
+    replaced by placeholders (``/workspaces/{workspace_id}/vars``), so calls
+    to different workspaces aggregate together. ``status`` is the final HTTP
+    status, or None when no response was received. ``seconds`` is the wall
+    time from the first attempt to the outcome, of which ``rate_limit_wait``
+    was spent waiting for the rate limiter or a ``Retry-After``. Bytes are
+    body sizes summed over every attempt. ``error`` names the exception the
+    call raised, if any.
+    """
+
+    method: str
+    endpoint: str
+    status: int | None
+    seconds: float
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    retries: int = 0
+    rate_limit_wait: float = 0.0
+    error: str | None = None
+
+
+RequestHook = Callable[[RequestEvent], None]
+
+
+def endpoint_template(url: str, base_url: str = "") -> str:
+    """The path of ``url`` below ``base_url`` with IDs and names templated."""
+    path = urlsplit(url).path
+    root = urlsplit(base_url).path.rstrip("/")
+    if root and path.startswith(root):
+        path = path[len(root) :]
+    parts = path.rstrip("/").split("/")
+    for i, part in enumerate(parts):
+        if i > 0 and parts[i - 1] == "organizations":
+            parts[i] = "{organization}"
+        elif i > 2 and parts[i - 1] == "workspaces" and parts[i - 3] == "organizations":
+            parts[i] = "{name}"
+        else:
+            for prefix, placeholder in _ID_SEGMENTS:
+                if part.startswith(prefix):
+                    parts[i] = placeholder
+                    break
+    return "/".join(parts) or "/"
+
+
+def _body_size(body: object) -> int:
+    """Size in bytes of a request or response body; 0 when unknown."""
+    if isinstance(body, bytes):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode())
+    return 0
+
+
+class _RequestTrace:
+    """Measurements a client gathers while sending one logical request."""
+
+    def __init__(self, method: str, url: str) -> None:
+        self.method = method
+        self.url = url
+        self.started = time.perf_counter()
+        self.attempts = 0
+        self.status: int | None = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.rate_limit_wait = 0.0
+
+    def event(self, base_url: str, error: BaseException | None = None) -> RequestEvent:
+        return RequestEvent(
+            method=self.method,
+            endpoint=endpoint_template(self.url, base_url),
+            status=self.status,
+            seconds=time.perf_counter() - self.started,
+            bytes_sent=self.bytes_sent,
+            bytes_received=self.bytes_received,
+            retries=max(self.attempts - 1, 0),
+            rate_limit_wait=self.rate_limit_wait,
+            error=type(error).__name__ if error is not None else None,
+        )
+
+
+def _emit(hooks: Sequence[RequestHook], event: RequestEvent) -> None:
+    """Pass an event to every hook; a failing hook never fails the request."""
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception as e:
+            logger.warning(f"Request hook {hook!r} failed: {e}")
+
+
+@dataclass
+class _Series:
+    """Aggregated calls to one endpoint with one method."""
+
+    buckets: list[int]
+    count: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    retries: int = 0
+    rate_limit_wait: float = 0.0
+    statuses: Counter[str] = field(default_factory=Counter)
+
+
+class RequestMetrics:
+    """Thread-safe request hook aggregating calls by method and endpoint.
+
+    Pass it to a client as one of its ``hooks``. Latencies go into a
+    cumulative histogram with the given bucket bounds, from which
+    :meth:`summary` estimates percentiles. Results can be written as JSON
+    (:meth:`write_json`) or in the Prometheus text format (:meth:`write_prometheus`)
+    for the node exporter's textfile collector. Both files are replaced
+    atomically, so a reader never sees a partial file.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        bounds = sorted(buckets)
+        if not bounds or bounds[0] <= 0:
+            raise ValueError("buckets must be positive upper bounds")
+        self.buckets = bounds
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent) -> None:
+        self.record(event)
+
+    def record(self, event: RequestEvent) -> None:
+        """Add one request to its method and endpoint series."""
+        key = (event.method, event.endpoint)
+        bucket = bisect.bisect_left(self.buckets, event.seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series([0] * (len(self.buckets) + 1))
+            series.buckets[bucket] += 1
+            series.count += 1
+            if event.error is not None or (event.status or 0) >= 400:
+                series.errors += 1
+            series.seconds += event.seconds
+            series.max_seconds = max(series.max_seconds, event.seconds)
+            series.bytes_sent += event.bytes_sent
+            series.bytes_received += event.bytes_received
+            series.retries += event.retries
+            series.rate_limit_wait += event.rate_limit_wait
+            status = str(event.status) if event.status is not None else event.error
+            series.statuses[status or "unknown"] += 1
+
+    @property
+    def count(self) -> int:
+        """Number of requests recorded."""
+        with self._lock:
+            return sum(series.count for series in self._series.values())
+
+    def quantile(self, q: float, method: str = "", endpoint: str = "") -> float:
+        """Estimate the ``q`` quantile of latency from the histogram.
+
+        Interpolates linearly inside the bucket holding the quantile, like
+        Prometheus' ``histogram_quantile``. Restricted to one method and/or
+        endpoint when given; 0.0 when nothing was recorded.
+        """
+        with self._lock:
+            counts = [0] * (len(self.buckets) + 1)
+            highest = 0.0
+            for (m, e), series in self._series.items():
+                if (method and m != method) or (endpoint and e != endpoint):
+                    continue
+                counts = [a + b for a, b in zip(counts, series.buckets)]
+                highest = max(highest, series.max_seconds)
+        return _histogram_quantile(q, self.buckets, counts, highest)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Every series as plain data, e.g. for JSON."""
+        with self._lock:
+            items = sorted(self._series.items())
+            return {
+                "buckets": list(self.buckets),
+                "requests": [
+                    {
+                        "method": method,
+                        "endpoint": endpoint,
+                        "count": s.count,
+                        "errors": s.errors,
+                        "seconds": round(s.seconds, 6),
+                        "max_seconds": round(s.max_seconds, 6),
+                        "p50_seconds": round(
+                            _histogram_quantile(
+                                0.5, self.buckets, s.buckets, s.max_seconds
+                            ),
+                            6,
+                        ),
+                        "p95_seconds": round(
+                            _histogram_quantile(
+                                0.95, self.buckets, s.buckets, s.max_seconds
+                            ),
+                            6,
+                        ),
+                        "bytes_sent": s.bytes_sent,
+                        "bytes_received": s.bytes_received,
+                        "retries": s.retries,
+                        "rate_limit_wait_seconds": round(s.rate_limit_wait, 6),
+                        "statuses": dict(s.statuses),
+                        "histogram": list(s.buckets),
+                    }
+                    for (method, endpoint), s in items
+                ],
+            }
+
+    def summary(self) -> str:
+        """A table of calls per endpoint followed by the latency histogram."""
+        data = self.to_dict()
+        rows = data["requests"]
+        if not rows:
+            return "No API requests were made."
+        lines = [
+            f"{'request':<52} {'calls':>6} {'errors':>6} {'p50':>8} {'p95':>8} "
+            f"{'max':>8} {'retries':>7} {'waited':>8}"
+        ]
+        for row in rows:
+            name = f"{row['method']} {row['endpoint']}"
+            lines.append(
+                f"{name:<52} {row['count']:>6} {row['errors']:>6} "
+                f"{_ms(row['p50_seconds']):>8} {_ms(row['p95_seconds']):>8} "
+                f"{_ms(row['max_seconds']):>8} {row['retries']:>7} "
+                f"{row['rate_limit_wait_seconds']:>7.2f}s"
+            )
+
+        totals = [sum(column) for column in zip(*(row["histogram"] for row in rows))]
+        total = sum(totals)
+        widest = max(totals)
+        lines.append("")
+        lines.append(f"Latency of {total} requests:")
+        lower = 0.0
+        for upper, n in zip([*self.buckets, float("inf")], totals):
+            if upper == float("inf"):
+                label = f">{_ms(lower)}"
+            else:
+                label = f"{_ms(lower)}-{_ms(upper)}"
+            bar = "#" * round(40 * n / widest) if widest else ""
+            lines.append(f"  {label:>17} {n:>6} {bar}".rstrip())
+            lower = upper
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        """Write :meth:`to_dict` to ``path`` as JSON."""
+        _write_text(path, json.dumps(self.to_dict(), indent=2) + "\n")
+
+    def write_prometheus(self, path: str, prefix: str = METRIC_PREFIX) -> None:
+        """Write the metrics in the Prometheus text exposition format.
+
+        For the node exporter's textfile collector, ``path`` must end in
+        ``.prom`` and live in the collector's directory.
+        """
+        _write_text(path, self.to_prometheus(prefix))
+
+    def to_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._series.items())
+        duration = f"{prefix}_request_duration_seconds"
+        lines = [
+            f"# HELP {duration} Latency of API requests, retries included.",
+            f"# TYPE {duration} histogram",
+        ]
+        for (method, endpoint), s in items:
+            labels = _labels(method=method, endpoint=endpoint)
+            cumulative = 0
+            for upper, n in zip([*self.buckets, float("inf")], s.buckets):
+                cumulative += n
+                le = "+Inf" if upper == float("inf") else f"{upper:g}"
+                lines.append(f'{duration}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{duration}_sum{{{labels}}} {s.seconds:.6f}")
+            lines.append(f"{duration}_count{{{labels}}} {s.count}")
+
+        counters: list[tuple[str, str, Callable[[_Series], float]]] = [
+            ("request_retries_total", "Retried attempts.", lambda s: s.retries),
+            (
+                "rate_limit_wait_seconds_total",
+                "Time spent waiting for the rate limit.",
+                lambda s: s.rate_limit_wait,
+            ),
+            ("request_bytes_sent_total", "Request body bytes.", lambda s: s.bytes_sent),
+            (
+                "request_bytes_received_total",
+                "Response body bytes.",
+                lambda s: s.bytes_received,
+            ),
+        ]
+        total = f"{prefix}_requests_total"
+        lines += [
+            f"# HELP {total} API requests by final status.",
+            f"# TYPE {total} counter",
+        ]
+        for (method, endpoint), s in items:
+            for status, n in sorted(s.statuses.items()):
+                labels = _labels(method=method, endpoint=endpoint, status=status)
+                lines.append(f"{total}{{{labels}}} {n}")
+        for name, help_text, value in counters:
+            metric = f"{prefix}_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for (method, endpoint), s in items:
+                labels = _labels(method=method, endpoint=endpoint)
+                lines.append(f"{metric}{{{labels}}} {value(s):g}")
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_quantile(
+    q: float, bounds: Sequence[float], counts: Sequence[int], highest: float
+) -> float:
+    total = sum(counts)
+    if total == 0:
+        return 0.0
+    rank = q * total
+    seen = 0
+    lower = 0.0
+    for upper, n in zip([*bounds, highest], counts):
+        if n and seen + n >= rank:
+            upper = min(upper, highest)
+            return lower + (upper - lower) * (rank - seen) / n
+        seen += n
+        lower = upper
+    return highest
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 10 else f"{seconds:.0f}s"
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(
+        f'{name}="{_LABEL_ESCAPES.sub(_escape, value)}"'
+        for name, value in labels.items()
+    )
+
+
+def _escape(match: re.Match[str]) -> str:
+    return "\\n" if match.group() == "\n" else "\\" + match.group()
+
+
+def _write_text(path: str, text: str) -> None:
+    """Replace ``path`` atomically with ``text``, creating its directory."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    write_atomically(path, text)
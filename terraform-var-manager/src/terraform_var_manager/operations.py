@@ -0,0 +1,363 @@
+"""
+Planning and concurrent application of variable create/update/delete operations.
+"""
+from __future__ import annotations
+
+import fnmatch
+import logging
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .api_client import TerraformCloudClient
+from .deadline import Deadline, current_deadline, deadline_scope, submit
+from .exceptions import DeadlineExceeded
+from .ledger import FingerprintLedger
+from .utils import extract_group
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+
+@dataclass
+class VariableOperation:
+    """A single change to apply to one variable of a workspace."""
+
+    action: str
+    key: str
+    payload: dict[str, Any] | None = None
+    variable_id: str | None = None
+
+
+@dataclass
+class OperationResult:
+    """Outcome of applying a :class:`VariableOperation`.
+
+    ``cancelled`` is set when the operation was never sent because the
+    deadline of the operation had passed.
+    """
+
+    operation: VariableOperation
+    success: bool
+    error: str | None = None
+    cancelled: bool = False
+
+
+@dataclass
+class DeleteSummary:
+    """Keys deleted, failed (with the error) and skipped by a bulk delete.
+
+    ``cancelled`` lists the selected keys left alone because the deadline
+    passed before they were deleted.
+    """
+
+    deleted: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+    cancelled: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True when every selected variable was deleted."""
+        return not self.failed and not self.cancelled
+
+
+@dataclass
+class DownloadSummary:
+    """Workspaces written, skipped as up to date and failed by a bulk download.
+
+    ``cancelled`` lists the workspaces not downloaded because the deadline
+    passed; a rerun picks them up.
+    """
+
+    downloaded: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    cancelled: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True when every workspace was downloaded or up to date."""
+        return not self.failed and not self.cancelled
+
+
+@dataclass
+class UploadSummary:
+    """What an upload changed in one workspace.
+
+    ``error`` is set when the workspace could not be planned or applied at
+    all; per-key failures are listed in ``failed``, and keys not sent
+    because the deadline passed in ``cancelled``.
+    """
+
+    workspace_id: str
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+    cancelled: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True when the workspace was fully brought up to date."""
+        return self.error is None and not self.failed and not self.cancelled
+
+    @classmethod
+    def from_results(
+        cls, workspace_id: str, results: list[OperationResult]
+    ) -> UploadSummary:
+        """Sort operation results into the keys of each outcome."""
+        summary = cls(workspace_id)
+        done = {
+            CREATE: summary.created,
+            UPDATE: summary.updated,
+            DELETE: summary.deleted,
+        }
+        for result in results:
+            key = result.operation.key
+            if result.success:
+                done[result.operation.action].append(key)
+            elif result.cancelled:
+                summary.cancelled.append(key)
+            else:
+                summary.failed[key] = result.error or "unknown error"
+        return summary
+
+    def describe(self) -> str:
+        """One-line summary, e.g. for a per-workspace report."""
+        if self.error is not None:
+            return f"{self.workspace_id}: failed ({self.error})"
+        line = (
+            f"{self.workspace_id}: {len(self.created)} created, "
+            f"{len(self.updated)} updated, {len(self.deleted)} deleted"
+        )
+        if self.failed:
+            line += f", {len(self.failed)} failed ({', '.join(sorted(self.failed))})"
+        if self.cancelled:
+            line += f", {len(self.cancelled)} cancelled by the deadline"
+        return line
+
+
+def apply_operations(
+    client: TerraformCloudClient,
+    workspace_id: str,
+    operations: list[VariableOperation],
+    concurrency: int = 1,
+    on_result: Callable[[OperationResult], None] | None = None,
+    deadline: Deadline | None = None,
+) -> list[OperationResult]:
+    """Apply operations with up to ``concurrency`` workers.
+
+    Operations are independent of each other, so they may run in any order,
+    but results are returned in the order of ``operations``. A failing
+    operation is recorded in its result instead of aborting the others.
+    Once ``deadline`` (by default the current deadline, see
+    :func:`deadline_scope`) has passed, the operations not yet started are
+    cancelled instead of sent. ``on_result`` is called as each
+    operation completes, e.g. for progress.
+    """
+    if deadline is None:
+        deadline = current_deadline()
+    if concurrency <= 1 or len(operations) <= 1:
+        results = []
+        for op in operations:
+            result = _apply_one(client, workspace_id, op, deadline)
+            if on_result:
+                on_result(result)
+            results.append(result)
+        return results
+
+    workers = min(concurrency, len(operations))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            submit(executor, _apply_one, client, workspace_id, op, deadline)
+            for op in operations
+        ]
+        if on_result:
+            for future in as_completed(futures):
+                on_result(future.result())
+        return [future.result() for future in futures]
+
+
+def select_variables(
+    variables: Iterable[dict[str, Any]],
+    key_pattern: str | None = None,
+    group: str | None = None,
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """Split variables into those matching the filters and the skipped keys.
+
+    ``key_pattern`` is a shell-style glob matched against the key (e.g.
+    ``preview_*``); ``group`` matches the ``[group]`` tag in the description.
+    Without filters every variable is selected.
+    """
+    selected: list[dict[str, Any]] = []
+    skipped: list[str] = []
+    for var in variables:
+        attributes = var["attributes"]
+        key: str = attributes["key"]
+        if (key_pattern and not fnmatch.fnmatchcase(key, key_pattern)) or (
+            group and extract_group(attributes.get("description")) != group
+        ):
+            skipped.append(key)
+        else:
+            selected.append(var)
+    return selected, skipped
+
+
+def _apply_one(
+    client: TerraformCloudClient,
+    workspace_id: str,
+    op: VariableOperation,
+    deadline: Deadline | None = None,
+) -> OperationResult:
+    """Apply one operation under ``deadline``, capturing any error in the result."""
+    if deadline is not None and deadline.expired:
+        return OperationResult(op, False, str(deadline.error()), cancelled=True)
+    try:
+        with deadline_scope(deadline):
+            if op.action == CREATE:
+                client.create_variable(workspace_id, op.payload or {})
+            elif op.action == UPDATE:
+                client.update_variable(
+                    workspace_id, op.variable_id or "", op.payload or {}
+                )
+            elif op.action == DELETE:
+                if not client.delete_variable(workspace_id, op.variable_id or ""):
+                    return OperationResult(op, False, "deletion was not confirmed")
+            else:
+                return OperationResult(op, False, f"unknown action {op.action!r}")
+    except DeadlineExceeded as e:
+        return OperationResult(op, False, str(e), cancelled=not e.sent)
+    except Exception as e:
+        return OperationResult(op, False, str(e))
+    return OperationResult(op, True)
+
+
+def plan_upload_operations(
+    variables_to_upload: dict[str, dict[str, Any]],
+    existing_vars_dict: dict[str, dict[str, Any]],
+    remove_missing: bool,
+    ledger: FingerprintLedger | None = None,
+    workspace_id: str = "",
+) -> list[VariableOperation]:
+    """Work out the creates, updates and deletes needed for an upload.
+
+    With a ``ledger``, sensitive variables whose value was last uploaded to
+    ``workspace_id`` unchanged are skipped instead of being re-sent.
+    """
+    operations: list[VariableOperation] = []
+    uploaded_keys: set[str] = set()
+
+    for key, var_data in variables_to_upload.items():
+        if var_data["value"] in ["None", "_SECRET"]:
+            logger.info(
+                f"Variable {key} has value '{var_data['value']}', skipping update."
+            )
+            continue
+
+        payload: dict[str, Any] = {
+            "data": {
+                "type": "vars",
+                "attributes": {
+                    "key": key,
+                    "value": var_data["value"],
+                    "description": var_data["description"],
+                    "category": "terraform",
+                    "hcl": var_data["hcl"],
+                    "sensitive": var_data["sensitive"],
+                },
+            }
+        }
+
+        uploaded_keys.add(key)
+
+        if key in existing_vars_dict:
+            existing = existing_vars_dict[key]
+            if ledger and ledger.is_unchanged(
+                workspace_id, key, existing["attributes"], var_data
+            ):
+                logger.info(f"Sensitive variable {key} matches the last upload.")
+                continue
+            if not variable_needs_update(existing["attributes"], var_data):
+                logger.info(f"Variable {key} has not changed.")
+                continue
+            operations.append(VariableOperation(UPDATE, key, payload, existing["id"]))
+        else:
+            operations.append(VariableOperation(CREATE, key, payload))
+
+    # Remove variables not in tfvars if requested
+    if remove_missing:
+        keys_to_delete = set(existing_vars_dict) - uploaded_keys
+        for key in sorted(keys_to_delete):
+            var_id: str = existing_vars_dict[key]["id"]
+            operations.append(VariableOperation(DELETE, key, variable_id=var_id))
+
+    return operations
+
+
+def variable_needs_update(
+    existing_attrs: dict[str, Any], new_data: dict[str, Any]
+) -> bool:
+    """Check if a variable needs to be updated."""
+    if new_data["sensitive"]:
+        logger.info("Variable is sensitive, cannot detect changes. Updating variable.")
+        return True
+
+    return bool(
+        new_data["value"] != existing_attrs["value"]
+        or new_data["hcl"] != existing_attrs["hcl"]
+        or new_data["sensitive"] != existing_attrs["sensitive"]
+        or new_data["description"] != existing_attrs["description"]
+    )
+
+
+def record_uploads(
+    ledger: FingerprintLedger,
+    workspace_id: str,
+    results: list[OperationResult],
+    variables: dict[str, dict[str, Any]],
+) -> None:
+    """Update the ledger with the sensitive values that were uploaded."""
+    for result in results:
+        if not result.success:
+            continue
+        key = result.operation.key
+        if result.operation.action != DELETE and variables[key]["sensitive"]:
+            ledger.record(workspace_id, key, variables[key])
+        else:
+            ledger.forget(workspace_id, key)
+    ledger.save()
+
+
+def report_results(results: list[OperationResult]) -> bool:
+    """Log per-key results in order and return True if all succeeded."""
+    messages = {
+        CREATE: "Variable {key} created successfully.",
+        UPDATE: "Variable {key} updated successfully.",
+        DELETE: "Removed variable not in tfvars: {key}",
+    }
+    failed = [r for r in results if not r.success and not r.cancelled]
+    cancelled = [r for r in results if r.cancelled]
+    for result in results:
+        op = result.operation
+        if result.success:
+            logger.info(messages[op.action].format(key=op.key))
+        elif not result.cancelled:
+            logger.error(f"Failed to {op.action} variable {op.key}: {result.error}")
+
+    if failed:
+        logger.error(
+            f"{len(failed)} of {len(results)} variable operations failed: "
+            + ", ".join(r.operation.key for r in failed)
+        )
+    if cancelled:
+        logger.error(
+            f"{len(cancelled)} of {len(results)} variable operations were not "
+            "sent before the deadline: " + ", ".join(r.operation.key for r in cancelled)
+        )
+    return not failed and not cancelled
@@ -0,0 +1,263 @@
+"""
+Phase-level profiling of manager operations: wall time, CPU time, peak memory
+and API calls per phase, with optional cProfile hotspots.
+"""
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from .metrics import RequestEvent
+from .utils import write_atomically
+
+# Phases of the manager operations, in the order they usually run.
+PARSE = "parse"
+FETCH = "fetch"
+DIFF = "diff"
+APPLY = "apply"
+WRITE = "write"
+# API calls made outside any phase (e.g. resolving workspace names).
+OTHER = "other"
+HOTSPOTS = 20
+
+# The phases open in the running context, innermost last, with the profiler
+# that opened each. Worker threads started with :func:`deadline.submit` run in
+# a copy of their caller's context, so their API calls count in its phase.
+_open_phases: contextvars.ContextVar[tuple[tuple[PhaseProfiler, str], ...]] = (
+    contextvars.ContextVar("terraform_var_manager_phases", default=())
+)
+
+
+@dataclass
+class PhaseStats:
+    """Totals of every run of one phase.
+
+    Phases that run concurrently (e.g. fetching several workspaces) add up
+    their wall time, so it can exceed the wall time of the whole run; in the
+    same way ``api_seconds`` adds up the latency of calls made in parallel.
+    ``peak_memory`` is the highest traced allocation size seen while the
+    phase ran, or None without memory tracing.
+    """
+
+    name: str
+    runs: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    api_calls: int = 0
+    api_seconds: float = 0.0
+    peak_memory: int | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "runs": self.runs,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "api_calls": self.api_calls,
+            "api_seconds": round(self.api_seconds, 6),
+            "peak_memory_bytes": self.peak_memory,
+        }
+
+
+class PhaseProfiler:
+    """Times the phases of a run and attributes API calls to them.
+
+    Managers given a profiler wrap their work in :meth:`phase` (``parse``,
+    ``fetch``, ``diff``, ``apply`` and ``write``). The profiler is also a
+    request hook: each API call is counted in the innermost phase open in
+    the context that made it, or in ``other``. Worker threads started with
+    :func:`~terraform_var_manager.deadline.submit` share their caller's
+    phase, so calls made while several workspaces are processed at once
+    count in the phase of the workspace they belong to.
+
+    With ``trace_memory``, :mod:`tracemalloc` records the peak memory of
+    each phase (at a noticeable cost in speed). With ``cprofile``, the run
+    is profiled with :mod:`cProfile`, which only sees the thread that called
+    :meth:`start`; worker threads are not included. ``operation`` labels the
+    report.
+    """
+
+    def __init__(
+        self,
+        trace_memory: bool = False,
+        cprofile: bool = False,
+        operation: str = "",
+    ) -> None:
+        self.trace_memory = trace_memory
+        self.operation = operation
+        self.phases: dict[str, PhaseStats] = {}
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory: int | None = None
+        self.api_calls = 0
+        self._profile = cProfile.Profile() if cprofile else None
+        self._lock = threading.Lock()
+        self._started: tuple[float, float] | None = None
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Start timing the whole run (and tracing or profiling, if enabled)."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self._profile is not None:
+            self._profile.enable()
+        self._started = (time.perf_counter(), time.process_time())
+
+    def stop(self) -> None:
+        """Stop timing the run; totals are final afterwards."""
+        if self._started is None:
+            return
+        wall, cpu = self._started
+        self.wall_seconds = time.perf_counter() - wall
+        self.cpu_seconds = time.process_time() - cpu
+        self._started = None
+        if self._profile is not None:
+            self._profile.disable()
+        if tracemalloc.is_tracing():
+            self._note_peak(None)
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def __enter__(self) -> PhaseProfiler:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time one run of a phase."""
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # Peaks of phases that overlap this one are noted before the reset.
+            self._note_peak(None)
+            tracemalloc.reset_peak()
+        token = _open_phases.set((*_open_phases.get(), (self, name)))
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            _open_phases.reset(token)
+            with self._lock:
+                stats = self._stats(name)
+                stats.runs += 1
+                stats.wall_seconds += wall
+                stats.cpu_seconds += cpu
+            if tracing and tracemalloc.is_tracing():
+                self._note_peak(name)
+
+    def __call__(self, event: RequestEvent) -> None:
+        name = next(
+            (name for owner, name in reversed(_open_phases.get()) if owner is self),
+            OTHER,
+        )
+        with self._lock:
+            stats = self._stats(name)
+            stats.api_calls += 1
+            stats.api_seconds += event.seconds
+            self.api_calls += 1
+
+    def _stats(self, name: str) -> PhaseStats:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(name)
+        return stats
+
+    def _note_peak(self, name: str | None) -> None:
+        """Record the traced peak for a phase (if given) and for the run."""
+        peak = tracemalloc.get_traced_memory()[1]
+        with self._lock:
+            self.peak_memory = max(self.peak_memory or 0, peak)
+            if name is not None:
+                stats = self._stats(name)
+                stats.peak_memory = max(stats.peak_memory or 0, peak)
+
+    def hotspots(self, limit: int = HOTSPOTS) -> list[dict[str, Any]]:
+        """The functions with the most cumulative time under cProfile."""
+        if self._profile is None:
+            return []
+        stats = pstats.Stats(self._profile)
+        rows = []
+        entries = stats.stats  # type: ignore[attr-defined]
+        for (filename, line, function), entry in entries.items():
+            _, calls, total, cumulative, _ = entry
+            rows.append(
+                {
+                    "function": f"{filename}:{line}({function})",
+                    "calls": calls,
+                    "total_seconds": round(total, 6),
+                    "cumulative_seconds": round(cumulative, 6),
+                }
+            )
+        rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+        return rows[:limit]
+
+    def dump_stats(self, path: str) -> None:
+        """Write the cProfile statistics for ``pstats`` / snakeviz to ``path``."""
+        if self._profile is None:
+            raise ValueError("profiling was not enabled with cprofile=True")
+        self._profile.dump_stats(path)
+
+    def report(self) -> dict[str, Any]:
+        """The whole profile as plain data, e.g. for JSON."""
+        with self._lock:
+            phases = [stats.to_dict() for stats in self.phases.values()]
+        return {
+            "operation": self.operation,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_memory_bytes": self.peak_memory,
+            "api_calls": self.api_calls,
+            "phases": phases,
+            "hotspots": self.hotspots(),
+        }
+
+    def summary(self) -> str:
+        """A table of the phases followed by the run totals."""
+        report = self.report()
+        lines = [
+            f"{'phase':<8} {'runs':>5} {'wall':>9} {'cpu':>9} {'api calls':>9} "
+            f"{'api time':>9} {'peak mem':>9}"
+        ]
+        for p in report["phases"]:
+            lines.append(
+                f"{p['name']:<8} {p['runs']:>5} {p['wall_seconds']:>8.3f}s "
+                f"{p['cpu_seconds']:>8.3f}s {p['api_calls']:>9} "
+                f"{p['api_seconds']:>8.3f}s {_size(p['peak_memory_bytes']):>9}"
+            )
+        lines.append(
+            f"{'total':<8} {'':>5} {report['wall_seconds']:>8.3f}s "
+            f"{report['cpu_seconds']:>8.3f}s {report['api_calls']:>9} "
+            f"{'':>9} {_size(report['peak_memory_bytes']):>9}"
+        )
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        """Write :meth:`report` to ``path`` as JSON, atomically."""
+        write_atomically(path, json.dumps(self.report(), indent=2) + "\n")
+
+
+def _size(size: int | None) -> str:
+    if size is None:
+        return "-"
+    amount = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if amount < 1024:
+            return f"{amount:.0f}{unit}"
+        amount /= 1024
+    return f"{amount:.1f}GiB"
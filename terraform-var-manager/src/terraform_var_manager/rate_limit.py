@@ -0,0 +1,139 @@
+"""
+Token-bucket rate limiting for Terraform Cloud API requests.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable
+
+DEFAULT_RATE_LIMIT = 30.0
+
+
+class RateLimiter:
+    """Thread-safe token bucket that paces requests to a per-second budget.
+
+    Every request takes one token; tokens refill continuously at ``rate`` per
+    second up to ``burst``. The bucket also follows what the server reports:
+    ``X-RateLimit-*`` headers shrink the local budget when the server has seen
+    more traffic than this process (e.g. other jobs sharing the token), and a
+    429 ``Retry-After`` pauses every caller sharing the limiter.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE_LIMIT,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] | None = None,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else rate)
+        self._clock = clock
+        self._sleep = sleep or time.sleep
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self.server_limit: float | None = None
+        self.server_remaining: float | None = None
+
+    @property
+    def available(self) -> float:
+        """Tokens that can be spent right now without waiting."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if now < self._paused_until:
+                return 0.0
+            return max(self._tokens, 0.0)
+
+    def acquire(self, timeout: float | None = None) -> float:
+        """Take one token, sleeping until it is available. Returns the wait.
+
+        When the token would take longer than ``timeout`` seconds, it is
+        given back and :class:`TimeoutError` is raised without waiting.
+        """
+        wait = self.reserve()
+        if timeout is not None and wait > timeout:
+            with self._lock:
+                self._tokens += 1
+            raise TimeoutError(f"rate limit wait of {wait:.2f}s exceeds {timeout:g}s")
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def reserve(self) -> float:
+        """Take one token without sleeping; return how long the caller must wait.
+
+        Used by callers that wait their own way, such as ``asyncio.sleep``.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            # Refills restart at ``_updated``, which is in the future while paused.
+            return max(self._updated - now, 0.0) + max(-self._tokens / self.rate, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (e.g. after a 429)."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._updated = max(self._updated, self._paused_until)
+
+    def observe(self, headers: Mapping[str, Any]) -> None:
+        """Reconcile the bucket with the server's ``X-RateLimit-*`` headers."""
+        limit = _header_float(headers, "X-RateLimit-Limit")
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        reset = _header_float(headers, "X-RateLimit-Reset")
+        if limit is None and remaining is None:
+            return
+
+        with self._lock:
+            if limit is not None and limit > 0:
+                self.server_limit = limit
+                self.rate = min(self.rate, limit)
+                self.burst = min(self.burst, limit)
+            if remaining is not None:
+                self.server_remaining = remaining
+                self._refill(self._clock())
+                self._tokens = min(self._tokens, remaining)
+        if remaining is not None and remaining < 1 and reset:
+            self.pause(reset)
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self._updated, 0.0)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = max(self._updated, now)
+
+
+def retry_after_seconds(headers: Mapping[str, Any]) -> float | None:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    value = headers.get("Retry-After")
+    if not isinstance(value, str):
+        return None
+    seconds = _header_float(headers, "Retry-After")
+    if seconds is not None:
+        return max(seconds, 0.0)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def _header_float(headers: Mapping[str, Any], name: str) -> float | None:
+    value = headers.get(name)
+    if not isinstance(value, (str, int, float)):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,122 @@
+"""
+Retry policy and statistics for transient Terraform Cloud API failures.
+"""
+from __future__ import annotations
+
+import random
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+import requests
+
+DEFAULT_RETRY_STATUSES = frozenset({500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "PATCH", "DELETE"})
+MAX_ATTEMPT_RECORDS = 1000
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how long to wait before retrying a failed request.
+
+    Idempotent methods are retried on connection errors, timeouts and the
+    statuses in ``retry_statuses``. POST is only retried when the request
+    cannot have reached the server (a connect timeout), because a lost
+    response could otherwise create the variable twice; set ``retry_post`` to
+    retry it like the other methods. Waits use exponential backoff with full
+    jitter, and no retry is started once ``deadline`` seconds have passed
+    since the first attempt.
+    """
+
+    max_attempts: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    deadline: float | None = 120.0
+    retry_statuses: frozenset[int] = DEFAULT_RETRY_STATUSES
+    retry_post: bool = False
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait after the given (1-based) failed attempt."""
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def retries_status(self, method: str, status_code: int) -> bool:
+        """Whether a response with this status may be retried."""
+        return status_code in self.retry_statuses and self.retries_method(method)
+
+    def retries_error(self, method: str, error: requests.RequestException) -> bool:
+        """Whether a request that raised ``error`` may be retried."""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return self.retries_method(method)
+        return False
+
+    def retries_method(self, method: str) -> bool:
+        """Whether a request that may have reached the server can be resent."""
+        return method.upper() in IDEMPOTENT_METHODS or self.retry_post
+
+
+@dataclass(frozen=True)
+class AttemptRecord:
+    """One HTTP attempt: what was sent, how it ended and the wait that followed."""
+
+    method: str
+    url: str
+    attempt: int
+    outcome: str
+    delay: float = 0.0
+
+
+@dataclass
+class RetryStats:
+    """Thread-safe counters of attempts, retries and give-ups for a client.
+
+    The most recent attempts are kept in ``records`` (bounded, oldest dropped
+    first); ``reasons`` counts every retried or failed outcome by status code
+    or exception name.
+    """
+
+    attempts: int = 0
+    retries: int = 0
+    gave_up: int = 0
+    backoff_seconds: float = 0.0
+    reasons: Counter[str] = field(default_factory=Counter)
+    records: deque[AttemptRecord] = field(
+        default_factory=lambda: deque(maxlen=MAX_ATTEMPT_RECORDS)
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        attempt: int,
+        outcome: str,
+        delay: float | None = None,
+        gave_up: bool = False,
+    ) -> None:
+        """Record an attempt. ``delay`` is set when the attempt will be retried."""
+        with self._lock:
+            self.attempts += 1
+            if delay is not None:
+                self.retries += 1
+                self.backoff_seconds += delay
+                self.reasons[outcome] += 1
+            if gave_up:
+                self.gave_up += 1
+                self.reasons[outcome] += 1
+            self.records.append(
+                AttemptRecord(method, url, attempt, outcome, delay or 0.0)
+            )
+
+    def summary(self) -> dict[str, object]:
+        """Return the counters as a plain dict (e.g. for logging or JSON)."""
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "gave_up": self.gave_up,
+                "backoff_seconds": round(self.backoff_seconds, 3),
+                "reasons": dict(self.reasons),
+            }
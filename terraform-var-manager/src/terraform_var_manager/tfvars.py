@@ -0,0 +1,151 @@
+"""
+Streaming parser for .tfvars files with inline metadata comments.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .cache import ParseCache
+
+STDIN = "-"
+# Bump whenever a change to the parser changes its output for some input, so
+# that cached parse results from older versions are not reused.
+PARSER_VERSION = 1
+
+
+@dataclass
+class _Tags:
+    """Metadata collected from the ``# [group], tag, ...`` comments of a variable."""
+
+    group: str = "default"
+    sensitive: bool = False
+    hcl: bool = False
+    keep: bool = False
+    mline: bool = False
+
+    def update(self, comment: str) -> None:
+        """Add the comma-separated tags of one comment."""
+        for tag in (t.strip() for t in comment.split(",")):
+            if tag == "sensitive":
+                self.sensitive = True
+            elif tag == "hcl":
+                self.hcl = True
+            elif tag == "keep_in_all_workspaces":
+                self.keep = True
+            elif tag == "mline":
+                self.mline = True
+            elif tag.startswith("[") and tag.endswith("]"):
+                self.group = tag[1:-1].strip()
+
+    def description(self) -> str:
+        parts = [f"[{self.group}]"] if self.group else []
+        if self.keep:
+            parts.append("keep_in_all_workspaces")
+        if self.mline:
+            parts.append("mline")
+        return ", ".join(parts)
+
+
+def iter_tfvars(lines: Iterable[str]) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yield ``(key, variable)`` pairs from the lines of a .tfvars file.
+
+    ``lines`` may be an open file, ``sys.stdin`` or any iterable of lines;
+    it is read once, front to back, and only the variable being parsed is
+    held in memory. Each variable is a dict with ``value``, ``description``,
+    ``sensitive`` and ``hcl``, as expected by the upload planner. A key that
+    appears twice is yielded twice; the last one wins when collected in a dict.
+
+    A value of ``begin`` opens a multiline block that runs until a line
+    reading ``end`` (optionally followed by a tag comment). An hcl variable
+    whose value is the bare word ``begin`` is not a block unless it is also
+    tagged ``mline``.
+    """
+    source = iter(lines)
+    for raw in source:
+        line = raw.strip()
+
+        # Skip comments, empty lines and anything that is not an assignment
+        if line.startswith("#") or "=" not in line:
+            continue
+        key_value, *comment = line.split("#")
+        key_part, equals, value_part = key_value.partition("=")
+        if not equals:
+            continue
+        key = key_part.strip()
+        value = value_part.strip()
+
+        tags = _Tags()
+        if comment:
+            tags.update(comment[0])
+
+        if tags.mline or (value == "begin" and not tags.hcl):
+            tags.mline = True
+            value = _read_block(source, tags)
+        else:
+            value = value.strip('"')
+
+        yield (
+            key,
+            {
+                "value": value,
+                "description": tags.description(),
+                "sensitive": tags.sensitive,
+                "hcl": tags.hcl,
+            },
+        )
+
+
+def _read_block(source: Iterator[str], tags: _Tags) -> str:
+    """Consume the lines of a ``begin ... end`` block and return its value.
+
+    Tags in a comment on the ``end`` line are added to ``tags``.
+    """
+    content: list[str] = []
+    for raw in source:
+        stripped = raw.strip()
+        # Only a line that *is* 'end' (maybe with tags) closes the block
+        if stripped == "end" or (stripped.startswith("end ") and "#" in stripped):
+            _, *end_comment = stripped.split("#")
+            if end_comment:
+                tags.update(end_comment[0])
+            break
+        content.append(raw[:-1] if raw.endswith("\n") else raw)
+    return "\n".join(content)
+
+
+def load_tfvars(
+    path: str, cache: ParseCache | None = None
+) -> dict[str, dict[str, Any]]:
+    """Parse a .tfvars file (``-`` for stdin) into variables keyed by name.
+
+    With a ``cache``, a file whose content was parsed before is not parsed
+    again. Standard input is always parsed.
+    """
+    if path == STDIN:
+        return dict(iter_tfvars(sys.stdin))
+    if cache is None:
+        with open(path) as file:
+            return dict(iter_tfvars(file))
+
+    with open(path, "rb") as binary:
+        content = binary.read()
+    digest = content_digest(content)
+    variables = cache.get(digest)
+    if variables is None:
+        # Decode like open() in text mode: locale encoding, universal newlines
+        variables = dict(iter_tfvars(io.TextIOWrapper(io.BytesIO(content))))
+        cache.put(digest, variables)
+    return variables
+
+
+def content_digest(content: bytes) -> str:
+    """Key of a parse result: the file content and the parser version."""
+    digest = hashlib.sha256(f"tfvars-parser-{PARSER_VERSION}\0".encode())
+    digest.update(content)
+    return digest.hexdigest()
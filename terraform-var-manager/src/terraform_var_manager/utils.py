@@ -3,11 +3,20 @@ Utility functions for Terraform variable management.
 """
 from __future__ import annotations
 
+import io
 import logging
-from typing import Any
+import os
+import sys
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, TextIO
 
 logger = logging.getLogger(__name__)
 
+# Seconds a bulk download file counts as up to date, so a rerun skips it.
+DEFAULT_MAX_AGE = 3600.0
+
 
 def extract_group(description: str | None) -> str:
     """Extract group name from variable description."""
@@ -54,6 +63,74 @@ def format_var_line(
 
 def group_and_format_vars_for_tfvars(variables_dict: dict[str, Any]) -> str:
     """Group and format variables for .tfvars output."""
+    buffer = io.StringIO()
+    write_tfvars(variables_dict, buffer)
+    return buffer.getvalue()
+
+
+def write_tfvars(variables_dict: dict[str, Any], out: TextIO) -> None:
+    """Write variables in .tfvars format straight to ``out``.
+
+    Produces exactly the text of :func:`group_and_format_vars_for_tfvars`:
+    groups in sorted order, each under a header, with its lines sorted. Each
+    formatted line is written as is, so large values are not copied into one
+    big string first.
+    """
+    for index, (group, var_lines) in enumerate(_group_var_lines(variables_dict)):
+        if index:
+            out.write("\n\n")
+        out.write(f"# {'=' * 10} {group} {'=' * 10}\n")
+        for line_number, var_line in enumerate(var_lines):
+            if line_number:
+                out.write("\n")
+            out.write(var_line)
+
+
+@contextmanager
+def open_output(path: str) -> Iterator[TextIO]:
+    """Open ``path`` for writing, or use stdout (left open) when it is ``-``."""
+    if path == "-":
+        yield sys.stdout
+        sys.stdout.flush()
+    else:
+        with open(path, "w") as f:
+            yield f
+
+
+def write_atomically(
+    path: str,
+    content: str | Callable[[TextIO], object],
+    mode: int = 0o644,
+) -> None:
+    """Replace ``path`` with ``content`` so that it never exists half-written.
+
+    ``content`` is the text, or a callable that writes it to the open file,
+    so large files can be streamed instead of built in memory first. The file
+    is written to a temporary file in the same directory, given the
+    permission bits ``mode`` (``0o600`` for anything holding secrets) and
+    renamed over ``path``. On failure the temporary file is removed and any
+    previous ``path`` is left as it was.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                content(f)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _group_var_lines(variables_dict: dict[str, Any]) -> list[tuple[str, list[str]]]:
+    """Format every variable and return the sorted lines of each group, in order."""
     grouped_vars: dict[str, list[str]] = {}
     for key, var in variables_dict.items():
         sensitive: bool = var["attributes"]["sensitive"]
@@ -73,10 +150,4 @@ def group_and_format_vars_for_tfvars(variables_dict: dict[str, Any]) -> str:
     for group in grouped_vars:
         grouped_vars[group].sort()
 
-    tfvars_content = ""
-    for group, vars_list in sorted(grouped_vars.items()):
-        tfvars_content += f"\n# {'=' * 10} {group} {'=' * 10}\n"
-        for var_line in vars_list:
-            tfvars_content += f"{var_line}\n"
-
-    return tfvars_content.strip()
+    return sorted(grouped_vars.items())
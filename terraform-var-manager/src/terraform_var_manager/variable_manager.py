@@ -3,151 +3,501 @@ High-level variable management operations.
 """
 from __future__ import annotations
 
+import fnmatch
+import functools
 import logging
-from typing import Any
-
-from .api_client import TerraformCloudClient
-from .utils import group_and_format_vars_for_tfvars
+import os
+import time
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from types import TracebackType
+from typing import Any, Callable, TypeVar, cast
+
+from .api_client import DEFAULT_POOL_SIZE, TerraformCloudClient
+from .cache import ParseCache, SnapshotCache
+from .changeset import Changeset, remote_digest
+from .deadline import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    Deadline,
+    current_deadline,
+    deadline_scope,
+    submit,
+)
+from .exceptions import DeadlineExceeded
+from .ledger import FingerprintLedger
+from .metrics import RequestHook
+from .operations import (
+    DELETE,
+    DeleteSummary,
+    DownloadSummary,
+    OperationResult,
+    UploadSummary,
+    VariableOperation,
+    apply_operations,
+    plan_upload_operations,
+    record_uploads,
+    report_results,
+    select_variables,
+)
+from .profiling import APPLY, DIFF, FETCH, PARSE, WRITE, PhaseProfiler
+from .tfvars import load_tfvars
+from .utils import DEFAULT_MAX_AGE, open_output, write_atomically, write_tfvars
+from .workspace_index import WorkspaceIndex
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+# Minimum number of workspaces fetched at once by multi-workspace operations;
+# the client's rate limiter keeps the combined request rate within budget.
+FETCH_WORKERS = 8
+
+
+def _within_deadline(method: _F) -> _F:
+    """Run a manager operation under a new deadline of ``operation_timeout``.
+
+    The deadline is set for the calling context only (see
+    :func:`deadline_scope`), so concurrent operations on the same manager
+    or client keep their own. Operations started by another operation share
+    the caller's deadline.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: VariableManager, *args: Any, **kwargs: Any) -> Any:
+        if self.operation_timeout is None or current_deadline() is not None:
+            return method(self, *args, **kwargs)
+        with deadline_scope(Deadline(self.operation_timeout)):
+            return method(self, *args, **kwargs)
+
+    return cast(_F, wrapper)
+
 
 class VariableManager:
-    """High-level manager for Terraform variable operations."""
+    """High-level manager for Terraform variable operations.
 
-    def __init__(self, client: TerraformCloudClient | None = None) -> None:
-        """Initialize with an API client."""
-        self.client = client or TerraformCloudClient()
+    Methods taking a workspace ID also accept a variable set ID
+    (``varset-...``), so a variable set is downloaded, uploaded, compared
+    and cleaned up exactly like a workspace.
 
+    With an ``operation_timeout``, every operation must finish within that
+    many seconds. The deadline is shared by the operation's retries, rate
+    limit waits and parallel workers; when it passes, requests in flight
+    time out, work not yet started is cancelled, and the returned summary
+    (or the log, for operations returning a bool) shows what was done.
+    """
+
+    def __init__(
+        self,
+        client: TerraformCloudClient | None = None,
+        concurrency: int = 1,
+        cache: SnapshotCache | None = None,
+        ledger: FingerprintLedger | None = None,
+        workspace_index: WorkspaceIndex | None = None,
+        parse_cache: ParseCache | None = None,
+        hooks: Iterable[RequestHook] | None = None,
+        profiler: PhaseProfiler | None = None,
+        operation_timeout: float | None = None,
+        connect_timeout: float | None = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float | None = DEFAULT_READ_TIMEOUT,
+    ) -> None:
+        """Initialize with an API client.
+
+        All operations share the client's pooled session. A client created here
+        is owned by the manager and closed by :meth:`close`; an injected client
+        is left open so it can be reused across managers and workspaces.
+        ``concurrency`` bounds the number of variable writes in flight at once;
+        a client created here gets a connection pool large enough for every
+        request the manager can have in flight, so none pays a new handshake.
+        ``cache``, ``workspace_index``, the request ``hooks`` and the
+        ``connect_timeout`` / ``read_timeout`` of each request are given to a
+        client created here.
+        ``ledger`` lets uploads skip sensitive variables that have not changed.
+        ``parse_cache`` lets uploads and plans skip parsing unchanged files.
+        A ``profiler`` times the parse, fetch, diff, apply and write phases
+        of every operation; it is also added to the hooks of a client created
+        here so that it can count API calls per phase.
+        ``operation_timeout`` is the deadline of each operation, in seconds.
+        """
+        if operation_timeout is not None and operation_timeout <= 0:
+            raise ValueError("operation_timeout must be positive")
+        self._owns_client = client is None
+        self.concurrency = max(1, concurrency)
+        if profiler is not None:
+            hooks = [*(hooks or ()), profiler]
+        self.client = client or TerraformCloudClient(
+            pool_size=_pool_size(self.concurrency),
+            cache=cache,
+            workspace_index=workspace_index,
+            hooks=hooks,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self.ledger = ledger
+        self.parse_cache = parse_cache
+        self.profiler = profiler
+        self.operation_timeout = operation_timeout
+
+    def __enter__(self) -> VariableManager:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the API client if this manager created it."""
+        if self._owns_client:
+            self.client.close()
+
+    @_within_deadline
     def download_variables(
         self, workspace_id: str, output_file: str = "variables.tfvars"
     ) -> bool:
         """Download variables from a workspace to a .tfvars file."""
         try:
-            variables = self.client.get_variables(workspace_id)
-            vars_dict = {var["attributes"]["key"]: var for var in variables}
-            tfvars_content = group_and_format_vars_for_tfvars(vars_dict)
-
-            with open(output_file, "w") as f:
-                f.write(tfvars_content)
+            vars_dict = self._fetch_variables(workspace_id)
+            with self._phase(WRITE), open_output(output_file) as f:
+                write_tfvars(vars_dict, f)
 
-            logger.info(f"Downloaded {len(variables)} variables to {output_file}")
+            logger.info(f"Downloaded {len(vars_dict)} variables to {output_file}")
             return True
         except Exception as e:
             logger.error(f"Download failed: {e}")
             return False
 
+    @_within_deadline
+    def download_workspaces(
+        self,
+        workspaces: Mapping[str, str],
+        output_dir: str,
+        max_age: float | None = DEFAULT_MAX_AGE,
+    ) -> DownloadSummary:
+        """Download many workspaces concurrently, one .tfvars file each.
+
+        ``workspaces`` maps workspace IDs to file names inside ``output_dir``.
+        Fetches run in parallel under the client's rate limiter. Files are
+        written atomically, so an existing file is always a complete download:
+        a rerun after an interruption skips every file written less than
+        ``max_age`` seconds ago (an hour by default, as on the CLI; any
+        existing file when ``max_age`` is None) and only fetches the rest.
+        Workspaces not downloaded before the deadline are listed as cancelled.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        started = time.time()
+        summary = DownloadSummary()
+
+        def download(workspace_id: str) -> str | None:
+            """Return None when written, "skipped", "cancelled" or the error."""
+            path = os.path.join(output_dir, workspaces[workspace_id])
+            if _is_up_to_date(path, max_age, started):
+                return "skipped"
+            deadline = current_deadline()
+            if deadline is not None and deadline.expired:
+                return "cancelled"
+            try:
+                vars_dict = self._fetch_variables(workspace_id)
+                with self._phase(WRITE):
+                    _write_tfvars_atomically(path, vars_dict)
+            except DeadlineExceeded:
+                return "cancelled"
+            except Exception as e:
+                return str(e) or type(e).__name__
+            return None
+
+        for workspace_id, outcome in zip(
+            workspaces, self._map_workspaces(download, list(workspaces))
+        ):
+            if outcome is None:
+                summary.downloaded.append(workspace_id)
+            elif outcome == "skipped":
+                summary.skipped.append(workspace_id)
+            elif outcome == "cancelled":
+                summary.cancelled.append(workspace_id)
+            else:
+                summary.failed[workspace_id] = outcome
+                logger.error(f"Failed to download {workspace_id}: {outcome}")
+
+        logger.info(
+            f"Downloaded {len(summary.downloaded)} workspaces to {output_dir}, "
+            f"skipped {len(summary.skipped)} up to date, "
+            f"{len(summary.failed)} failed."
+        )
+        if summary.cancelled:
+            logger.error(
+                f"{len(summary.cancelled)} workspaces were not downloaded before "
+                "the deadline; run again to download them."
+            )
+        return summary
+
+    @_within_deadline
+    def download_organization(
+        self,
+        organization: str,
+        output_dir: str,
+        name_pattern: str | None = None,
+        max_age: float | None = DEFAULT_MAX_AGE,
+    ) -> DownloadSummary:
+        """Download every workspace of an organization into ``output_dir``.
+
+        ``name_pattern`` is a shell-style glob on workspace names; files are
+        named ``<workspace name>.tfvars``. See :meth:`download_workspaces`.
+        """
+        workspaces = {
+            ws["id"]: f"{ws['attributes']['name']}.tfvars"
+            for ws in self.client.iter_workspaces(organization)
+            if not name_pattern
+            or fnmatch.fnmatchcase(ws["attributes"]["name"], name_pattern)
+        }
+        return self.download_workspaces(workspaces, output_dir, max_age)
+
+    @_within_deadline
     def upload_variables(
         self,
         workspace_id: str,
         tfvars_file: str,
         remove_missing: bool = False,
+        force_resync: bool = False,
     ) -> bool:
-        """Upload variables from a .tfvars file to a workspace."""
+        """Upload variables from a .tfvars file to a workspace.
+
+        Creates, updates and (with ``remove_missing``) deletes are applied with
+        up to ``self.concurrency`` parallel workers. A failing key does not stop
+        the others; the upload returns False if any key failed.
+
+        With a ``ledger``, sensitive variables uploaded before with the same
+        value, description and hcl flag are not sent again; ``force_resync``
+        sends them anyway and refreshes the ledger.
+        """
         try:
-            # Parse .tfvars file
-            variables_to_upload = self._parse_tfvars_file(tfvars_file)
+            changeset = self.plan_upload(
+                workspace_id, tfvars_file, remove_missing, force_resync
+            )
+            return self._apply(changeset)
 
-            # Get existing variables
-            existing_vars = self.client.get_variables(workspace_id)
-            existing_vars_dict: dict[str, dict[str, Any]] = {
-                var["attributes"]["key"]: var for var in existing_vars
-            }
+        except Exception as e:
+            logger.error(f"Upload failed: {e}")
+            return False
 
-            uploaded_keys: set[str] = set()
+    @_within_deadline
+    def plan_upload(
+        self,
+        workspace_id: str,
+        tfvars_file: str,
+        remove_missing: bool = False,
+        force_resync: bool = False,
+    ) -> Changeset:
+        """Work out what :meth:`upload_variables` would change, without writing.
+
+        The returned :class:`Changeset` can be inspected, saved with
+        :meth:`Changeset.save` and applied later with :meth:`apply_changeset`.
+        Errors reading the file or the workspace are raised.
+        """
+        variables_to_upload = self._parse(tfvars_file)
+        return self._plan(
+            workspace_id, variables_to_upload, remove_missing, force_resync
+        )
 
-            # Process each variable
-            for key, var_data in variables_to_upload.items():
-                if var_data["value"] in ["None", "_SECRET"]:
-                    logger.info(
-                        f"Variable {key} has value '{var_data['value']}', "
-                        "skipping update."
-                    )
-                    continue
-
-                payload: dict[str, Any] = {
-                    "data": {
-                        "type": "vars",
-                        "attributes": {
-                            "key": key,
-                            "value": var_data["value"],
-                            "description": var_data["description"],
-                            "category": "terraform",
-                            "hcl": var_data["hcl"],
-                            "sensitive": var_data["sensitive"],
-                        },
-                    }
-                }
-
-                uploaded_keys.add(key)
-
-                if key in existing_vars_dict:
-                    # Update existing variable
-                    existing = existing_vars_dict[key]
-                    if not self._variable_needs_update(
-                        existing["attributes"], var_data
-                    ):
-                        logger.info(f"Variable {key} has not changed.")
-                        continue
-
-                    var_id: str = existing["id"]
-                    self.client.update_variable(workspace_id, var_id, payload)
-                    logger.info(f"Variable {key} updated successfully.")
-                else:
-                    # Create new variable
-                    self.client.create_variable(workspace_id, payload)
-                    logger.info(f"Variable {key} created successfully.")
-
-            # Remove variables not in tfvars if requested
-            if remove_missing:
-                remote_keys = set(existing_vars_dict.keys())
-                keys_to_delete = remote_keys - uploaded_keys
-                for key in keys_to_delete:
-                    var_id = existing_vars_dict[key]["id"]
-                    if self.client.delete_variable(workspace_id, var_id):
-                        logger.info(f"Removed variable not in tfvars: {key}")
-                    else:
-                        logger.error(f"Failed to remove variable {key}")
+    def _plan(
+        self,
+        workspace_id: str,
+        variables_to_upload: dict[str, dict[str, Any]],
+        remove_missing: bool,
+        force_resync: bool,
+    ) -> Changeset:
+        """Plan the upload of already parsed variables to one workspace.
+
+        The plan is made against the live variables, never a cached snapshot,
+        so its creates, updates and deletes match the workspace.
+        """
+        existing_vars_dict = self._fetch_variables(workspace_id, use_cache=False)
+
+        with self._phase(DIFF):
+            operations = plan_upload_operations(
+                variables_to_upload,
+                existing_vars_dict,
+                remove_missing,
+                ledger=None if force_resync else self.ledger,
+                workspace_id=workspace_id,
+            )
+            digest = remote_digest(existing_vars_dict)
+        return Changeset(workspace_id, operations, digest)
 
-            return True
+    @_within_deadline
+    def plan_uploads(
+        self,
+        targets: Mapping[str, str],
+        remove_missing: bool = False,
+        force_resync: bool = False,
+    ) -> dict[str, Changeset]:
+        """Plan uploads for many workspaces concurrently.
+
+        ``targets`` maps workspace IDs to tfvars files; each distinct file is
+        parsed once, and errors reading one are raised. Planning only reads
+        from the API, so many workspaces are planned at once under the
+        client's rate limiter. Workspaces that could not be planned are
+        logged and left out of the result.
+        """
+        parsed = {path: self._parse(path) for path in set(targets.values())}
+
+        def plan(workspace_id: str) -> Changeset | None:
+            try:
+                return self._plan(
+                    workspace_id,
+                    parsed[targets[workspace_id]],
+                    remove_missing,
+                    force_resync,
+                )
+            except Exception as e:
+                logger.error(f"Planning failed for {workspace_id}: {e}")
+                return None
+
+        plans = self._map_workspaces(plan, list(targets))
+        return {
+            changeset.workspace_id: changeset
+            for changeset in plans
+            if changeset is not None
+        }
+
+    @_within_deadline
+    def apply_changeset(self, changeset: Changeset, verify: bool = True) -> bool:
+        """Apply a planned changeset; returns True when every operation succeeded.
+
+        With ``verify``, the workspace is listed again first and the changeset
+        is refused if the remote variables no longer match the ones it was
+        planned from. An empty changeset is not applied or verified.
+        """
+        try:
+            if changeset.is_empty:
+                logger.info(f"No changes to apply to {changeset.workspace_id}.")
+                return True
+            if verify and changeset.remote_digest:
+                current = self._fetch_variables(changeset.workspace_id, use_cache=False)
+                if remote_digest(current) != changeset.remote_digest:
+                    logger.error(
+                        f"Workspace {changeset.workspace_id} changed since the plan "
+                        "was made; plan again before applying."
+                    )
+                    return False
+            return self._apply(changeset)
 
         except Exception as e:
-            logger.error(f"Upload failed: {e}")
+            logger.error(f"Apply failed: {e}")
             return False
 
+    @_within_deadline
+    def upload_to_workspaces(
+        self,
+        workspace_ids: list[str],
+        tfvars_file: str,
+        remove_missing: bool = False,
+        force_resync: bool = False,
+    ) -> dict[str, UploadSummary]:
+        """Upload one tfvars file to many workspaces at once.
+
+        The file is parsed once. Every workspace is then fetched, planned and
+        applied concurrently, all through this manager's client so that one
+        rate limiter paces the whole fan-out; within a workspace up to
+        ``self.concurrency`` writes run in parallel. A workspace that fails
+        does not stop the others. Returns a summary per workspace, in the
+        order given, and logs them as one report.
+        """
+        variables_to_upload = self._parse(tfvars_file)
+
+        def sync(workspace_id: str) -> UploadSummary:
+            try:
+                changeset = self._plan(
+                    workspace_id, variables_to_upload, remove_missing, force_resync
+                )
+                return UploadSummary.from_results(
+                    workspace_id, self._apply_operations(changeset)
+                )
+            except Exception as e:
+                return UploadSummary(workspace_id, error=str(e))
+
+        summaries = self._map_workspaces(sync, workspace_ids)
+        _log_upload_summaries(summaries)
+        return {summary.workspace_id: summary for summary in summaries}
+
+    def _apply(self, changeset: Changeset) -> bool:
+        """Run a changeset's operations and report the results."""
+        return report_results(self._apply_operations(changeset))
+
+    def _apply_operations(self, changeset: Changeset) -> list[OperationResult]:
+        """Run a changeset's operations and record uploaded secrets in the ledger."""
+        workspace_id = changeset.workspace_id
+        with self._phase(APPLY):
+            results = apply_operations(
+                self.client,
+                workspace_id,
+                changeset.operations,
+                self.concurrency,
+            )
+        if self.ledger:
+            uploaded = {
+                op.key: op.payload["data"]["attributes"]
+                for op in changeset.operations
+                if op.payload
+            }
+            record_uploads(self.ledger, workspace_id, results, uploaded)
+        return results
+
+    @_within_deadline
     def compare_workspaces(
         self,
         workspace1_id: str,
         workspace2_id: str,
         output_file: str = "comparison.tfvars",
     ) -> bool:
-        """Compare variables between two workspaces."""
-        try:
-            vars1 = self.client.get_variables(workspace1_id)
-            vars2 = self.client.get_variables(workspace2_id)
+        """Compare variables between two workspaces.
 
-            vars1_dict: dict[str, dict[str, Any]] = {
-                v["attributes"]["key"]: v for v in vars1
-            }
-            vars2_dict: dict[str, dict[str, Any]] = {
-                v["attributes"]["key"]: v for v in vars2
-            }
+        Both workspaces (with all their pages) are fetched concurrently.
+        """
+        return self._compare([workspace1_id, workspace2_id], output_file)
 
-            all_keys = set(vars1_dict.keys()).union(vars2_dict.keys())
-            merged_vars: dict[str, dict[str, Any]] = {}
-
-            for key in sorted(all_keys):
-                v1 = vars1_dict.get(key)
-                v2 = vars2_dict.get(key)
+    @_within_deadline
+    def compare_workspace_matrix(
+        self,
+        workspace_ids: list[str],
+        output_file: str = "comparison.tfvars",
+    ) -> bool:
+        """Compare variables across any number of workspaces in one report.
+
+        Every workspace is fetched once, concurrently, and each key is merged
+        in a single pass over the workspaces, so the work grows linearly with
+        the number of workspaces. Values appear in ``workspace_ids`` order,
+        which is recorded in a header comment.
+        """
+        header = "# Workspaces: " + " |<->| ".join(workspace_ids) + "\n\n"
+        return self._compare(workspace_ids, output_file, header)
+
+    def _compare(
+        self, workspace_ids: list[str], output_file: str, header: str = ""
+    ) -> bool:
+        """Fetch, merge and write a comparison of the given workspaces."""
+        try:
+            workspaces = self._fetch_workspaces(workspace_ids)
 
-                merged_var = self._merge_variable_for_comparison(v1, v2, key)
-                if merged_var:
-                    merged_vars[key] = merged_var
+            with self._phase(DIFF):
+                all_keys: set[str] = set().union(*workspaces)
+                merged_vars: dict[str, dict[str, Any]] = {}
 
-            tfvars_content = group_and_format_vars_for_tfvars(merged_vars)
+                for key in sorted(all_keys):
+                    merged_var = self._merge_variables_for_comparison(
+                        [variables.get(key) for variables in workspaces], key
+                    )
+                    if merged_var:
+                        merged_vars[key] = merged_var
 
-            with open(output_file, "w") as f:
-                f.write(tfvars_content)
+            with self._phase(WRITE), open_output(output_file) as f:
+                f.write(header)
+                write_tfvars(merged_vars, f)
 
             logger.info(f"Comparison saved to {output_file}")
             return True
@@ -156,203 +506,220 @@ class VariableManager:
             logger.error(f"Comparison failed: {e}")
             return False
 
-    def delete_all_variables(self, workspace_id: str) -> bool:
-        """Delete all variables from a workspace."""
+    @_within_deadline
+    def attach_varset(self, varset_id: str, workspace_ids: list[str]) -> bool:
+        """Apply a variable set to many workspaces with one API call."""
         try:
-            variables = self.client.get_variables(workspace_id)
+            self.client.attach_varset(varset_id, workspace_ids)
+        except Exception as e:
+            logger.error(f"Attaching {varset_id} failed: {e}")
+            return False
+        logger.info(f"Attached {varset_id} to {len(workspace_ids)} workspaces.")
+        return True
 
-            for var in variables:
-                var_id: str = var["id"]
-                key: str = var["attributes"]["key"]
-                if self.client.delete_variable(workspace_id, var_id):
-                    logger.info(f"Deleted variable: {key}")
-                else:
-                    logger.error(f"Failed to delete variable: {key}")
+    @_within_deadline
+    def detach_varset(self, varset_id: str, workspace_ids: list[str]) -> bool:
+        """Remove a variable set from many workspaces with one API call."""
+        try:
+            self.client.detach_varset(varset_id, workspace_ids)
+        except Exception as e:
+            logger.error(f"Detaching {varset_id} failed: {e}")
+            return False
+        logger.info(f"Detached {varset_id} from {len(workspace_ids)} workspaces.")
+        return True
 
-            logger.info(f"Processed {len(variables)} variables.")
-            return True
+    @_within_deadline
+    def delete_all_variables(
+        self,
+        workspace_id: str,
+        key_pattern: str | None = None,
+        group: str | None = None,
+    ) -> bool:
+        """Delete all variables (or those matching the filters) from a workspace.
 
+        Returns True when every selected variable was deleted.
+        """
+        try:
+            summary = self.delete_variables(workspace_id, key_pattern, group)
         except Exception as e:
             logger.error(f"Failed to delete variables: {e}")
             return False
 
-    def _parse_tfvars_file(self, tfvars_file: str) -> dict[str, dict[str, Any]]:
-        """Parse a .tfvars file and extract variable information."""
-        variables: dict[str, dict[str, Any]] = {}
-
-        with open(tfvars_file) as file:
-            content = file.read()
-            lines = content.splitlines()
-
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-
-            # Skip comments and empty lines
-            if line.startswith("#") or not line or "=" not in line:
-                i += 1
-                continue
-
-            key_value, *comment = line.split("#")
-            key_part, value_part = key_value.strip().split("=", 1)
-            key = key_part.strip()
-            value = value_part.strip()
-
-            # Parse tags from comment
-            sensitive = False
-            hcl = False
-            group = "default"
-            keep = False
-            mline = False
-
-            if comment:
-                tags = [t.strip() for t in comment[0].split(",")]
-                for tag in tags:
-                    if tag == "sensitive":
-                        sensitive = True
-                    elif tag == "hcl":
-                        hcl = True
-                    elif tag == "keep_in_all_workspaces":
-                        keep = True
-                    elif tag == "mline":
-                        mline = True
-                    elif tag.startswith("[") and tag.endswith("]"):
-                        group = tag[1:-1].strip()
-
-            # Handle multiline variables (begin...end format)
-            if mline or value.strip() == "begin":
-                mline = True
-                multiline_content: list[str] = []
-                i += 1
-
-                # Collect lines until we find 'end'
-                end_line_comment = ""
-                while i < len(lines):
-                    current_line = lines[i]
-                    stripped = current_line.strip()
-
-                    # Check if this line starts with 'end' (not embedded in content)
-                    if stripped == "end" or (
-                        stripped.startswith("end ") and "#" in stripped
-                    ):
-                        # Parse tags from the end line comment
-                        if "#" in stripped:
-                            _, *end_comment = stripped.split("#")
-                            end_line_comment = (
-                                end_comment[0] if end_comment else ""
-                            )
-                        i += 1
-                        break
-                    multiline_content.append(current_line)
-                    i += 1
-
-                value = "\n".join(multiline_content)
-
-                # Parse additional tags from end line comment
-                if end_line_comment:
-                    end_tags = [t.strip() for t in end_line_comment.split(",")]
-                    for tag in end_tags:
-                        if tag == "sensitive":
-                            sensitive = True
-                        elif tag == "hcl":
-                            hcl = True
-                        elif tag == "keep_in_all_workspaces":
-                            keep = True
-                        elif tag == "mline":
-                            mline = True
-                        elif tag.startswith("[") and tag.endswith("]"):
-                            group = tag[1:-1].strip()
-            else:
-                # Regular single-line variable
-                value = value.strip('"')
-                i += 1
-
-            # Build description
-            description_parts = [f"[{group}]"] if group else []
-            if keep:
-                description_parts.append("keep_in_all_workspaces")
-            if mline:
-                description_parts.append("mline")
-            description = ", ".join(description_parts)
-
-            variables[key] = {
-                "value": value,
-                "description": description,
-                "sensitive": sensitive,
-                "hcl": hcl,
-            }
-
-        return variables
+        processed = len(summary.deleted) + len(summary.failed)
+        logger.info(f"Processed {processed} variables.")
+        if summary.skipped:
+            skipped = len(summary.skipped)
+            logger.info(f"Skipped {skipped} variables not matching the filters.")
+        if summary.failed:
+            logger.error(
+                f"Failed to delete {len(summary.failed)} variables: "
+                + ", ".join(sorted(summary.failed))
+            )
+        if summary.cancelled:
+            logger.error(
+                f"{len(summary.cancelled)} variables were not deleted before "
+                "the deadline: " + ", ".join(sorted(summary.cancelled))
+            )
+        return summary.ok
 
-    def _variable_needs_update(
-        self, existing_attrs: dict[str, Any], new_data: dict[str, Any]
-    ) -> bool:
-        """Check if a variable needs to be updated."""
-        if new_data["sensitive"]:
-            logger.info(
-                "Variable is sensitive, cannot detect changes. Updating variable."
+    @_within_deadline
+    def delete_variables(
+        self,
+        workspace_id: str,
+        key_pattern: str | None = None,
+        group: str | None = None,
+        progress: Callable[[int, int, OperationResult], None] | None = None,
+    ) -> DeleteSummary:
+        """Delete the variables matching the filters in parallel.
+
+        ``key_pattern`` is a shell-style glob on the key and ``group`` matches
+        the ``[group]`` tag; without filters every variable is deleted.
+        Deletes run on ``self.concurrency`` workers under the client's rate
+        limiter. ``progress(done, total, result)`` is called as each delete
+        finishes (by default each result is logged). Errors listing the
+        workspace are raised; failed deletes are reported in the summary.
+        """
+        # Finish listing before deleting: deleting while paging would shift
+        # later pages and skip variables. The listing is always live, as a
+        # cached snapshot could miss variables added since.
+        with self._phase(FETCH):
+            selected, skipped = select_variables(
+                self.client.iter_variables(workspace_id, use_cache=False),
+                key_pattern,
+                group,
+            )
+        operations = [
+            VariableOperation(DELETE, var["attributes"]["key"], variable_id=var["id"])
+            for var in selected
+        ]
+        total = len(operations)
+        done = 0
+        report = progress or _log_delete_progress
+
+        def on_result(result: OperationResult) -> None:
+            nonlocal done
+            done += 1
+            report(done, total, result)
+
+        with self._phase(APPLY):
+            results = apply_operations(
+                self.client,
+                workspace_id,
+                operations,
+                self.concurrency,
+                on_result,
             )
-            return True
 
-        return bool(
-            new_data["value"] != existing_attrs["value"]
-            or new_data["hcl"] != existing_attrs["hcl"]
-            or new_data["sensitive"] != existing_attrs["sensitive"]
-            or new_data["description"] != existing_attrs["description"]
-        )
+        summary = DeleteSummary(skipped=skipped)
+        for result in results:
+            if result.success:
+                summary.deleted.append(result.operation.key)
+            elif result.cancelled:
+                summary.cancelled.append(result.operation.key)
+            else:
+                summary.failed[result.operation.key] = result.error or "unknown error"
+        return summary
+
+    def _fetch_variables(
+        self, workspace_id: str, use_cache: bool = True
+    ) -> dict[str, dict[str, Any]]:
+        """Fetch a workspace's variables keyed by variable name.
+
+        Only downloads and comparisons read the snapshot cache; anything about
+        to write passes ``use_cache=False``.
+        """
+        with self._phase(FETCH):
+            return {
+                var["attributes"]["key"]: var
+                for var in self.client.iter_variables(workspace_id, use_cache=use_cache)
+            }
 
+    def _parse(self, tfvars_file: str) -> dict[str, dict[str, Any]]:
+        """Parse a .tfvars file through the parse cache, if any."""
+        with self._phase(PARSE):
+            return self._parse_tfvars_file(tfvars_file, self.parse_cache)
+
+    def _phase(self, name: str) -> AbstractContextManager[None]:
+        """Time a phase of the current operation when profiling."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
+    def _fetch_workspaces(
+        self, workspace_ids: list[str]
+    ) -> list[dict[str, dict[str, Any]]]:
+        """Fetch several workspaces concurrently, in the order given."""
+        return self._map_workspaces(self._fetch_variables, workspace_ids)
+
+    def _map_workspaces(
+        self, func: Callable[[str], _T], workspace_ids: list[str]
+    ) -> list[_T]:
+        """Call ``func`` for each workspace concurrently; results keep the order."""
+        if len(workspace_ids) <= 1:
+            return [func(ws) for ws in workspace_ids]
+        workers = min(len(workspace_ids), max(self.concurrency, FETCH_WORKERS))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [submit(executor, func, ws) for ws in workspace_ids]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _parse_tfvars_file(
+        tfvars_file: str, cache: ParseCache | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Parse a .tfvars file (``-`` for stdin) and extract variable information."""
+        return load_tfvars(tfvars_file, cache)
+
+    @staticmethod
     def _merge_variable_for_comparison(
-        self,
         v1: dict[str, Any] | None,
         v2: dict[str, Any] | None,
         key: str,
     ) -> dict[str, Any] | None:
         """Merge variable data for comparison between workspaces."""
-        if not v1 and not v2:
+        return VariableManager._merge_variables_for_comparison([v1, v2], key)
+
+    @staticmethod
+    def _merge_variables_for_comparison(
+        variables: list[dict[str, Any] | None],
+        key: str,
+    ) -> dict[str, Any] | None:
+        """Merge one key's variable across N workspaces, in workspace order.
+
+        Values are joined with ``|<->|``. A key missing from the first
+        workspace shows ``<undefined>`` there and ``<enter_new_value>`` in any
+        other workspace it is missing from; ``keep_in_all_workspaces``
+        variables collapse to a single value when every workspace agrees.
+        """
+        if not any(variables):
             return None
 
-        attr1: dict[str, Any] = v1["attributes"] if v1 else {}
-        attr2: dict[str, Any] = v2["attributes"] if v2 else {}
+        attrs: list[dict[str, Any]] = [v["attributes"] if v else {} for v in variables]
 
-        desc1: str = attr1.get("description", "") or ""
-        desc2: str = attr2.get("description", "") or ""
-        description = desc1 or desc2
-        has_keep_tag = (
-            "keep_in_all_workspaces" in desc1 or "keep_in_all_workspaces" in desc2
-        )
-        sensitive: bool = attr1.get("sensitive", False) or attr2.get("sensitive", False)
-        hcl: bool = attr1.get("hcl", False) or attr2.get("hcl", False)
+        descriptions = [a.get("description", "") or "" for a in attrs]
+        description = next((d for d in descriptions if d), "")
+        has_keep_tag = any("keep_in_all_workspaces" in d for d in descriptions)
+        sensitive = any(a.get("sensitive", False) for a in attrs)
+        hcl = any(a.get("hcl", False) for a in attrs)
 
         value: str
         if sensitive:
             value = "_SECRET"
-        else:
-            if has_keep_tag:
-                val1: str | None = attr1.get("value")
-                val2: str | None = attr2.get("value")
-                if val1 == val2:
-                    value = val1 or "_SECRET"
-                else:
-                    logger.warning(
-                        f"Variable {key} has keep_in_all_workspaces tag "
-                        "but different values."
-                    )
-                    value = (
-                        f"{val1 or '<undefined>'} |<->| {val2 or '<undefined>'}"
-                    )
+        elif has_keep_tag:
+            values: list[str | None] = [a.get("value") for a in attrs]
+            if all(v == values[0] for v in values):
+                value = values[0] or "_SECRET"
             else:
-                if v1 and v2:
-                    val1 = attr1.get("value", "_SECRET")
-                    val2 = attr2.get("value", "_SECRET")
-                    value = f"{val1} |<->| {val2}"
-                elif v1:
-                    val1 = attr1.get("value", "_SECRET")
-                    value = f"{val1} |<->| <enter_new_value>"
-                elif v2:
-                    val2 = attr2.get("value", "_SECRET")
-                    value = f"<undefined> |<->| {val2}"
-                else:
-                    return None
+                logger.warning(
+                    f"Variable {key} has keep_in_all_workspaces tag "
+                    "but different values."
+                )
+                value = " |<->| ".join(v or "<undefined>" for v in values)
+        else:
+            cells = [
+                str(a.get("value", "_SECRET"))
+                if v
+                else ("<undefined>" if i == 0 else "<enter_new_value>")
+                for i, (v, a) in enumerate(zip(variables, attrs))
+            ]
+            value = " |<->| ".join(cells)
 
         return {
             "attributes": {
@@ -363,3 +730,50 @@ class VariableManager:
                 "hcl": hcl,
             }
         }
+
+
+def _pool_size(concurrency: int) -> int:
+    """Connections needed by the requests a manager can have in flight at once.
+
+    Multi-workspace operations run up to ``max(concurrency, FETCH_WORKERS)``
+    workspaces at once, each with up to ``concurrency`` writes in flight.
+    """
+    return max(DEFAULT_POOL_SIZE, max(concurrency, FETCH_WORKERS) * concurrency)
+
+
+def _log_delete_progress(done: int, total: int, result: OperationResult) -> None:
+    """Default progress reporter for :meth:`VariableManager.delete_variables`."""
+    key = result.operation.key
+    if result.success:
+        logger.info(f"[{done}/{total}] Deleted variable: {key}")
+    else:
+        logger.error(
+            f"[{done}/{total}] Failed to delete variable: {key}: {result.error}"
+        )
+
+
+def _log_upload_summaries(summaries: list[UploadSummary]) -> None:
+    """Log the per-workspace report of :meth:`VariableManager.upload_to_workspaces`."""
+    failed = [summary for summary in summaries if not summary.ok]
+    for summary in summaries:
+        if summary.ok:
+            logger.info(summary.describe())
+        else:
+            logger.error(summary.describe())
+    logger.info(
+        f"Uploaded to {len(summaries) - len(failed)} of {len(summaries)} workspaces."
+    )
+
+
+def _is_up_to_date(path: str, max_age: float | None, now: float) -> bool:
+    """Whether a previous bulk download already wrote ``path`` recently enough."""
+    try:
+        modified = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return False
+    return max_age is None or now - modified < max_age
+
+
+def _write_tfvars_atomically(path: str, vars_dict: dict[str, dict[str, Any]]) -> None:
+    """Stream a .tfvars file to disk so that it never exists half-written."""
+    write_atomically(path, lambda f: write_tfvars(vars_dict, f))
@@ -0,0 +1,119 @@
+"""
+On-disk index of workspace names to IDs, one per organization.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Callable
+
+from .cache import _FileCache, default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_TTL = 86400.0
+DEFAULT_INDEX_ENTRIES = 256
+
+
+def default_index_dir() -> str:
+    """Directory used when no index directory is given.
+
+    ``$XDG_CACHE_HOME/terraform-var-manager/workspaces``, falling back to
+    ``~/.cache`` when ``XDG_CACHE_HOME`` is not set.
+    """
+    return default_cache_dir("workspaces")
+
+
+class WorkspaceIndex(_FileCache):
+    """Workspace name to ID mappings, shared by processes on one host.
+
+    Each organization of each API host is stored as one JSON file holding the
+    names and IDs from its last full listing, plus any workspace looked up
+    individually since. A listing older than ``ttl`` seconds is stale: the
+    client lists the organization again instead of trusting it. At most
+    ``max_entries`` organizations are kept, least recently used evicted first.
+
+    Files are written atomically with owner-only permissions.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        ttl: float = DEFAULT_INDEX_TTL,
+        clock: Callable[[], float] = time.time,
+        max_entries: int = DEFAULT_INDEX_ENTRIES,
+    ) -> None:
+        if ttl < 0:
+            raise ValueError("ttl must not be negative")
+        super().__init__(directory or default_index_dir(), max_entries)
+        self.ttl = ttl
+        self._clock = clock
+        # Serializes read-modify-write updates; _FileCache._lock is for eviction.
+        self._update_lock = threading.Lock()
+
+    def is_fresh(self, host: str, organization: str) -> bool:
+        """Whether the organization was fully listed less than ``ttl`` ago."""
+        entry = self._entry(host, organization)
+        if entry is None:
+            return False
+        return self._clock() - float(entry["listed_at"]) <= self.ttl
+
+    def lookup(self, host: str, organization: str, name: str) -> str | None:
+        """Return the indexed ID of a workspace, or None if it is not indexed."""
+        entry = self._entry(host, organization)
+        if entry is None:
+            return None
+        workspace_id: str | None = entry["workspaces"].get(name)
+        return workspace_id
+
+    def replace(
+        self, host: str, organization: str, workspaces: Mapping[str, str]
+    ) -> None:
+        """Store a full listing of the organization's workspaces by name."""
+        with self._update_lock:
+            self._store(
+                host,
+                organization,
+                {"listed_at": self._clock(), "workspaces": dict(workspaces)},
+            )
+
+    def add(self, host: str, organization: str, name: str, workspace_id: str) -> None:
+        """Record one workspace without refreshing the rest of the listing."""
+        with self._update_lock:
+            entry = self._entry(host, organization)
+            if entry is None:
+                # Not a full listing: leave the organization stale.
+                entry = {"listed_at": 0.0, "workspaces": {}}
+            entry["workspaces"][name] = workspace_id
+            self._store(host, organization, entry)
+
+    def forget(self, host: str, organization: str, name: str) -> None:
+        """Drop one workspace, e.g. after it was renamed or deleted."""
+        with self._update_lock:
+            entry = self._entry(host, organization)
+            if entry is None or entry["workspaces"].pop(name, None) is None:
+                return
+            self._store(host, organization, entry)
+
+    def _entry(self, host: str, organization: str) -> dict[str, Any] | None:
+        """Load an organization's entry; unreadable entries count as missing."""
+        path = self._path(host, organization)
+        entry = self._read(path)
+        if entry is None:
+            return None
+        try:
+            float(entry["listed_at"])
+            if not isinstance(entry["workspaces"], dict):
+                raise TypeError("workspaces is not a mapping")
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable workspace index {path}: {e}")
+            self._remove(path)
+            return None
+        self._touch(path, self._clock())
+        return entry
+
+    def _store(self, host: str, organization: str, entry: dict[str, Any]) -> None:
+        entry = {"host": host, "organization": organization, **entry}
+        self._write(self._path(host, organization), entry, self._clock())
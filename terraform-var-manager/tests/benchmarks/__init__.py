@@ -0,0 +1,3 @@
+"""
+Performance benchmarks, run with ``python -m tests.benchmarks.run``.
+"""
@@ -0,0 +1,100 @@
+"""
+Synthetic .tfvars files and API responses for the benchmarks.
+
+Everything is derived from a seeded RNG, so a given size always produces the
+same data and timings stay comparable between runs.
+"""
+from __future__ import annotations
+
+import random
+from typing import Any
+
+GROUPS = [f"group_{i}" for i in range(25)]
+MULTILINE_RATIO = 0.2
+
+
+def synthetic_variables(
+    count: int, multiline_ratio: float = MULTILINE_RATIO, seed: int = 0
+) -> list[dict[str, Any]]:
+    """Variables shaped like ``GET /workspaces/:id/vars`` results.
+
+    About ``multiline_ratio`` of them are multiline (``mline``) values of a
+    few lines; the rest are a mix of plain strings, hcl values, sensitive and
+    ``keep_in_all_workspaces`` variables spread over 25 groups.
+    """
+    rng = random.Random(seed)
+    variables = []
+    for i in range(count):
+        tags = [f"[{rng.choice(GROUPS)}]"]
+        roll = rng.random()
+        hcl = sensitive = False
+        if roll < multiline_ratio:
+            tags.append("mline")
+            lines = rng.randint(3, 12)
+            value = "\n".join(
+                f"  line {n} of value {i}: {rng.getrandbits(64):x}"
+                for n in range(lines)
+            )
+        elif roll < multiline_ratio + 0.1:
+            hcl = True
+            value = f'["{rng.getrandbits(32):x}", "{rng.getrandbits(32):x}"]'
+        elif roll < multiline_ratio + 0.15:
+            sensitive = True
+            value = ""
+        else:
+            value = f"value-{i}-{rng.getrandbits(48):x}"
+        if rng.random() < 0.05:
+            tags.append("keep_in_all_workspaces")
+        variables.append(
+            {
+                "id": f"var-{i:08d}",
+                "type": "vars",
+                "attributes": {
+                    "key": f"var_{i:06d}",
+                    "value": None if sensitive else value,
+                    "description": ", ".join(tags),
+                    "sensitive": sensitive,
+                    "hcl": hcl,
+                    "category": "terraform",
+                },
+            }
+        )
+    return variables
+
+
+def variables_by_key(variables: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Key API variables by name, as the manager does after fetching."""
+    return {var["attributes"]["key"]: var for var in variables}
+
+
+def drifted(
+    variables: list[dict[str, Any]], ratio: float = 0.1, seed: int = 1
+) -> list[dict[str, Any]]:
+    """A second workspace: the same variables with ``ratio`` of values changed.
+
+    Variables tagged ``keep_in_all_workspaces`` keep their value, as they
+    would in practice, and a few keys are dropped.
+    """
+    rng = random.Random(seed)
+    result = []
+    for var in variables:
+        attributes = var["attributes"]
+        roll = rng.random()
+        if roll < 0.02:
+            continue
+        if roll < ratio and "keep_in_all_workspaces" not in attributes["description"]:
+            attributes = {**attributes, "value": f"changed-{rng.getrandbits(32):x}"}
+        result.append({**var, "attributes": attributes})
+    return result
+
+
+def synthetic_tfvars(
+    count: int, multiline_ratio: float = MULTILINE_RATIO, seed: int = 0
+) -> str:
+    """A .tfvars file with ``count`` variables, as written by a download."""
+    # Imported here so that generating data never depends on the formatter
+    # under test having been imported first.
+    from terraform_var_manager.utils import group_and_format_vars_for_tfvars
+
+    variables = synthetic_variables(count, multiline_ratio, seed)
+    return group_and_format_vars_for_tfvars(variables_by_key(variables)) + "\n"
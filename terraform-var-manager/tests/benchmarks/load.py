@@ -0,0 +1,255 @@
+"""
+Load test of VariableManager against a local FakeTerraformCloud.
+
+Run from the project root::
+
+    python -m tests.benchmarks.load --variables 500 --workspaces 8
+    python -m tests.benchmarks.load --latency 0.05 --rate-limit 30 --error-rate 0.02
+
+One synthetic .tfvars file is uploaded to every workspace, then every
+workspace is downloaded, compared and emptied with ``delete_all_variables``.
+Each phase reports its wall time, variables per second, the requests the
+server received (by route), the 429s and 5xx errors it returned and the
+retries the client made. Everything runs over real HTTP on 127.0.0.1, so the
+client's pooling, rate limiting and retries are part of the measurement.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from terraform_var_manager.api_client import TerraformCloudClient
+from terraform_var_manager.retry import RetryPolicy
+from terraform_var_manager.variable_manager import VariableManager
+
+from ..fake_tfc import FakeTerraformCloud
+from .generate import synthetic_tfvars
+
+DEFAULT_VARIABLES = 200
+DEFAULT_WORKSPACES = 4
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass
+class Phase:
+    """Timing and request counts of one phase of a load test."""
+
+    name: str
+    variables: int
+    seconds: float
+    ok: bool
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    retries: int = 0
+    calls: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def vars_per_second(self) -> float:
+        return self.variables / self.seconds if self.seconds > 0 else float("inf")
+
+
+def _measure(
+    name: str,
+    variables: int,
+    fake: FakeTerraformCloud,
+    client: TerraformCloudClient,
+    func: Callable[[], bool],
+) -> Phase:
+    fake.reset_counters()
+    retries = client.retry_stats.retries
+    started = time.perf_counter()
+    ok = func()
+    seconds = time.perf_counter() - started
+    return Phase(
+        name,
+        variables,
+        seconds,
+        ok,
+        requests=fake.received,
+        throttled=fake.throttled,
+        errors=fake.injected_errors,
+        retries=client.retry_stats.retries - retries,
+        calls=Counter(fake.calls),
+    )
+
+
+def run(
+    variables: int = DEFAULT_VARIABLES,
+    workspaces: int = DEFAULT_WORKSPACES,
+    latency: float = 0.0,
+    rate_limit: float | None = None,
+    error_rate: float = 0.0,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client_rate_limit: float | None = None,
+) -> list[Phase]:
+    """Run every phase once and return their results in order.
+
+    ``latency``, ``rate_limit`` and ``error_rate`` configure the fake server;
+    ``client_rate_limit`` paces the client (unpaced by default, so 429s are
+    handled by retries).
+    """
+    # The fake fails requests before processing them, so creates are safe to
+    # retry too.
+    policy = RetryPolicy(
+        max_attempts=10, backoff_base=0.01, backoff_max=0.5, retry_post=True
+    )
+    fake = FakeTerraformCloud(latency, rate_limit, error_rate)
+    with fake, tempfile.TemporaryDirectory() as workdir:
+        workspace_ids = [fake.add_workspace(f"load-{i}") for i in range(workspaces)]
+        tfvars_path = os.path.join(workdir, "load.tfvars")
+        with open(tfvars_path, "w") as f:
+            f.write(synthetic_tfvars(variables))
+        download_dir = os.path.join(workdir, "downloads")
+
+        client = TerraformCloudClient(
+            token="fake",
+            base_url=fake.base_url,
+            pool_size=max(concurrency, 10),
+            rate_limit=client_rate_limit,
+            max_rate_limit_retries=1000,
+            retry_policy=policy,
+        )
+        manager = VariableManager(client=client, concurrency=concurrency)
+        total = variables * workspaces
+        try:
+            return [
+                _measure(
+                    "upload",
+                    total,
+                    fake,
+                    client,
+                    lambda: all(
+                        s.ok
+                        for s in manager.upload_to_workspaces(
+                            workspace_ids, tfvars_path
+                        ).values()
+                    ),
+                ),
+                _measure(
+                    "download",
+                    total,
+                    fake,
+                    client,
+                    lambda: (
+                        manager.download_workspaces(
+                            {ws: f"{ws}.tfvars" for ws in workspace_ids}, download_dir
+                        ).ok
+                    ),
+                ),
+                _measure(
+                    "compare",
+                    total,
+                    fake,
+                    client,
+                    lambda: manager.compare_workspace_matrix(
+                        workspace_ids, os.path.join(workdir, "comparison.tfvars")
+                    ),
+                ),
+                _measure(
+                    "delete_all",
+                    total,
+                    fake,
+                    client,
+                    lambda: all(
+                        manager.delete_all_variables(ws) for ws in workspace_ids
+                    ),
+                ),
+            ]
+        finally:
+            manager.close()
+
+
+def _report(phases: list[Phase]) -> None:
+    print(
+        f"{'phase':<12} {'ok':>3} {'seconds':>9} {'vars/s':>10} {'requests':>9} "
+        f"{'429s':>6} {'5xx':>6} {'retries':>8}"
+    )
+    for p in phases:
+        print(
+            f"{p.name:<12} {'yes' if p.ok else 'NO':>3} {p.seconds:>9.3f} "
+            f"{p.vars_per_second:>10,.0f} {p.requests:>9} {p.throttled:>6} "
+            f"{p.errors:>6} {p.retries:>8}"
+        )
+    print()
+    for p in phases:
+        calls = ", ".join(f"{route}: {n}" for route, n in sorted(p.calls.items()))
+        print(f"{p.name:<12} {calls}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks.load", description=__doc__.split("\n")[1]
+    )
+    parser.add_argument(
+        "--variables",
+        type=int,
+        default=DEFAULT_VARIABLES,
+        metavar="N",
+        help="Variables per workspace",
+    )
+    parser.add_argument(
+        "--workspaces", type=int, default=DEFAULT_WORKSPACES, metavar="N"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Delay added by the server to every response",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        metavar="PER_SECOND",
+        help="Server rate limit; excess requests get a 429",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        metavar="RATIO",
+        help="Share of requests the server fails with a 503",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY, metavar="N"
+    )
+    parser.add_argument(
+        "--client-rate-limit",
+        type=float,
+        default=None,
+        metavar="PER_SECOND",
+        help="Pace the client (default: unpaced)",
+    )
+    args = parser.parse_args(argv)
+
+    # Keep per-variable progress logs out of the report.
+    logging.disable(logging.WARNING)
+    try:
+        phases = run(
+            args.variables,
+            args.workspaces,
+            args.latency,
+            args.rate_limit,
+            args.error_rate,
+            args.concurrency,
+            args.client_rate_limit,
+        )
+    finally:
+        logging.disable(logging.NOTSET)
+
+    _report(phases)
+    return 0 if all(p.ok for p in phases) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Throughput benchmarks for the parser, formatter and comparison engine.
+
+Run from the project root::
+
+    python -m tests.benchmarks.run --save            # record a baseline
+    python -m tests.benchmarks.run                   # compare against it
+
+Each benchmark processes N synthetic variables (1k, 10k and 100k by default)
+and reports variables per second, keeping the best of ``--repeat`` runs.
+Comparing against a baseline exits with status 1 when any benchmark is
+slower than the baseline by more than ``--threshold`` (20% by default).
+Baselines are machine-specific: record one on the machine that compares.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from terraform_var_manager.utils import (
+    extract_group,
+    format_var_line,
+    group_and_format_vars_for_tfvars,
+)
+from terraform_var_manager.variable_manager import VariableManager
+
+from .generate import drifted, synthetic_tfvars, synthetic_variables, variables_by_key
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+BASELINE_VERSION = 1
+
+
+@dataclass
+class Result:
+    """Best time of one benchmark at one size."""
+
+    name: str
+    size: int
+    seconds: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/{self.size}"
+
+    @property
+    def vars_per_second(self) -> float:
+        return self.size / self.seconds if self.seconds > 0 else float("inf")
+
+
+def _best_of(repeat: int, func: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _cases(size: int, workdir: str) -> Iterable[tuple[str, Callable[[], object]]]:
+    """The benchmarks at one size, with their data prepared up front."""
+    variables = synthetic_variables(size)
+    by_key = variables_by_key(variables)
+    other = variables_by_key(drifted(variables))
+    descriptions = [var["attributes"]["description"] for var in variables]
+    lines = [
+        (
+            key,
+            var["attributes"]["value"] or "_SECRET",
+            extract_group(var["attributes"]["description"]),
+            var["attributes"]["sensitive"],
+            var["attributes"]["hcl"],
+            "keep_in_all_workspaces" in var["attributes"]["description"],
+            "mline" in var["attributes"]["description"],
+        )
+        for key, var in by_key.items()
+    ]
+    tfvars_path = os.path.join(workdir, f"bench-{size}.tfvars")
+    with open(tfvars_path, "w") as f:
+        f.write(synthetic_tfvars(size))
+    merge = VariableManager._merge_variable_for_comparison
+
+    yield "parse_tfvars_file", lambda: VariableManager._parse_tfvars_file(tfvars_path)
+    yield "group_and_format", lambda: group_and_format_vars_for_tfvars(by_key)
+    yield "format_var_line", lambda: [format_var_line(*line) for line in lines]
+    yield "extract_group", lambda: [extract_group(d) for d in descriptions]
+    yield (
+        "merge_for_comparison",
+        lambda: [
+            merge(by_key.get(key), other.get(key), key) for key in by_key.keys() | other
+        ],
+    )
+
+
+def run(sizes: list[int], repeat: int = DEFAULT_REPEAT) -> list[Result]:
+    """Run every benchmark at every size."""
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            for name, func in _cases(size, workdir):
+                results.append(Result(name, size, _best_of(repeat, func)))
+    return results
+
+
+def to_baseline(results: list[Result]) -> dict[str, Any]:
+    """Results as the JSON document stored in a baseline file."""
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {
+            r.key: {"seconds": r.seconds, "vars_per_second": r.vars_per_second}
+            for r in results
+        },
+    }
+
+
+def regressions(
+    results: list[Result], baseline: dict[str, Any], threshold: float
+) -> list[tuple[Result, float]]:
+    """Benchmarks whose throughput dropped by more than ``threshold``.
+
+    Returns each regressed result with its relative change in throughput
+    (negative: slower). Benchmarks missing from the baseline are ignored.
+    """
+    recorded = baseline.get("results", {})
+    regressed = []
+    for result in results:
+        before = recorded.get(result.key, {}).get("vars_per_second")
+        if not before:
+            continue
+        change = result.vars_per_second / before - 1
+        if change < -threshold:
+            regressed.append((result, change))
+    return regressed
+
+
+def _report(results: list[Result], baseline: dict[str, Any] | None) -> None:
+    recorded = (baseline or {}).get("results", {})
+    print(f"{'benchmark':<36} {'vars/s':>14} {'seconds':>10} {'vs baseline':>12}")
+    for result in results:
+        before = recorded.get(result.key, {}).get("vars_per_second")
+        change = f"{result.vars_per_second / before - 1:+.1%}" if before else "-"
+        print(
+            f"{result.key:<36} {result.vars_per_second:>14,.0f} "
+            f"{result.seconds:>10.4f} {change:>12}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks.run", description=__doc__.split("\n")[1]
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, metavar="N"
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, metavar="N")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, metavar="PATH")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        metavar="RATIO",
+        help="Allowed drop in throughput before failing (default: 0.2)",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Write the results as the new baseline"
+    )
+    args = parser.parse_args(argv)
+
+    # Comparisons log a warning per inconsistent keep_in_all_workspaces key.
+    logging.disable(logging.WARNING)
+    try:
+        results = run(args.sizes, args.repeat)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(to_baseline(results), f, indent=2)
+            f.write("\n")
+        _report(results, None)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        _report(results, None)
+        print(f"No baseline at {args.baseline}; run with --save to record one.")
+        return 0
+
+    _report(results, baseline)
+    regressed = regressions(results, baseline, args.threshold)
+    for result, change in regressed:
+        print(f"REGRESSION: {result.key} throughput {change:+.1%}", file=sys.stderr)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
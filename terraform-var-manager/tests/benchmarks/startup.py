@@ -0,0 +1,152 @@
+"""
+Startup-time benchmark of the CLI.
+
+Run from the project root::
+
+    python -m tests.benchmarks.startup
+    python -m tests.benchmarks.startup --repeat 20 --budget-ms 100
+
+Each case starts a fresh interpreter running the CLI and keeps the best of
+``--repeat`` runs. The time of a bare ``python -c pass`` is subtracted, so
+the overhead column is what the package itself costs. ``--help`` and usage
+errors must not import the HTTP stack (``requests``, ``aiohttp``) or read
+credentials; the benchmark exits with status 1 when a case does, or when its
+overhead exceeds ``--budget-ms``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+
+DEFAULT_REPEAT = 10
+DEFAULT_BUDGET_MS = 150.0
+SRC = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "src")
+
+# Command lines that must return before anything heavy is loaded.
+CASES = {
+    "help": ["--help"],
+    "usage error": ["--download", "--concurrency", "0"],
+    "missing --id": ["--download"],
+    "missing --tfvars": ["--upload", "--id", "ws-1"],
+    "no command": [],
+}
+# Modules that only an API call needs.
+HEAVY_MODULES = ("requests", "urllib3", "aiohttp")
+
+# Runs the CLI in-process and prints the heavy modules it loaded.
+_PROBE = """
+import sys
+sys.argv = ["terraform-var-manager", *sys.argv[1:]]
+from terraform_var_manager.main import main
+try:
+    main()
+except SystemExit:
+    pass
+heavy = {heavy!r}
+print("heavy:" + ",".join(m for m in heavy if m in sys.modules), file=sys.__stderr__)
+"""
+
+
+@dataclass
+class Case:
+    """Best startup time of one command line."""
+
+    name: str
+    argv: list[str]
+    seconds: float
+    overhead: float
+    heavy_modules: list[str] = field(default_factory=list)
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    paths = [os.path.abspath(SRC), env.get("PYTHONPATH", "")]
+    env["PYTHONPATH"] = os.pathsep.join(p for p in paths if p)
+    # Without credentials, any attempt to read them shows up as an error.
+    env["HOME"] = os.devnull
+    return env
+
+
+def _best_of(repeat: int, command: list[str]) -> float:
+    best = float("inf")
+    env = _env()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, env=env, capture_output=True)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def heavy_modules(argv: list[str]) -> list[str]:
+    """The heavy modules imported by running the CLI with ``argv``."""
+    probe = _PROBE.format(heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", probe, *argv],
+        env=_env(),
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stderr.splitlines():
+        if line.startswith("heavy:"):
+            return [name for name in line[len("heavy:") :].split(",") if name]
+    raise RuntimeError(f"CLI probe failed: {result.stderr}")
+
+
+def run(repeat: int = DEFAULT_REPEAT) -> list[Case]:
+    """Time every case and return them in order."""
+    interpreter = _best_of(repeat, [sys.executable, "-c", "pass"])
+    cases = []
+    for name, argv in CASES.items():
+        command = [sys.executable, "-m", "terraform_var_manager.main", *argv]
+        seconds = _best_of(repeat, command)
+        cases.append(
+            Case(name, argv, seconds, seconds - interpreter, heavy_modules(argv))
+        )
+    return cases
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks.startup", description=__doc__.split("\n")[1]
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        metavar="N",
+        help=f"Runs per case; the best is kept (default: {DEFAULT_REPEAT})",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        metavar="MS",
+        help=(
+            "Maximum overhead over a bare interpreter start "
+            f"(default: {DEFAULT_BUDGET_MS:g})"
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    cases = run(args.repeat)
+    failed = False
+    print(f"{'case':<16} {'best':>9} {'overhead':>9}  heavy modules")
+    for case in cases:
+        over_budget = case.overhead * 1000 > args.budget_ms
+        failed = failed or over_budget or bool(case.heavy_modules)
+        print(
+            f"{case.name:<16} {case.seconds * 1000:>7.1f}ms "
+            f"{case.overhead * 1000:>7.1f}ms  "
+            f"{', '.join(case.heavy_modules) or '-'}"
+            f"{'  OVER BUDGET' if over_budget else ''}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
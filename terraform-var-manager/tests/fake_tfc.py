@@ -0,0 +1,383 @@
+"""
+A local stand-in for the Terraform Cloud workspace variables API.
+
+``FakeTerraformCloud`` serves the endpoints the client uses over real HTTP on
+127.0.0.1, so the client's pooling, pagination, rate limiting and retries can
+be exercised end to end. It can add latency to every response, enforce a
+token-bucket rate limit with 429 responses and ``X-RateLimit-*`` headers, and
+fail a share of requests with 5xx errors::
+
+    with FakeTerraformCloud(latency=0.02, rate_limit=30, error_rate=0.01) as tfc:
+        ws_id = tfc.add_workspace("app-prod")
+        client = TerraformCloudClient(token="fake", base_url=tfc.base_url)
+
+Every request is counted in ``received``; those that were served are also
+counted in ``calls`` by method and route.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+API_PREFIX = "/api/v2"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_ROUTES = [
+    ("vars", re.compile(r"^/workspaces/(?P<ws>[^/]+)/vars/?$")),
+    ("var", re.compile(r"^/workspaces/(?P<ws>[^/]+)/vars/(?P<var>[^/]+)$")),
+    ("workspaces", re.compile(r"^/organizations/(?P<org>[^/]+)/workspaces$")),
+    (
+        "workspace",
+        re.compile(r"^/organizations/(?P<org>[^/]+)/workspaces/(?P<name>[^/]+)$"),
+    ),
+]
+
+
+class FakeTerraformCloud:
+    """In-memory workspace variables API on a local HTTP server.
+
+    ``latency`` seconds are added to every response. With ``rate_limit``,
+    requests beyond that many per second get a 429 with ``Retry-After``.
+    ``error_rate`` is the probability that a request fails with a 503 before
+    it is processed, so a failed write never changes any state.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate_limit: float | None = None,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.received = 0
+        self.calls: Counter[str] = Counter()
+        self.throttled = 0
+        self.injected_errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # workspace ID -> variable ID -> attributes, in creation order
+        self._variables: dict[str, dict[str, dict[str, Any]]] = {}
+        self._workspaces: dict[str, dict[str, str]] = {}  # org -> name -> ID
+        self._tokens = rate_limit or 0.0
+        self._refilled = time.monotonic()
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> FakeTerraformCloud:
+        """Start serving on a free local port in a background thread."""
+        fake = self
+
+        class Handler(_Handler):
+            server_fake = fake
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.closing = True
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> FakeTerraformCloud:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        """API root to pass to ``TerraformCloudClient(base_url=...)``."""
+        if self._server is None:
+            raise RuntimeError("server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    # -- state -------------------------------------------------------------
+
+    def add_workspace(self, name: str, organization: str = "acme") -> str:
+        """Create an empty workspace and return its ID."""
+        with self._lock:
+            workspace_id = f"ws-{next(self._ids):06d}"
+            self._workspaces.setdefault(organization, {})[name] = workspace_id
+            self._variables[workspace_id] = {}
+        return workspace_id
+
+    def variables(self, workspace_id: str) -> dict[str, dict[str, Any]]:
+        """The attributes of a workspace's variables, keyed by variable name."""
+        with self._lock:
+            return {
+                attrs["key"]: dict(attrs)
+                for attrs in self._variables[workspace_id].values()
+            }
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.received = 0
+            self.calls.clear()
+            self.throttled = 0
+            self.injected_errors = 0
+
+    # -- request handling --------------------------------------------------
+
+    def _admit(self) -> tuple[int, dict[str, str]]:
+        """Apply the rate limit and error injection to an incoming request.
+
+        Returns the status to fail with (0 to proceed) and the headers to add.
+        """
+        with self._lock:
+            self.received += 1
+            headers: dict[str, str] = {}
+            if self.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate_limit,
+                    self._tokens + (now - self._refilled) * self.rate_limit,
+                )
+                self._refilled = now
+                wait = max(0.0, (1 - self._tokens) / self.rate_limit)
+                if self._tokens < 1:
+                    self.throttled += 1
+                    headers["Retry-After"] = f"{wait:.3f}"
+                    headers["X-RateLimit-Limit"] = f"{self.rate_limit:g}"
+                    headers["X-RateLimit-Remaining"] = "0"
+                    headers["X-RateLimit-Reset"] = f"{wait:.3f}"
+                    return 429, headers
+                self._tokens -= 1
+                headers["X-RateLimit-Limit"] = f"{self.rate_limit:g}"
+                headers["X-RateLimit-Remaining"] = str(math.floor(self._tokens))
+                headers["X-RateLimit-Reset"] = f"{wait:.3f}"
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.injected_errors += 1
+                return 503, headers
+            return 0, headers
+
+    def handle(
+        self, method: str, path: str, query: dict[str, str], body: Any
+    ) -> tuple[int, Any]:
+        """Serve one API request and return the status and JSON body."""
+        route, params = _match(path)
+        with self._lock:
+            self.calls[f"{method} {route or 'unknown'}"] += 1
+            if route == "vars" and method == "GET":
+                return self._list_variables(params["ws"], path, query)
+            if route == "vars" and method == "POST":
+                return self._create_variable(params["ws"], body)
+            if route == "var" and method == "PATCH":
+                return self._update_variable(params["ws"], params["var"], body)
+            if route == "var" and method == "DELETE":
+                return self._delete_variable(params["ws"], params["var"])
+            if route == "workspaces" and method == "GET":
+                return self._list_workspaces(params["org"], path, query)
+            if route == "workspace" and method == "GET":
+                return self._get_workspace(params["org"], params["name"])
+        return 404, _errors("not found")
+
+    def _list_variables(
+        self, workspace_id: str, path: str, query: dict[str, str]
+    ) -> tuple[int, Any]:
+        if workspace_id not in self._variables:
+            return 404, _errors("workspace not found")
+        items = [
+            _variable_resource(var_id, attrs)
+            for var_id, attrs in self._variables[workspace_id].items()
+        ]
+        return 200, _page(items, f"{self.base_url}{path}", query)
+
+    def _create_variable(self, workspace_id: str, body: Any) -> tuple[int, Any]:
+        variables = self._variables.get(workspace_id)
+        if variables is None:
+            return 404, _errors("workspace not found")
+        attrs = _attributes(body)
+        if attrs is None or not attrs.get("key"):
+            return 422, _errors("invalid variable")
+        if any(v["key"] == attrs["key"] for v in variables.values()):
+            return 422, _errors("key has already been taken")
+        var_id = f"var-{next(self._ids):08d}"
+        variables[var_id] = {
+            "key": attrs["key"],
+            "value": attrs.get("value", ""),
+            "description": attrs.get("description"),
+            "category": attrs.get("category", "terraform"),
+            "hcl": bool(attrs.get("hcl")),
+            "sensitive": bool(attrs.get("sensitive")),
+        }
+        return 201, {"data": _variable_resource(var_id, variables[var_id])}
+
+    def _update_variable(
+        self, workspace_id: str, var_id: str, body: Any
+    ) -> tuple[int, Any]:
+        current = self._variables.get(workspace_id, {}).get(var_id)
+        attrs = _attributes(body)
+        if current is None:
+            return 404, _errors("variable not found")
+        if attrs is None:
+            return 422, _errors("invalid variable")
+        current.update(attrs)
+        return 200, {"data": _variable_resource(var_id, current)}
+
+    def _delete_variable(self, workspace_id: str, var_id: str) -> tuple[int, Any]:
+        if self._variables.get(workspace_id, {}).pop(var_id, None) is None:
+            return 404, _errors("variable not found")
+        return 204, None
+
+    def _list_workspaces(
+        self, organization: str, path: str, query: dict[str, str]
+    ) -> tuple[int, Any]:
+        items = [
+            {"id": ws_id, "type": "workspaces", "attributes": {"name": name}}
+            for name, ws_id in self._workspaces.get(organization, {}).items()
+        ]
+        return 200, _page(items, f"{self.base_url}{path}", query)
+
+    def _get_workspace(self, organization: str, name: str) -> tuple[int, Any]:
+        ws_id = self._workspaces.get(organization, {}).get(name)
+        if ws_id is None:
+            return 404, _errors("workspace not found")
+        return 200, {
+            "data": {"id": ws_id, "type": "workspaces", "attributes": {"name": name}}
+        }
+
+
+class _Server(ThreadingHTTPServer):
+    closing = False
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients that time out hang up before the (delayed) response is sent,
+        # and delayed responses may still be running when the server stops.
+        if self.closing or isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_fake: FakeTerraformCloud
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # response waits out the client's delayed ACK (~40ms).
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._serve("GET")
+
+    def do_POST(self) -> None:
+        self._serve("POST")
+
+    def do_PATCH(self) -> None:
+        self._serve("PATCH")
+
+    def do_DELETE(self) -> None:
+        self._serve("DELETE")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _serve(self, method: str) -> None:
+        fake = self.server_fake
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        status, headers = fake._admit()
+        body: Any = None
+        if not status:
+            url = urlsplit(self.path)
+            path = url.path.removeprefix(API_PREFIX)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                payload = json.loads(raw) if raw else None
+            except ValueError:
+                status, body = 400, _errors("invalid JSON")
+            else:
+                status, body = fake.handle(method, path, query, payload)
+        elif status >= 500:
+            body = _errors("service unavailable")
+
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/vnd.api+json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _match(path: str) -> tuple[str | None, dict[str, str]]:
+    for name, pattern in _ROUTES:
+        match = pattern.match(path)
+        if match:
+            return name, match.groupdict()
+    return None, {}
+
+
+def _attributes(body: Any) -> dict[str, Any] | None:
+    try:
+        attrs = body["data"]["attributes"]
+    except (KeyError, TypeError):
+        return None
+    return attrs if isinstance(attrs, dict) else None
+
+
+def _variable_resource(var_id: str, attrs: dict[str, Any]) -> dict[str, Any]:
+    shown = dict(attrs)
+    if shown.get("sensitive"):
+        shown["value"] = None
+    return {"id": var_id, "type": "vars", "attributes": shown}
+
+
+def _page(items: list[dict[str, Any]], url: str, query: dict[str, str]) -> Any:
+    """One JSON:API page of ``items`` with ``links`` and ``meta.pagination``."""
+    size = min(int(query.get("page[size]", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    number = max(int(query.get("page[number]", 1)), 1)
+    total_pages = max(math.ceil(len(items) / size), 1)
+    next_page = number + 1 if number < total_pages else None
+    links: dict[str, Any] = {"next": None}
+    if next_page:
+        next_query = urlencode({"page[number]": next_page, "page[size]": size})
+        links["next"] = f"{url}?{next_query}"
+    return {
+        "data": items[(number - 1) * size : number * size],
+        "links": links,
+        "meta": {
+            "pagination": {
+                "current-page": number,
+                "next-page": next_page,
+                "total-pages": total_pages,
+                "total-count": len(items),
+            }
+        },
+    }
+
+
+def _errors(detail: str) -> dict[str, Any]:
+    return {"errors": [{"detail": detail}]}
@@ -0,0 +1,218 @@
+"""
+End-to-end tests of TerraformCloudClient and VariableManager over real HTTP.
+
+Each test runs against a FakeTerraformCloud on 127.0.0.1, so pagination,
+429 handling and retries go through the real requests/urllib3 stack.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+from terraform_var_manager.api_client import TerraformCloudClient
+from terraform_var_manager.cache import SnapshotCache
+from terraform_var_manager.exceptions import TerraformCloudError
+from terraform_var_manager.retry import RetryPolicy
+from terraform_var_manager.variable_manager import VariableManager
+from tests.benchmarks import load
+from tests.fake_tfc import FakeTerraformCloud
+
+FAST_RETRIES = RetryPolicy(max_attempts=8, backoff_base=0.001, backoff_max=0.01)
+
+
+def _client(tfc: FakeTerraformCloud, **kwargs: object) -> TerraformCloudClient:
+    kwargs.setdefault("rate_limit", None)
+    kwargs.setdefault("retry_policy", FAST_RETRIES)
+    return TerraformCloudClient(token="fake", base_url=tfc.base_url, **kwargs)
+
+
+def _payload(key: str, value: str) -> dict:
+    return {
+        "data": {
+            "type": "vars",
+            "attributes": {
+                "key": key,
+                "value": value,
+                "description": "[app]",
+                "category": "terraform",
+                "hcl": False,
+                "sensitive": False,
+            },
+        }
+    }
+
+
+@pytest.fixture
+def tfc() -> FakeTerraformCloud:
+    with FakeTerraformCloud() as server:
+        yield server
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_pagination_returns_every_variable(
+    tfc: FakeTerraformCloud, prefetch: bool
+) -> None:
+    workspace_id = tfc.add_workspace("app")
+    with _client(tfc) as client:
+        for i in range(250):
+            client.create_variable(workspace_id, _payload(f"var_{i:03d}", str(i)))
+
+        keys = [
+            var["attributes"]["key"]
+            for var in client.iter_variables(workspace_id, prefetch=prefetch)
+        ]
+
+    assert keys == [f"var_{i:03d}" for i in range(250)]
+    assert tfc.calls["GET vars"] == 3
+
+
+def test_rate_limited_requests_are_retried() -> None:
+    """429s from the server are waited out and every request succeeds."""
+    with FakeTerraformCloud(rate_limit=20) as tfc:
+        workspace_id = tfc.add_workspace("app")
+
+        with _client(tfc, max_rate_limit_retries=50) as client:
+            for i in range(40):
+                client.create_variable(workspace_id, _payload(f"var_{i}", "x"))
+
+            assert tfc.throttled > 0
+            assert client.retry_stats.reasons["429"] == tfc.throttled
+        assert len(tfc.variables(workspace_id)) == 40
+
+
+def test_client_rate_limiter_avoids_429s() -> None:
+    """Pacing below the server's limit keeps the client under it."""
+    with FakeTerraformCloud(rate_limit=20) as tfc:
+        workspace_id = tfc.add_workspace("app")
+
+        with _client(tfc, rate_limit=15) as client:
+            for _ in range(30):
+                client.get_variables(workspace_id)
+
+        assert tfc.throttled == 0
+
+
+def test_server_errors_are_retried() -> None:
+    """Injected 503s are retried until reads succeed."""
+    with FakeTerraformCloud(error_rate=0.3) as tfc:
+        workspace_id = tfc.add_workspace("app")
+
+        with _client(tfc) as client:
+            for _ in range(20):
+                assert client.get_variables(workspace_id) == []
+
+            assert tfc.injected_errors > 0
+            assert client.retry_stats.reasons["503"] == tfc.injected_errors
+
+
+def test_resolve_workspace_by_name(tfc: FakeTerraformCloud) -> None:
+    workspace_id = tfc.add_workspace("app-prod")
+
+    with _client(tfc) as client:
+        assert client.resolve_workspace("acme/app-prod") == workspace_id
+
+
+def test_read_timeout_gives_up_on_a_slow_server() -> None:
+    with FakeTerraformCloud(latency=0.5) as tfc:
+        workspace_id = tfc.add_workspace("app")
+        policy = RetryPolicy(max_attempts=2, backoff_base=0.001)
+
+        with _client(tfc, read_timeout=0.05, retry_policy=policy) as client:
+            started = time.perf_counter()
+            with pytest.raises(TerraformCloudError, match="timed out"):
+                client.get_variables(workspace_id)
+
+            assert time.perf_counter() - started < 0.4
+            assert client.retry_stats.reasons["ReadTimeout"] == 2
+
+
+# ---------------------------------------------------------------------------
+# VariableManager
+# ---------------------------------------------------------------------------
+
+
+def test_upload_download_round_trip(tfc: FakeTerraformCloud, tmp_path: Path) -> None:
+    """An uploaded file downloads back unchanged, multiline values included."""
+    workspace_id = tfc.add_workspace("app")
+    source = tmp_path / "in.tfvars"
+    source.write_text(
+        "# ========== app ==========\n"
+        'region = "eu-west-1" # [app]\n'
+        "cert = begin\n-----BEGIN-----\nabc\n-----END-----\nend # [app], mline\n"
+        "ports = [80, 443] # [app], hcl"
+    )
+
+    with VariableManager(client=_client(tfc), concurrency=4) as manager:
+        assert manager.upload_variables(workspace_id, str(source))
+        assert manager.download_variables(workspace_id, str(tmp_path / "out.tfvars"))
+
+    downloaded = (tmp_path / "out.tfvars").read_text()
+    assert sorted(downloaded.splitlines()) == sorted(source.read_text().splitlines())
+
+
+def test_writes_ignore_a_stale_snapshot(
+    tfc: FakeTerraformCloud, tmp_path: Path
+) -> None:
+    """Deletes and uploads see variables added after the snapshot was cached."""
+    workspace_id = tfc.add_workspace("app")
+    cache = SnapshotCache(str(tmp_path / "cache"))
+    with _client(tfc) as other, _client(tfc, cache=cache) as client:
+        client.create_variable(workspace_id, _payload("a", "1"))
+        client.get_variables(workspace_id)
+        other.create_variable(workspace_id, _payload("b", "2"))
+        manager = VariableManager(client=client)
+
+        summary = manager.delete_variables(workspace_id)
+
+    assert sorted(summary.deleted) == ["a", "b"]
+    assert tfc.variables(workspace_id) == {}
+
+
+def test_operation_deadline_returns_partial_progress(tmp_path: Path) -> None:
+    """An upload to a slow server stops at the deadline and reports what it did."""
+    source = tmp_path / "in.tfvars"
+    source.write_text("".join(f'var_{i} = "{i}" # [app]\n' for i in range(100)))
+
+    with FakeTerraformCloud(latency=0.02) as tfc:
+        workspace_id = tfc.add_workspace("app")
+        with VariableManager(
+            client=_client(tfc), concurrency=2, operation_timeout=0.3
+        ) as manager:
+            started = time.perf_counter()
+            summary = manager.upload_to_workspaces([workspace_id], str(source))
+            elapsed = time.perf_counter() - started
+
+        summary = summary[workspace_id]
+        assert elapsed < 1.0
+        assert summary.created and summary.cancelled
+        outcomes = len(summary.created) + len(summary.failed) + len(summary.cancelled)
+        assert outcomes == 100
+        # Only requests cut short in flight may have landed unreported.
+        assert len(summary.created) <= len(tfc.variables(workspace_id))
+        assert len(tfc.variables(workspace_id)) <= 100 - len(summary.cancelled)
+
+
+# ---------------------------------------------------------------------------
+# Load harness
+# ---------------------------------------------------------------------------
+
+
+def test_load_harness_reports_every_phase() -> None:
+    """A tiny load test with throttling and errors completes every phase."""
+    phases = load.run(
+        variables=20, workspaces=2, rate_limit=200, error_rate=0.05, concurrency=4
+    )
+
+    assert [p.name for p in phases] == ["upload", "download", "compare", "delete_all"]
+    assert all(p.ok for p in phases)
+    assert phases[0].calls["POST vars"] == sum(p.calls["DELETE var"] for p in phases)
+    assert phases[1].calls == {"GET vars": 2}
+    assert sum(p.retries for p in phases) == sum(p.throttled + p.errors for p in phases)
@@ -0,0 +1,45 @@
+"""
+Startup guards for the CLI, run in fresh interpreters.
+
+``--help`` and usage errors must return without importing the HTTP stack or
+reading credentials; the timings themselves are left to
+``python -m tests.benchmarks.startup``, as they depend on the machine.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+from tests.benchmarks import startup
+
+
+@pytest.mark.parametrize("name", list(startup.CASES))
+def test_cli_exits_before_loading_the_http_stack(name: str) -> None:
+    assert startup.heavy_modules(startup.CASES[name]) == []
+
+
+def test_importing_the_package_is_lazy() -> None:
+    """Public names are still importable, but only load their module on use."""
+    code = (
+        "import sys, terraform_var_manager as t\n"
+        "assert 'requests' not in sys.modules\n"
+        "from terraform_var_manager import TerraformCloudError\n"
+        "assert 'requests' not in sys.modules\n"
+        "assert t.VariableManager.__name__ == 'VariableManager'\n"
+        "assert 'requests' in sys.modules\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=startup._env(), capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_startup_benchmark_reports_every_case() -> None:
+    cases = startup.run(repeat=1)
+
+    assert [case.name for case in cases] == list(startup.CASES)
+    assert all(case.seconds > 0 for case in cases)
@@ -6,7 +6,8 @@ All tests are fully isolated — no real HTTP calls, no real filesystem access.
 from __future__ import annotations
 
 import json
-from unittest.mock import MagicMock, patch, mock_open
+import threading
+from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
 import requests
@@ -14,7 +15,13 @@ from hypothesis import given, settings
 from hypothesis import strategies as st
 
 from terraform_var_manager.api_client import TerraformCloudClient
-from terraform_var_manager.exceptions import TerraformCloudError
+from terraform_var_manager.cache import SnapshotCache
+from terraform_var_manager.deadline import Deadline, deadline_scope
+from terraform_var_manager.exceptions import DeadlineExceeded, TerraformCloudError
+from terraform_var_manager.metrics import RequestEvent
+from terraform_var_manager.rate_limit import RateLimiter
+from terraform_var_manager.retry import RetryPolicy
+from terraform_var_manager.workspace_index import WorkspaceIndex
 
 BASE_URL = "https://app.terraform.io/api/v2"
 
@@ -48,15 +55,95 @@ def test_init_loads_token_from_credentials_when_no_token_passed() -> None:
     with patch("builtins.open", m):
         with patch("json.load", return_value=credentials):
             c = TerraformCloudClient()
+            assert c.token == "loaded-token"
 
-    assert c.token == "loaded-token"
+    assert c.headers["Authorization"] == "Bearer loaded-token"
 
 
-def test_init_raises_when_credentials_file_missing() -> None:
-    """When no token is passed and the credentials file is absent, TerraformCloudError is raised."""
+def test_init_does_not_read_credentials() -> None:
+    """The credentials file is only read when the token is first needed."""
+    with patch.object(
+        TerraformCloudClient, "_load_token", return_value="lazy-token"
+    ) as mock_load:
+        c = TerraformCloudClient()
+        mock_load.assert_not_called()
+
+        c.session = MagicMock()
+        c.session.request.return_value = _page_response({"data": []})
+        c.rate_limiter = None
+        c.get_variables("ws-1")
+        c.get_variables("ws-2")
+
+    mock_load.assert_called_once_with()
+    sent = c.session.request.call_args[1]["headers"]
+    assert sent["Authorization"] == "Bearer lazy-token"
+
+
+def test_first_request_raises_when_credentials_file_missing() -> None:
+    """Without a token or credentials file, the first request raises an error."""
     with patch("builtins.open", side_effect=FileNotFoundError("no such file")):
+        c = TerraformCloudClient()
+        c.session = MagicMock()
         with pytest.raises(TerraformCloudError):
-            TerraformCloudClient()
+            c.get_variables("ws-1")
+
+    c.session.request.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Session pooling tests
+# ---------------------------------------------------------------------------
+
+
+def test_init_creates_pooled_session_with_configured_size() -> None:
+    """The client mounts an HTTPAdapter sized to pool_size for HTTPS requests."""
+    c = TerraformCloudClient(token="t", pool_size=25)
+
+    adapter = c.session.get_adapter("https://app.terraform.io")
+    assert adapter._pool_maxsize == 25  # type: ignore[attr-defined]
+    assert "Connection" not in c.headers
+
+
+def test_init_without_keep_alive_sends_connection_close() -> None:
+    """keep_alive=False asks the server to close the connection after each call."""
+    c = TerraformCloudClient(token="t", keep_alive=False)
+
+    assert c.headers["Connection"] == "close"
+
+
+def test_all_operations_share_the_same_session(client: TerraformCloudClient) -> None:
+    """Every operation goes through the client's session, not module-level requests."""
+    mock_response = MagicMock()
+    mock_response.raise_for_status.return_value = None
+    mock_response.json.return_value = {"data": []}
+    mock_response.status_code = 204
+
+    with patch.object(
+        client.session, "request", return_value=mock_response
+    ) as mock_req:
+        with patch("terraform_var_manager.api_client.requests.request") as module_req:
+            client.get_variables("ws-1")
+            client.create_variable("ws-1", {})
+            client.update_variable("ws-1", "var-1", {})
+            client.delete_variable("ws-1", "var-1")
+
+    assert [c[0][0] for c in mock_req.call_args_list] == [
+        "GET",
+        "POST",
+        "PATCH",
+        "DELETE",
+    ]
+    module_req.assert_not_called()
+
+
+def test_context_manager_closes_session() -> None:
+    """Leaving the ``with`` block closes the pooled session."""
+    session = MagicMock()
+
+    with TerraformCloudClient(token="t", session=session) as c:
+        assert c.session is session
+
+    session.close.assert_called_once()
 
 
 # ---------------------------------------------------------------------------
@@ -71,26 +158,656 @@ def test_get_variables_returns_list_on_200(client: TerraformCloudClient) -> None
     mock_response.raise_for_status.return_value = None
     mock_response.json.return_value = {"data": data}
 
-    with patch("terraform_var_manager.api_client.requests.get", return_value=mock_response) as mock_get:
+    with patch.object(
+        client.session, "request", return_value=mock_response
+    ) as mock_get:
         result = client.get_variables("ws-123")
 
     mock_get.assert_called_once_with(
+        "GET",
         f"{BASE_URL}/workspaces/ws-123/vars/",
         headers=client.headers,
+        timeout=(client.connect_timeout, client.read_timeout),
+        params={"page[number]": 1, "page[size]": 100},
     )
     assert result == data
 
 
 def test_get_variables_raises_on_request_exception(client: TerraformCloudClient) -> None:
-    """get_variables raises TerraformCloudError when requests.get raises RequestException."""
-    with patch(
-        "terraform_var_manager.api_client.requests.get",
+    """get_variables raises TerraformCloudError on a RequestException."""
+    with patch.object(
+        client.session,
+        "request",
         side_effect=requests.RequestException("network error"),
     ):
         with pytest.raises(TerraformCloudError):
             client.get_variables("ws-123")
 
 
+# ---------------------------------------------------------------------------
+# Rate limiting tests
+# ---------------------------------------------------------------------------
+
+
+def _status_response(status_code: int, headers: dict | None = None) -> MagicMock:
+    """Build a mock response with a status code and real headers."""
+    mock_response = MagicMock()
+    mock_response.status_code = status_code
+    mock_response.headers = headers or {}
+    if status_code >= 400:
+        mock_response.raise_for_status.side_effect = requests.HTTPError(
+            response=mock_response
+        )
+    else:
+        mock_response.raise_for_status.return_value = None
+    return mock_response
+
+
+def test_request_acquires_a_token_per_call() -> None:
+    """Every HTTP call takes one token from the client's rate limiter."""
+    limiter = MagicMock()
+    c = TerraformCloudClient(token="t", rate_limiter=limiter)
+
+    with patch.object(c.session, "request", return_value=_status_response(204)):
+        c.delete_variable("ws-1", "var-1")
+        c.delete_variable("ws-1", "var-2")
+
+    assert limiter.acquire.call_count == 2
+    assert limiter.observe.call_count == 2
+
+
+def test_request_retries_after_429_honouring_retry_after() -> None:
+    """A 429 pauses the limiter for Retry-After seconds and the call is retried."""
+    limiter = MagicMock()
+    c = TerraformCloudClient(token="t", rate_limiter=limiter)
+    responses = [
+        _status_response(429, {"Retry-After": "2"}),
+        _status_response(204),
+    ]
+
+    with patch.object(c.session, "request", side_effect=responses) as mock_req:
+        assert c.delete_variable("ws-1", "var-1") is True
+
+    assert mock_req.call_count == 2
+    limiter.pause.assert_called_once_with(2.0)
+
+
+def test_request_gives_up_after_max_rate_limit_retries() -> None:
+    """Persistent 429s end in TerraformCloudError after the configured retries."""
+    c = TerraformCloudClient(
+        token="t", rate_limiter=MagicMock(), max_rate_limit_retries=2
+    )
+
+    with patch.object(
+        c.session, "request", side_effect=[_status_response(429)] * 3
+    ) as mock_req:
+        with pytest.raises(TerraformCloudError):
+            c.delete_variable("ws-1", "var-1")
+
+    assert mock_req.call_count == 3
+
+
+def test_rate_budget_reports_available_tokens() -> None:
+    """rate_budget exposes the limiter's current budget, or None when disabled."""
+    limited = TerraformCloudClient(token="t", rate_limit=10)
+    assert limited.rate_budget == pytest.approx(10)
+    assert TerraformCloudClient(token="t", rate_limit=None).rate_budget is None
+
+
+# ---------------------------------------------------------------------------
+# Retry tests
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def no_sleep():
+    """Skip the real backoff waits."""
+    with patch("time.sleep") as mock_sleep:
+        yield mock_sleep
+
+
+@pytest.mark.parametrize("method", ["get", "patch", "delete"])
+def test_idempotent_calls_retry_5xx_then_succeed(
+    no_sleep: MagicMock, method: str
+) -> None:
+    """GET, PATCH and DELETE are retried on 5xx and succeed once the server recovers."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+    ok = _status_response(200)
+    ok.json.return_value = {"data": []}
+    responses = [_status_response(503), _status_response(502), ok]
+    calls = {
+        "get": lambda: c.get_variables("ws-1"),
+        "patch": lambda: c.update_variable("ws-1", "var-1", {}),
+        "delete": lambda: c.delete_variable("ws-1", "var-1"),
+    }
+
+    with patch.object(c.session, "request", side_effect=responses) as mock_req:
+        calls[method]()
+
+    assert mock_req.call_count == 3
+    assert no_sleep.call_count == 2
+    stats = c.retry_stats.summary()
+    assert stats["attempts"] == 3
+    assert stats["retries"] == 2
+    assert stats["reasons"] == {"503": 1, "502": 1}
+
+
+def test_idempotent_calls_retry_connection_errors(no_sleep: MagicMock) -> None:
+    """Connection resets and read timeouts on idempotent calls are retried."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+    responses = [
+        requests.ConnectionError("reset"),
+        requests.ReadTimeout("slow"),
+        _status_response(204),
+    ]
+
+    with patch.object(c.session, "request", side_effect=responses):
+        assert c.delete_variable("ws-1", "var-1") is True
+
+    assert c.retry_stats.reasons == {"ConnectionError": 1, "ReadTimeout": 1}
+
+
+def test_post_is_not_retried_when_it_may_have_reached_the_server(
+    no_sleep: MagicMock,
+) -> None:
+    """A POST that hit a 5xx or lost its response is not resent by default."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+
+    with patch.object(
+        c.session, "request", return_value=_status_response(503)
+    ) as mock_req:
+        with pytest.raises(TerraformCloudError):
+            c.create_variable("ws-1", {})
+    with patch.object(
+        c.session, "request", side_effect=requests.ReadTimeout("slow")
+    ) as mock_timeout:
+        with pytest.raises(TerraformCloudError):
+            c.create_variable("ws-1", {})
+
+    assert mock_req.call_count == 1
+    assert mock_timeout.call_count == 1
+    assert c.retry_stats.gave_up == 2
+
+
+def test_post_is_retried_on_connect_timeout(no_sleep: MagicMock) -> None:
+    """A POST that never connected is safe to resend."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+    created = _status_response(201)
+    created.json.return_value = {"data": {"id": "var-new"}}
+
+    with patch.object(
+        c.session,
+        "request",
+        side_effect=[requests.ConnectTimeout("no route"), created],
+    ):
+        assert c.create_variable("ws-1", {}) == {"data": {"id": "var-new"}}
+
+
+def test_post_retry_can_be_enabled(no_sleep: MagicMock) -> None:
+    """retry_post=True retries POST on 5xx like the idempotent methods."""
+    c = TerraformCloudClient(
+        token="t", rate_limit=None, retry_policy=RetryPolicy(retry_post=True)
+    )
+    created = _status_response(201)
+    created.json.return_value = {}
+
+    with patch.object(
+        c.session, "request", side_effect=[_status_response(500), created]
+    ) as mock_req:
+        c.create_variable("ws-1", {})
+
+    assert mock_req.call_count == 2
+
+
+def test_retries_stop_at_max_attempts(no_sleep: MagicMock) -> None:
+    """A persistently failing call makes exactly max_attempts attempts."""
+    c = TerraformCloudClient(
+        token="t", rate_limit=None, retry_policy=RetryPolicy(max_attempts=3)
+    )
+
+    with patch.object(
+        c.session, "request", return_value=_status_response(500)
+    ) as mock_req:
+        with pytest.raises(TerraformCloudError):
+            c.delete_variable("ws-1", "var-1")
+
+    assert mock_req.call_count == 3
+    assert c.retry_stats.gave_up == 1
+
+
+def test_retries_stop_at_deadline(no_sleep: MagicMock) -> None:
+    """No retry starts if its backoff would run past the total deadline."""
+    c = TerraformCloudClient(
+        token="t",
+        rate_limit=None,
+        retry_policy=RetryPolicy(backoff_base=10, deadline=1.0),
+    )
+
+    with patch("terraform_var_manager.retry.random.uniform", return_value=5.0):
+        with patch.object(
+            c.session, "request", return_value=_status_response(500)
+        ) as mock_req:
+            with pytest.raises(TerraformCloudError):
+                c.delete_variable("ws-1", "var-1")
+
+    assert mock_req.call_count == 1
+    no_sleep.assert_not_called()
+
+
+def test_client_errors_are_not_retried(no_sleep: MagicMock) -> None:
+    """4xx responses other than 429 fail immediately."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+
+    with patch.object(
+        c.session, "request", return_value=_status_response(404)
+    ) as mock_req:
+        with pytest.raises(TerraformCloudError):
+            c.get_variables("ws-1")
+
+    assert mock_req.call_count == 1
+
+
+@given(attempt=st.integers(min_value=1, max_value=30))
+def test_backoff_is_jittered_below_exponential_cap(attempt: int) -> None:
+    """Backoff waits lie in [0, min(backoff_max, base * 2**(attempt-1))]."""
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=30.0)
+
+    delay = policy.backoff(attempt)
+
+    assert 0 <= delay <= min(30.0, 0.5 * 2 ** (attempt - 1))
+
+
+# ---------------------------------------------------------------------------
+# iter_variables tests
+# ---------------------------------------------------------------------------
+
+
+def _page_response(body: dict) -> MagicMock:
+    """Build a mock response whose JSON body is one page of variables."""
+    mock_response = MagicMock()
+    mock_response.raise_for_status.return_value = None
+    mock_response.json.return_value = body
+    return mock_response
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_variables_follows_links_next(
+    client: TerraformCloudClient, prefetch: bool
+) -> None:
+    """iter_variables keeps requesting pages until links.next is empty."""
+    next_url = f"{BASE_URL}/workspaces/ws-123/vars/?page%5Bnumber%5D=2"
+    pages = [
+        _page_response({"data": [{"id": "var-1"}], "links": {"next": next_url}}),
+        _page_response({"data": [{"id": "var-2"}], "links": {"next": None}}),
+    ]
+
+    with patch.object(client.session, "request", side_effect=pages) as mock_req:
+        result = list(client.iter_variables("ws-123", prefetch=prefetch))
+
+    assert [v["id"] for v in result] == ["var-1", "var-2"]
+    assert mock_req.call_args_list[1][0][1] == next_url
+    assert mock_req.call_args_list[1][1]["params"] is None
+
+
+def test_iter_variables_follows_meta_pagination(client: TerraformCloudClient) -> None:
+    """Without links, iter_variables uses meta.pagination.next-page and page_size."""
+    pages = [
+        _page_response(
+            {"data": [{"id": "var-1"}], "meta": {"pagination": {"next-page": 2}}}
+        ),
+        _page_response(
+            {"data": [{"id": "var-2"}], "meta": {"pagination": {"next-page": None}}}
+        ),
+    ]
+
+    with patch.object(client.session, "request", side_effect=pages) as mock_req:
+        result = list(client.iter_variables("ws-123", page_size=1))
+
+    assert [v["id"] for v in result] == ["var-1", "var-2"]
+    assert [c[1]["params"] for c in mock_req.call_args_list] == [
+        {"page[number]": 1, "page[size]": 1},
+        {"page[number]": 2, "page[size]": 1},
+    ]
+
+
+def test_iter_variables_is_lazy(client: TerraformCloudClient) -> None:
+    """Without prefetch, a page is only requested once the caller reaches it."""
+    pages = [
+        _page_response(
+            {"data": [{"id": "var-1"}], "meta": {"pagination": {"next-page": 2}}}
+        ),
+        _page_response({"data": [{"id": "var-2"}]}),
+    ]
+
+    with patch.object(client.session, "request", side_effect=pages) as mock_req:
+        iterator = client.iter_variables("ws-123", prefetch=False)
+        assert mock_req.call_count == 0
+        assert next(iterator)["id"] == "var-1"
+        assert mock_req.call_count == 1
+
+
+def test_iter_variables_raises_terraform_cloud_error_from_prefetched_page(
+    client: TerraformCloudClient,
+) -> None:
+    """A failure while prefetching a later page surfaces as TerraformCloudError."""
+    pages = [
+        _page_response({"data": [{"id": "var-1"}], "links": {"next": "next-url"}}),
+        requests.ConnectionError("reset"),
+    ]
+
+    client.retry_policy = RetryPolicy(max_attempts=1)
+
+    with patch.object(client.session, "request", side_effect=pages):
+        with pytest.raises(TerraformCloudError):
+            list(client.iter_variables("ws-123"))
+
+
+def test_iter_workspaces_lists_every_page_of_an_organization(
+    client: TerraformCloudClient,
+) -> None:
+    """iter_workspaces pages through /organizations/{org}/workspaces."""
+    pages = [
+        _page_response(
+            {"data": [{"id": "ws-1"}], "meta": {"pagination": {"next-page": 2}}}
+        ),
+        _page_response({"data": [{"id": "ws-2"}]}),
+    ]
+
+    with patch.object(client.session, "request", side_effect=pages) as mock_req:
+        result = list(client.iter_workspaces("acme"))
+
+    assert [w["id"] for w in result] == ["ws-1", "ws-2"]
+    assert mock_req.call_args_list[0][0][1] == (
+        f"{BASE_URL}/organizations/acme/workspaces"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Snapshot cache tests
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def cached_client(tmp_path) -> TerraformCloudClient:
+    """Client backed by a snapshot cache in a temporary directory."""
+    return TerraformCloudClient(token="test-token", cache=SnapshotCache(str(tmp_path)))
+
+
+def test_warm_cache_serves_variables_without_requests(
+    cached_client: TerraformCloudClient,
+) -> None:
+    """A second fetch of the same workspace makes no HTTP request."""
+    page = _page_response({"data": [{"id": "var-1"}]})
+
+    with patch.object(cached_client.session, "request", return_value=page) as mock_req:
+        first = cached_client.get_variables("ws-123")
+        second = cached_client.get_variables("ws-123")
+
+    assert first == second == [{"id": "var-1"}]
+    assert mock_req.call_count == 1
+
+
+def test_cache_is_shared_between_clients(tmp_path) -> None:
+    """A snapshot written by one client (or process) is used by another."""
+    writer = TerraformCloudClient(token="t", cache=SnapshotCache(str(tmp_path)))
+    reader = TerraformCloudClient(token="t", cache=SnapshotCache(str(tmp_path)))
+    page = _page_response({"data": [{"id": "var-1"}]})
+
+    with patch.object(writer.session, "request", return_value=page):
+        writer.get_variables("ws-123")
+    with patch.object(reader.session, "request") as mock_req:
+        assert reader.get_variables("ws-123") == [{"id": "var-1"}]
+
+    mock_req.assert_not_called()
+
+
+def test_partially_consumed_fetch_is_not_cached(
+    cached_client: TerraformCloudClient,
+) -> None:
+    """Only a complete listing of the workspace becomes a snapshot."""
+    pages = [
+        _page_response({"data": [{"id": "var-1"}], "links": {"next": "next-url"}}),
+        _page_response({"data": [{"id": "var-2"}]}),
+    ]
+
+    with patch.object(cached_client.session, "request", side_effect=pages):
+        iterator = cached_client.iter_variables("ws-123", prefetch=False)
+        next(iterator)
+        iterator.close()
+
+    assert cached_client.cache is not None
+    assert cached_client.cache.get(cached_client.cache_host, "ws-123") is None
+
+
+def test_use_cache_false_lists_live_variables_and_refreshes_the_snapshot(
+    cached_client: TerraformCloudClient,
+) -> None:
+    """Callers about to write bypass a fresh snapshot; the listing replaces it."""
+    old = _page_response({"data": [{"id": "var-1"}]})
+    live = _page_response({"data": [{"id": "var-1"}, {"id": "var-2"}]})
+
+    with patch.object(cached_client.session, "request", return_value=old):
+        cached_client.get_variables("ws-123")
+    with patch.object(cached_client.session, "request", return_value=live) as mock_req:
+        assert len(cached_client.get_variables("ws-123", use_cache=False)) == 2
+        assert len(cached_client.get_variables("ws-123")) == 2
+
+    assert mock_req.call_count == 1
+
+
+@pytest.mark.parametrize("write", ["create", "update", "delete"])
+def test_writes_invalidate_the_workspace_snapshot(
+    cached_client: TerraformCloudClient, write: str
+) -> None:
+    """create/update/delete through the client drop the stale snapshot."""
+    page = _page_response({"data": [{"id": "var-1"}]})
+    write_response = MagicMock(status_code=204)
+    write_response.json.return_value = {}
+
+    with patch.object(cached_client.session, "request", return_value=page):
+        cached_client.get_variables("ws-123")
+    with patch.object(cached_client.session, "request", return_value=write_response):
+        if write == "create":
+            cached_client.create_variable("ws-123", {})
+        elif write == "update":
+            cached_client.update_variable("ws-123", "var-1", {})
+        else:
+            cached_client.delete_variable("ws-123", "var-1")
+    with patch.object(cached_client.session, "request", return_value=page) as mock_req:
+        cached_client.get_variables("ws-123")
+
+    assert mock_req.call_count == 1
+
+
+def test_failed_write_still_invalidates(cached_client: TerraformCloudClient) -> None:
+    """A write that errored may have been applied, so the snapshot is dropped."""
+    page = _page_response({"data": [{"id": "var-1"}]})
+    cached_client.retry_policy = RetryPolicy(max_attempts=1)
+
+    with patch.object(cached_client.session, "request", return_value=page):
+        cached_client.get_variables("ws-123")
+    with patch.object(
+        cached_client.session, "request", side_effect=requests.ConnectionError("reset")
+    ):
+        with pytest.raises(TerraformCloudError):
+            cached_client.update_variable("ws-123", "var-1", {})
+
+    assert cached_client.cache is not None
+    assert cached_client.cache.get(cached_client.cache_host, "ws-123") is None
+
+
+def test_fetch_overlapping_a_write_is_not_cached(
+    cached_client: TerraformCloudClient,
+) -> None:
+    """A listing that may predate a concurrent write is not stored."""
+    page = _page_response({"data": [{"id": "var-1"}]})
+    write_response = MagicMock(status_code=204)
+
+    with patch.object(cached_client.session, "request", return_value=page):
+        iterator = cached_client.iter_variables("ws-123", prefetch=False)
+        next(iterator)
+    with patch.object(cached_client.session, "request", return_value=write_response):
+        cached_client.delete_variable("ws-123", "var-1")
+    list(iterator)
+
+    assert cached_client.cache is not None
+    assert cached_client.cache.get(cached_client.cache_host, "ws-123") is None
+
+
+# ---------------------------------------------------------------------------
+# Workspace name resolution tests
+# ---------------------------------------------------------------------------
+
+
+def _workspace(workspace_id: str, name: str) -> dict:
+    return {"id": workspace_id, "attributes": {"name": name}}
+
+
+def _not_found() -> MagicMock:
+    response = MagicMock(status_code=404)
+    response.raise_for_status.side_effect = requests.HTTPError(
+        "404 Not Found", response=response
+    )
+    return response
+
+
+@pytest.fixture
+def indexed_client(tmp_path) -> TerraformCloudClient:
+    """Client resolving names through a workspace index in a temporary directory."""
+    return TerraformCloudClient(
+        token="test-token", workspace_index=WorkspaceIndex(str(tmp_path))
+    )
+
+
+def test_resolve_workspace_passes_ids_through(client: TerraformCloudClient) -> None:
+    """A plain workspace ID needs no request."""
+    with patch.object(client.session, "request") as mock_req:
+        assert client.resolve_workspace("ws-123") == "ws-123"
+
+    mock_req.assert_not_called()
+
+
+def test_resolve_workspace_indexes_the_organization_once(
+    indexed_client: TerraformCloudClient,
+) -> None:
+    """The first name lists the organization; later names cost no request."""
+    page = _page_response(
+        {"data": [_workspace("ws-1", "app-prod"), _workspace("ws-2", "app-dev")]}
+    )
+
+    with patch.object(indexed_client.session, "request", return_value=page) as req:
+        assert indexed_client.resolve_workspace("acme/app-prod") == "ws-1"
+        assert indexed_client.resolve_workspace("acme/app-dev") == "ws-2"
+
+    assert req.call_count == 1
+    assert req.call_args[0][1] == f"{BASE_URL}/organizations/acme/workspaces"
+
+
+def test_resolve_workspace_fetches_only_names_missing_from_the_index(
+    indexed_client: TerraformCloudClient,
+) -> None:
+    """A workspace created after the listing is looked up on its own and kept."""
+    listing = _page_response({"data": [_workspace("ws-1", "app-prod")]})
+    single = _page_response({"data": _workspace("ws-9", "app-new")})
+
+    with patch.object(indexed_client.session, "request", return_value=listing):
+        indexed_client.resolve_workspace("acme/app-prod")
+    with patch.object(indexed_client.session, "request", return_value=single) as req:
+        assert indexed_client.resolve_workspace("acme/app-new") == "ws-9"
+        assert indexed_client.resolve_workspace("acme/app-new") == "ws-9"
+
+    req.assert_called_once()
+    assert req.call_args[0][1] == f"{BASE_URL}/organizations/acme/workspaces/app-new"
+
+
+def test_resolve_workspace_relists_a_stale_index(tmp_path) -> None:
+    """An index older than its TTL is rebuilt from a new listing."""
+    now = [1000.0]
+    index = WorkspaceIndex(str(tmp_path), ttl=60, clock=lambda: now[0])
+    client = TerraformCloudClient(token="t", workspace_index=index)
+    before = _page_response({"data": [_workspace("ws-1", "app")]})
+    after = _page_response({"data": [_workspace("ws-2", "app")]})
+
+    with patch.object(client.session, "request", return_value=before):
+        assert client.resolve_workspace("acme/app") == "ws-1"
+    now[0] += 61
+    with patch.object(client.session, "request", return_value=after):
+        assert client.resolve_workspace("acme/app") == "ws-2"
+
+
+def test_404_for_an_indexed_workspace_corrects_the_index(
+    indexed_client: TerraformCloudClient,
+) -> None:
+    """A recreated workspace is resolved once more and its new ID indexed."""
+    index = indexed_client.workspace_index
+    assert index is not None
+    index.replace(indexed_client.cache_host, "acme", {"app": "ws-old"})
+    single = _page_response({"data": _workspace("ws-new", "app")})
+
+    assert indexed_client.resolve_workspace("acme/app") == "ws-old"
+    with patch.object(
+        indexed_client.session, "request", side_effect=[_not_found(), single]
+    ) as req:
+        with pytest.raises(TerraformCloudError, match="acme/app is now ws-new"):
+            indexed_client.get_variables("ws-old")
+
+    assert req.call_args[0][1] == f"{BASE_URL}/organizations/acme/workspaces/app"
+    assert index.lookup(indexed_client.cache_host, "acme", "app") == "ws-new"
+    with patch.object(indexed_client.session, "request") as req:
+        assert indexed_client.resolve_workspace("acme/app") == "ws-new"
+    req.assert_not_called()
+
+
+def test_404_for_a_deleted_indexed_workspace_drops_it(
+    indexed_client: TerraformCloudClient,
+) -> None:
+    index = indexed_client.workspace_index
+    assert index is not None
+    index.replace(indexed_client.cache_host, "acme", {"app": "ws-old"})
+    indexed_client.resolve_workspace("acme/app")
+
+    with patch.object(indexed_client.session, "request", return_value=_not_found()):
+        with pytest.raises(TerraformCloudError, match="no longer exists"):
+            indexed_client.delete_variable("ws-old", "var-1")
+
+    assert index.lookup(indexed_client.cache_host, "acme", "app") is None
+
+
+def test_404_for_a_workspace_id_given_directly_is_left_alone(
+    indexed_client: TerraformCloudClient,
+) -> None:
+    """Only IDs that came from the index trigger a new lookup."""
+    with patch.object(
+        indexed_client.session, "request", return_value=_not_found()
+    ) as req:
+        with pytest.raises(TerraformCloudError, match="Failed to get variables"):
+            indexed_client.get_variables("ws-123")
+
+    req.assert_called_once()
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_resolve_workspace_raises_for_unknown_names(
+    client: TerraformCloudClient, tmp_path, indexed: bool
+) -> None:
+    """A name the organization does not have raises TerraformCloudError."""
+    if indexed:
+        client.workspace_index = WorkspaceIndex(str(tmp_path))
+        client.workspace_index.replace(client.cache_host, "acme", {})
+
+    with patch.object(client.session, "request", return_value=_not_found()):
+        with pytest.raises(TerraformCloudError, match="Workspace not found"):
+            client.resolve_workspace("acme/nope")
+
+
+@pytest.mark.parametrize("reference", ["/app", "acme/", "acme/app/extra"])
+def test_resolve_workspace_rejects_malformed_references(
+    client: TerraformCloudClient, reference: str
+) -> None:
+    with pytest.raises(TerraformCloudError, match="Invalid workspace reference"):
+        client.resolve_workspace(reference)
+
+
 # ---------------------------------------------------------------------------
 # create_variable tests
 # ---------------------------------------------------------------------------
@@ -106,21 +823,26 @@ def test_create_variable_sends_post_with_correct_payload(client: TerraformCloudC
     mock_response.json.return_value = response_body
     mock_response.status_code = 201
 
-    with patch("terraform_var_manager.api_client.requests.post", return_value=mock_response) as mock_post:
+    with patch.object(
+        client.session, "request", return_value=mock_response
+    ) as mock_post:
         result = client.create_variable("ws-123", payload)
 
     mock_post.assert_called_once_with(
+        "POST",
         f"{BASE_URL}/workspaces/ws-123/vars/",
         headers=client.headers,
+        timeout=(client.connect_timeout, client.read_timeout),
         json=payload,
     )
     assert result == response_body
 
 
 def test_create_variable_raises_on_request_exception(client: TerraformCloudClient) -> None:
-    """create_variable raises TerraformCloudError when requests.post raises RequestException."""
-    with patch(
-        "terraform_var_manager.api_client.requests.post",
+    """create_variable raises TerraformCloudError on a RequestException."""
+    with patch.object(
+        client.session,
+        "request",
         side_effect=requests.RequestException("network error"),
     ):
         with pytest.raises(TerraformCloudError):
@@ -142,21 +864,26 @@ def test_update_variable_sends_patch_with_correct_payload(client: TerraformCloud
     mock_response.json.return_value = response_body
     mock_response.status_code = 200
 
-    with patch("terraform_var_manager.api_client.requests.patch", return_value=mock_response) as mock_patch:
+    with patch.object(
+        client.session, "request", return_value=mock_response
+    ) as mock_patch:
         result = client.update_variable("ws-123", "var-abc", payload)
 
     mock_patch.assert_called_once_with(
+        "PATCH",
         f"{BASE_URL}/workspaces/ws-123/vars/var-abc",
         headers=client.headers,
+        timeout=(client.connect_timeout, client.read_timeout),
         json=payload,
     )
     assert result == response_body
 
 
 def test_update_variable_raises_on_request_exception(client: TerraformCloudClient) -> None:
-    """update_variable raises TerraformCloudError when requests.patch raises RequestException."""
-    with patch(
-        "terraform_var_manager.api_client.requests.patch",
+    """update_variable raises TerraformCloudError on a RequestException."""
+    with patch.object(
+        client.session,
+        "request",
         side_effect=requests.RequestException("network error"),
     ):
         with pytest.raises(TerraformCloudError):
@@ -174,22 +901,306 @@ def test_delete_variable_returns_true_on_204(client: TerraformCloudClient) -> No
     mock_response.raise_for_status.return_value = None
     mock_response.status_code = 204
 
-    with patch("terraform_var_manager.api_client.requests.delete", return_value=mock_response):
+    with patch.object(client.session, "request", return_value=mock_response):
         result = client.delete_variable("ws-123", "var-abc")
 
     assert result is True
 
 
 def test_delete_variable_raises_on_request_exception(client: TerraformCloudClient) -> None:
-    """delete_variable raises TerraformCloudError when requests.delete raises RequestException."""
-    with patch(
-        "terraform_var_manager.api_client.requests.delete",
+    """delete_variable raises TerraformCloudError on a RequestException."""
+    with patch.object(
+        client.session,
+        "request",
         side_effect=requests.RequestException("network error"),
     ):
         with pytest.raises(TerraformCloudError):
             client.delete_variable("ws-123", "var-abc")
 
 
+# ---------------------------------------------------------------------------
+# Variable set tests
+# ---------------------------------------------------------------------------
+
+VARSET_VARS = f"{BASE_URL}/varsets/varset-1/relationships/vars"
+
+
+def test_varset_variables_use_the_varset_endpoints(
+    client: TerraformCloudClient,
+) -> None:
+    """Variable methods given a varset ID talk to the variable set."""
+    response = _page_response({"data": [{"id": "var-1"}]})
+    response.status_code = 204
+
+    with patch.object(client.session, "request", return_value=response) as mock_req:
+        assert client.get_variables("varset-1") == [{"id": "var-1"}]
+        client.create_variable("varset-1", {})
+        client.update_variable("varset-1", "var-1", {})
+        client.delete_variable("varset-1", "var-1")
+
+    assert [(c[0][0], c[0][1]) for c in mock_req.call_args_list] == [
+        ("GET", VARSET_VARS),
+        ("POST", VARSET_VARS),
+        ("PATCH", f"{VARSET_VARS}/var-1"),
+        ("DELETE", f"{VARSET_VARS}/var-1"),
+    ]
+
+
+@pytest.mark.parametrize(("method", "verb"), [("POST", "attach"), ("DELETE", "detach")])
+def test_attach_and_detach_varset_use_one_request(
+    client: TerraformCloudClient, method: str, verb: str
+) -> None:
+    """Any number of workspaces is (de)linked with a single request."""
+    response = MagicMock(status_code=204)
+    workspace_ids = [f"ws-{i}" for i in range(50)]
+
+    with patch.object(client.session, "request", return_value=response) as mock_req:
+        getattr(client, f"{verb}_varset")("varset-1", workspace_ids)
+
+    mock_req.assert_called_once_with(
+        method,
+        f"{BASE_URL}/varsets/varset-1/relationships/workspaces",
+        headers=client.headers,
+        timeout=(client.connect_timeout, client.read_timeout),
+        json={"data": [{"type": "workspaces", "id": ws} for ws in workspace_ids]},
+    )
+
+
+def test_attach_varset_raises_terraform_cloud_error(
+    client: TerraformCloudClient,
+) -> None:
+    with patch.object(
+        client.session, "request", side_effect=requests.RequestException("boom")
+    ):
+        with pytest.raises(TerraformCloudError, match="attach variable set"):
+            client.attach_varset("varset-1", ["ws-1"])
+
+
+# ---------------------------------------------------------------------------
+# Timeout and deadline tests
+# ---------------------------------------------------------------------------
+
+
+def _fake_deadline(seconds: float) -> tuple[Deadline, list[float]]:
+    """A deadline on a clock that only moves when the test moves it."""
+    now = [0.0]
+    return Deadline(seconds, clock=lambda: now[0]), now
+
+
+def test_requests_use_configured_timeouts() -> None:
+    """Each attempt passes the (connect, read) timeouts to the session."""
+    c = TerraformCloudClient(
+        token="t", rate_limit=None, connect_timeout=3, read_timeout=7
+    )
+
+    with patch.object(c.session, "request", return_value=_status_response(204)) as req:
+        c.delete_variable("ws-1", "var-1")
+
+    assert req.call_args[1]["timeout"] == (3, 7)
+
+
+def test_deadline_shortens_timeouts_to_the_time_left() -> None:
+    c = TerraformCloudClient(
+        token="t", rate_limit=None, connect_timeout=3, read_timeout=7
+    )
+    deadline, now = _fake_deadline(10)
+    now[0] = 5.0
+
+    with patch.object(c.session, "request", return_value=_status_response(204)) as req:
+        with deadline_scope(deadline):
+            c.delete_variable("ws-1", "var-1")
+
+    assert req.call_args[1]["timeout"] == (3, 5.0)
+
+
+def test_expired_deadline_stops_requests_before_sending() -> None:
+    c = TerraformCloudClient(token="t", rate_limit=None)
+    deadline, now = _fake_deadline(1)
+    now[0] = 1.0
+
+    with patch.object(c.session, "request") as req:
+        with deadline_scope(deadline), pytest.raises(DeadlineExceeded):
+            c.delete_variable("ws-1", "var-1")
+
+    req.assert_not_called()
+
+
+def test_deadline_only_applies_to_its_own_context() -> None:
+    """A client shared by several operations sees each one's own deadline."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+    deadline, now = _fake_deadline(1)
+    now[0] = 1.0
+    errors: list[Exception] = []
+
+    def delete_in_another_thread() -> None:
+        try:
+            c.delete_variable("ws-1", "var-2")
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    with patch.object(c.session, "request", return_value=_status_response(204)) as req:
+        with deadline_scope(deadline):
+            other = threading.Thread(target=delete_in_another_thread)
+            other.start()
+            other.join()
+            with pytest.raises(DeadlineExceeded):
+                c.delete_variable("ws-1", "var-1")
+        c.delete_variable("ws-1", "var-3")
+
+    assert errors == []
+    assert req.call_count == 2
+
+
+def test_prefetched_pages_share_the_deadline() -> None:
+    """The prefetch thread runs under the deadline of the caller."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+    deadline, now = _fake_deadline(1)
+    next_url = f"{BASE_URL}/workspaces/ws-1/vars/?page%5Bnumber%5D=2"
+    pages = [
+        _page_response({"data": [{"id": "var-1"}], "links": {"next": next_url}}),
+        _page_response({"data": [{"id": "var-2"}], "links": {}}),
+    ]
+
+    def request(*args: object, **kwargs: object) -> MagicMock:
+        now[0] += 1.0
+        return pages.pop(0)
+
+    with patch.object(c.session, "request", side_effect=request):
+        with deadline_scope(deadline), pytest.raises(DeadlineExceeded):
+            list(c.iter_variables("ws-1", prefetch=True))
+
+
+def test_deadline_stops_retries(no_sleep: MagicMock) -> None:
+    """No retry is started when its backoff would run past the deadline."""
+    c = TerraformCloudClient(
+        token="t", rate_limit=None, retry_policy=RetryPolicy(backoff_base=5)
+    )
+    deadline, now = _fake_deadline(1)
+
+    with patch("random.uniform", return_value=2.0):
+        with patch.object(
+            c.session, "request", return_value=_status_response(503)
+        ) as req:
+            with deadline_scope(deadline), pytest.raises(TerraformCloudError):
+                c.delete_variable("ws-1", "var-1")
+
+    assert req.call_count == 1
+    no_sleep.assert_not_called()
+
+
+def test_timeout_at_the_deadline_raises_deadline_exceeded() -> None:
+    """A request cut short by the deadline reports the deadline, not a timeout."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+    deadline, now = _fake_deadline(1)
+
+    def time_out(*args: object, **kwargs: object) -> None:
+        now[0] = 1.0
+        raise requests.ReadTimeout("read timed out")
+
+    with patch.object(c.session, "request", side_effect=time_out):
+        with deadline_scope(deadline):
+            with pytest.raises(DeadlineExceeded, match="read timed out"):
+                c.get_variables("ws-1")
+
+    assert c.retry_stats.gave_up == 1
+
+
+def test_rate_limit_wait_past_the_deadline_is_not_taken() -> None:
+    c = TerraformCloudClient(token="t", rate_limit=1)
+    deadline, _ = _fake_deadline(0.5)
+
+    with patch.object(c.session, "request", return_value=_status_response(204)) as req:
+        with deadline_scope(deadline):
+            c.delete_variable("ws-1", "var-1")
+            with pytest.raises(DeadlineExceeded, match="rate limit"):
+                c.delete_variable("ws-1", "var-2")
+
+    assert req.call_count == 1
+
+
+def test_rate_limit_wait_using_up_the_deadline_cancels_the_request() -> None:
+    """A drained limiter whose wait ends at the deadline cancels the request."""
+    now = [0.0]
+
+    def sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    limiter = RateLimiter(rate=1, clock=lambda: now[0], sleep=sleep)
+    c = TerraformCloudClient(token="t", rate_limiter=limiter)
+    deadline = Deadline(1, clock=lambda: now[0])
+
+    with patch.object(c.session, "request", return_value=_status_response(204)) as req:
+        with deadline_scope(deadline):
+            c.delete_variable("ws-1", "var-1")
+            with pytest.raises(DeadlineExceeded) as exc_info:
+                c.delete_variable("ws-1", "var-2")
+
+    assert req.call_count == 1
+    assert not exc_info.value.sent
+
+
+def test_no_time_left_raises_instead_of_zero_timeouts() -> None:
+    """requests rejects (0.0, 0.0), so an exhausted deadline raises first."""
+    c = TerraformCloudClient(token="t", rate_limit=None)
+    deadline, now = _fake_deadline(1)
+    now[0] = 1.0
+
+    with pytest.raises(DeadlineExceeded, match="GET /vars"):
+        c._timeout(deadline, "GET /vars")
+
+
+# ---------------------------------------------------------------------------
+# Request hook tests
+# ---------------------------------------------------------------------------
+
+
+def test_hooks_receive_one_event_per_call(no_sleep: MagicMock) -> None:
+    """A retried call is reported once, with its retries, waits and bytes."""
+    events: list[RequestEvent] = []
+    limiter = MagicMock()
+    limiter.acquire.return_value = 0.25
+    c = TerraformCloudClient(token="t", rate_limiter=limiter, hooks=[events.append])
+    ok = _status_response(204)
+    ok.content = b""
+    ok.request.body = b'{"data": {}}'
+
+    with patch.object(c.session, "request", side_effect=[_status_response(503), ok]):
+        c.update_variable("ws-1", "var-9", {"data": {}})
+
+    assert len(events) == 1
+    event = events[0]
+    assert event.method == "PATCH"
+    assert event.endpoint == "/workspaces/{workspace_id}/vars/{variable_id}"
+    assert event.status == 204
+    assert event.retries == 1
+    assert event.rate_limit_wait == pytest.approx(0.5)
+    assert event.bytes_sent == len(b'{"data": {}}')
+    assert event.error is None
+    assert event.seconds >= 0
+
+
+def test_hooks_receive_failed_calls() -> None:
+    """Calls that raise are reported with their final status and the error."""
+    events: list[RequestEvent] = []
+    c = TerraformCloudClient(token="t", rate_limit=None, hooks=[events.append])
+
+    with patch.object(c.session, "request", return_value=_status_response(404)):
+        with pytest.raises(TerraformCloudError):
+            c.delete_variable("ws-1", "var-1")
+
+    assert [(e.status, e.error) for e in events] == [(404, "HTTPError")]
+
+
+def test_failing_hook_does_not_fail_the_request() -> None:
+    def broken(event: RequestEvent) -> None:
+        raise RuntimeError("boom")
+
+    c = TerraformCloudClient(token="t", rate_limit=None, hooks=[broken])
+
+    with patch.object(c.session, "request", return_value=_status_response(204)):
+        assert c.delete_variable("ws-1", "var-1") is True
+
+
 # ---------------------------------------------------------------------------
 # Property 3: TerraformCloudClient raises TerraformCloudError on any HTTP error
 # Validates: Requirements 10.7
@@ -208,6 +1219,11 @@ def test_http_error_raises_terraform_cloud_error(status_code: int) -> None:
 
     Validates: Requirements 10.7
     """
+    with patch("time.sleep"):  # 429 is retried after Retry-After; don't wait
+        _assert_all_methods_raise_for_status(status_code)
+
+
+def _assert_all_methods_raise_for_status(status_code: int) -> None:
     client = TerraformCloudClient(token="test-token")
 
     # Build a mock response whose raise_for_status() raises HTTPError
@@ -220,32 +1236,36 @@ def test_http_error_raises_terraform_cloud_error(status_code: int) -> None:
         return mock_resp
 
     # --- get_variables ---
-    with patch(
-        "terraform_var_manager.api_client.requests.get",
+    with patch.object(
+        client.session,
+        "request",
         return_value=make_mock_response(),
     ):
         with pytest.raises(TerraformCloudError):
             client.get_variables("ws-123")
 
     # --- create_variable ---
-    with patch(
-        "terraform_var_manager.api_client.requests.post",
+    with patch.object(
+        client.session,
+        "request",
         return_value=make_mock_response(),
     ):
         with pytest.raises(TerraformCloudError):
             client.create_variable("ws-123", {})
 
     # --- update_variable ---
-    with patch(
-        "terraform_var_manager.api_client.requests.patch",
+    with patch.object(
+        client.session,
+        "request",
         return_value=make_mock_response(),
     ):
         with pytest.raises(TerraformCloudError):
             client.update_variable("ws-123", "var-abc", {})
 
     # --- delete_variable ---
-    with patch(
-        "terraform_var_manager.api_client.requests.delete",
+    with patch.object(
+        client.session,
+        "request",
         return_value=make_mock_response(),
     ):
         with pytest.raises(TerraformCloudError):
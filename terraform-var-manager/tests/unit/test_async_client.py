@@ -0,0 +1,375 @@
+"""
+Unit tests for AsyncTerraformCloudClient and AsyncVariableManager.
+
+The client talks to a small in-process fake of the workspace vars API served
+by aiohttp's test server, so no external network access occurs.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from terraform_var_manager.async_client import AsyncTerraformCloudClient  # noqa: E402
+from terraform_var_manager.async_manager import AsyncVariableManager  # noqa: E402
+from terraform_var_manager.exceptions import TerraformCloudError  # noqa: E402
+from terraform_var_manager.metrics import RequestMetrics  # noqa: E402
+from terraform_var_manager.retry import RetryPolicy  # noqa: E402
+from terraform_var_manager.variable_manager import VariableManager  # noqa: E402
+
+
+class FakeVarsApi:
+    """In-memory workspace vars API with pagination and failure injection."""
+
+    def __init__(self) -> None:
+        self.workspaces: dict[str, dict[str, dict[str, Any]]] = {}
+        self.fail_with: list[int] = []
+        self.requests: list[tuple[str, str]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.delays: dict[str, float] = {}
+        self._ids = itertools.count(1)
+
+    def add(self, workspace_id: str, key: str, value: str, **attrs: Any) -> str:
+        var_id = f"var-{next(self._ids)}"
+        self.workspaces.setdefault(workspace_id, {})[var_id] = {
+            "key": key,
+            "value": value,
+            "description": "[default]",
+            "sensitive": False,
+            "hcl": False,
+            "category": "terraform",
+            **attrs,
+        }
+        return var_id
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/api/v2/workspaces/{ws}/vars/", self._list)
+        app.router.add_post("/api/v2/workspaces/{ws}/vars/", self._create)
+        app.router.add_patch("/api/v2/workspaces/{ws}/vars/{var}", self._update)
+        app.router.add_delete("/api/v2/workspaces/{ws}/vars/{var}", self._delete)
+        return app
+
+    @web.middleware
+    async def _middleware(
+        self, request: web.Request, handler: Any
+    ) -> web.StreamResponse:
+        self.requests.append((request.method, request.path))
+        if self.fail_with:
+            return web.Response(
+                status=self.fail_with.pop(0), headers={"Retry-After": "0"}
+            )
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(request.method, 0.005))
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _list(self, request: web.Request) -> web.Response:
+        variables = self.workspaces.get(request.match_info["ws"], {})
+        number = int(request.query.get("page[number]", 1))
+        size = int(request.query.get("page[size]", 100))
+        items = list(variables.items())
+        page = items[(number - 1) * size : number * size]
+        has_next = number * size < len(items)
+        return web.json_response(
+            {
+                "data": [{"id": i, "attributes": a} for i, a in page],
+                "meta": {"pagination": {"next-page": number + 1 if has_next else None}},
+            }
+        )
+
+    async def _create(self, request: web.Request) -> web.Response:
+        attrs = (await request.json())["data"]["attributes"]
+        var_id = self.add(request.match_info["ws"], **attrs)
+        return web.json_response({"data": {"id": var_id}}, status=201)
+
+    async def _update(self, request: web.Request) -> web.Response:
+        attrs = (await request.json())["data"]["attributes"]
+        self.workspaces[request.match_info["ws"]][request.match_info["var"]].update(
+            attrs
+        )
+        return web.json_response({"data": {"id": request.match_info["var"]}})
+
+    async def _delete(self, request: web.Request) -> web.Response:
+        del self.workspaces[request.match_info["ws"]][request.match_info["var"]]
+        return web.Response(status=204)
+
+
+def _run(api: FakeVarsApi, scenario: Any, **client_kwargs: Any) -> Any:
+    """Serve ``api`` and run ``scenario(client)`` against it."""
+
+    async def main() -> Any:
+        async with TestServer(api.app()) as server:
+            client_kwargs.setdefault("rate_limit", None)
+            async with AsyncTerraformCloudClient(
+                token="t", base_url=str(server.make_url("/api/v2")), **client_kwargs
+            ) as client:
+                return await scenario(client)
+
+    return asyncio.run(main())
+
+
+# ---------------------------------------------------------------------------
+# AsyncTerraformCloudClient
+# ---------------------------------------------------------------------------
+
+
+def test_get_variables_follows_pagination() -> None:
+    """get_variables returns variables from every page."""
+    api = FakeVarsApi()
+    for i in range(5):
+        api.add("ws-1", f"var_{i}", str(i))
+
+    async def scenario(client: AsyncTerraformCloudClient) -> list[dict[str, Any]]:
+        return [v async for v in client.iter_variables("ws-1", page_size=2)]
+
+    result = _run(api, scenario)
+
+    assert [v["attributes"]["key"] for v in result] == [f"var_{i}" for i in range(5)]
+    assert len(api.requests) == 3
+
+
+def test_create_update_delete_round_trip() -> None:
+    """The write operations change the remote state and delete returns True."""
+    api = FakeVarsApi()
+    payload = {"data": {"type": "vars", "attributes": {"key": "k", "value": "v"}}}
+
+    async def scenario(client: AsyncTerraformCloudClient) -> bool:
+        created = await client.create_variable("ws-1", payload)
+        var_id = created["data"]["id"]
+        await client.update_variable(
+            "ws-1", var_id, {"data": {"attributes": {"value": "v2"}}}
+        )
+        assert api.workspaces["ws-1"][var_id]["value"] == "v2"
+        return await client.delete_variable("ws-1", var_id)
+
+    assert _run(api, scenario) is True
+    assert api.workspaces["ws-1"] == {}
+
+
+def test_http_error_raises_terraform_cloud_error() -> None:
+    """A non-retryable HTTP error surfaces as TerraformCloudError."""
+    api = FakeVarsApi()
+    api.fail_with = [404]
+
+    async def scenario(client: AsyncTerraformCloudClient) -> None:
+        await client.get_variables("ws-1")
+
+    with pytest.raises(TerraformCloudError):
+        _run(api, scenario)
+
+
+def test_transient_errors_and_429_are_retried() -> None:
+    """503 and 429 responses are retried until the call succeeds."""
+    api = FakeVarsApi()
+    api.add("ws-1", "k", "v")
+    api.fail_with = [503, 429]
+
+    async def scenario(client: AsyncTerraformCloudClient) -> list[dict[str, Any]]:
+        return await client.get_variables("ws-1")
+
+    result = _run(api, scenario, retry_policy=RetryPolicy(backoff_base=0.001))
+
+    assert len(result) == 1
+    assert len(api.requests) == 3
+
+
+def test_concurrency_limit_is_shared_across_workspaces() -> None:
+    """Requests for many workspaces never exceed the client's concurrency."""
+    api = FakeVarsApi()
+    for ws in range(10):
+        api.add(f"ws-{ws}", "k", "v")
+
+    async def scenario(client: AsyncTerraformCloudClient) -> None:
+        await asyncio.gather(*(client.get_variables(f"ws-{ws}") for ws in range(10)))
+
+    _run(api, scenario, concurrency=3)
+
+    assert 1 < api.peak_in_flight <= 3
+
+
+def test_hooks_receive_one_event_per_call() -> None:
+    """Retried calls are reported once each, like the blocking client."""
+    api = FakeVarsApi()
+    api.fail_with = [503]
+    metrics = RequestMetrics()
+    payload = {"data": {"type": "vars", "attributes": {"key": "k", "value": "v"}}}
+
+    async def scenario(client: AsyncTerraformCloudClient) -> None:
+        await client.get_variables("ws-1")
+        await client.create_variable("ws-1", payload)
+
+    _run(api, scenario, hooks=[metrics], retry_policy=RetryPolicy(backoff_base=0.001))
+
+    rows = {row["method"]: row for row in metrics.to_dict()["requests"]}
+    assert rows["GET"]["endpoint"] == "/workspaces/{workspace_id}/vars"
+    assert rows["GET"]["retries"] == 1
+    assert rows["GET"]["statuses"] == {"200": 1}
+    assert rows["POST"]["bytes_sent"] > 0
+    assert rows["POST"]["bytes_received"] > 0
+
+
+def test_credentials_are_loaded_on_first_request() -> None:
+    """Without a token, the credentials file is read by the first call only."""
+    api = FakeVarsApi()
+
+    async def main() -> None:
+        async with TestServer(api.app()) as server:
+            async with AsyncTerraformCloudClient(
+                base_url=str(server.make_url("/api/v2")), rate_limit=None
+            ) as client:
+                load.assert_not_called()
+                await client.get_variables("ws-1")
+                await client.get_variables("ws-2")
+
+    with patch(
+        "terraform_var_manager.async_client.load_credentials_token",
+        return_value="lazy-token",
+    ) as load:
+        asyncio.run(main())
+
+    load.assert_called_once_with()
+
+
+# ---------------------------------------------------------------------------
+# AsyncVariableManager
+# ---------------------------------------------------------------------------
+
+
+def test_manager_upload_creates_updates_and_removes(tmp_path: Any) -> None:
+    """upload applies the same plan as VariableManager.upload_variables."""
+    api = FakeVarsApi()
+    api.add("ws-1", "existing", "old")
+    api.add("ws-1", "stale", "x")
+    tfvars = tmp_path / "vars.tfvars"
+    tfvars.write_text('existing = "new" # [default]\nfresh = "f" # [default]\n')
+
+    async def scenario(client: AsyncTerraformCloudClient) -> bool:
+        manager = AsyncVariableManager(client=client)
+        return await manager.upload("ws-1", str(tfvars), remove_missing=True)
+
+    assert _run(api, scenario) is True
+    remote = {a["key"]: a["value"] for a in api.workspaces["ws-1"].values()}
+    assert remote == {"existing": "new", "fresh": "f"}
+
+
+def test_manager_upload_parses_off_the_event_loop(tmp_path: Any) -> None:
+    """The blocking .tfvars parse runs in a worker thread, not on the loop."""
+    api = FakeVarsApi()
+    tfvars = tmp_path / "vars.tfvars"
+    tfvars.write_text('fresh = "f" # [default]\n')
+    parse = VariableManager._parse_tfvars_file
+    parsed_on: list[threading.Thread] = []
+
+    def recording_parse(path: str) -> Any:
+        parsed_on.append(threading.current_thread())
+        return parse(path)
+
+    async def scenario(client: AsyncTerraformCloudClient) -> bool:
+        manager = AsyncVariableManager(client=client)
+        return await manager.upload("ws-1", str(tfvars))
+
+    with patch.object(VariableManager, "_parse_tfvars_file", recording_parse):
+        assert _run(api, scenario) is True
+    assert parsed_on and parsed_on[0] is not threading.main_thread()
+
+
+def test_manager_download_and_compare(tmp_path: Any) -> None:
+    """download writes a .tfvars file and compare diffs two workspaces."""
+    api = FakeVarsApi()
+    api.add("ws-1", "shared", "a")
+    api.add("ws-2", "shared", "b")
+
+    async def scenario(client: AsyncTerraformCloudClient) -> tuple[bool, bool]:
+        manager = AsyncVariableManager(client=client)
+        return (
+            await manager.download("ws-1", str(tmp_path / "dl.tfvars")),
+            await manager.compare("ws-1", "ws-2", str(tmp_path / "cmp.tfvars")),
+        )
+
+    assert _run(api, scenario) == (True, True)
+    assert 'shared = "a"' in (tmp_path / "dl.tfvars").read_text()
+    assert "a |<->| b" in (tmp_path / "cmp.tfvars").read_text()
+
+
+def test_manager_delete_all() -> None:
+    """delete_all removes every variable across pages."""
+    api = FakeVarsApi()
+    for i in range(150):
+        api.add("ws-1", f"var_{i}", "v")
+
+    async def scenario(client: AsyncTerraformCloudClient) -> bool:
+        return await AsyncVariableManager(client=client).delete_all("ws-1")
+
+    assert _run(api, scenario) is True
+    assert api.workspaces["ws-1"] == {}
+
+
+def test_manager_operation_timeout_cancels_pending_writes(
+    tmp_path: Any, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Writes still pending at the deadline are cancelled and reported."""
+    api = FakeVarsApi()
+    api.delays["POST"] = 0.5
+    tfvars = tmp_path / "vars.tfvars"
+    tfvars.write_text('a = "1" # [default]\nb = "2" # [default]\n')
+
+    async def scenario(client: AsyncTerraformCloudClient) -> bool:
+        manager = AsyncVariableManager(client=client, operation_timeout=0.1)
+        return await manager.upload("ws-1", str(tfvars))
+
+    assert _run(api, scenario) is False
+    assert "2 of 2 variable operations were not sent before the deadline: a, b" in (
+        caplog.text
+    )
+
+
+def test_manager_operation_timeout_cuts_fetches_short(
+    tmp_path: Any, caplog: pytest.LogCaptureFixture
+) -> None:
+    """A listing still running at the deadline fails the operation."""
+    api = FakeVarsApi()
+    api.add("ws-1", "a", "1")
+    api.delays["GET"] = 0.5
+
+    async def scenario(client: AsyncTerraformCloudClient) -> bool:
+        manager = AsyncVariableManager(client=client, operation_timeout=0.1)
+        return await manager.download("ws-1", str(tmp_path / "dl.tfvars"))
+
+    assert _run(api, scenario) is False
+    assert "Operation deadline of 0.1s exceeded (list variables of ws-1)" in (
+        caplog.text
+    )
+    assert not (tmp_path / "dl.tfvars").exists()
+
+
+def test_manager_delete_all_reports_cancelled_keys(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    api = FakeVarsApi()
+    api.add("ws-1", "a", "1")
+    api.delays["DELETE"] = 0.5
+
+    async def scenario(client: AsyncTerraformCloudClient) -> bool:
+        manager = AsyncVariableManager(client=client, operation_timeout=0.1)
+        return await manager.delete_all("ws-1")
+
+    assert _run(api, scenario) is False
+    assert "1 variables were not deleted before the deadline: a" in caplog.text
+
+
+def test_manager_operation_timeout_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        AsyncVariableManager(client=MagicMock(), operation_timeout=0)
@@ -0,0 +1,83 @@
+"""
+Unit tests for the benchmark harness: data generation and regression checks.
+
+The benchmarks themselves are run with ``python -m tests.benchmarks.run``;
+here they only run at a tiny size to check that the harness works.
+"""
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+from terraform_var_manager.tfvars import iter_tfvars
+from tests.benchmarks.generate import synthetic_tfvars, synthetic_variables
+from tests.benchmarks.run import Result, main, regressions, run, to_baseline
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+
+def test_synthetic_data_is_deterministic() -> None:
+    assert synthetic_variables(200) == synthetic_variables(200)
+    assert synthetic_variables(200, seed=1) != synthetic_variables(200)
+
+
+def test_synthetic_tfvars_parses_back_to_every_variable() -> None:
+    """The generated file holds every variable, many of them multiline."""
+    parsed = dict(iter_tfvars(io.StringIO(synthetic_tfvars(500))))
+
+    assert len(parsed) == 500
+    multiline = [v for v in parsed.values() if "\n" in v["value"]]
+    assert 50 < len(multiline) < 150
+
+
+# ---------------------------------------------------------------------------
+# Baselines and regressions
+# ---------------------------------------------------------------------------
+
+
+def _baseline(vars_per_second: float) -> dict:
+    return {"results": {"parse/1000": {"vars_per_second": vars_per_second}}}
+
+
+def test_regressions_flag_only_drops_beyond_the_threshold() -> None:
+    result = Result("parse", 1000, 1.0)  # 1000 vars/s
+
+    assert regressions([result], _baseline(1100), 0.2) == []
+    ((regressed, change),) = regressions([result], _baseline(2000), 0.2)
+    assert regressed is result
+    assert change == -0.5
+
+
+def test_benchmarks_missing_from_the_baseline_are_ignored() -> None:
+    assert regressions([Result("format", 1000, 9.0)], _baseline(1e9), 0.2) == []
+
+
+def test_run_covers_every_benchmark_at_every_size() -> None:
+    results = run([50, 100], repeat=1)
+
+    assert sorted({r.name for r in results}) == [
+        "extract_group",
+        "format_var_line",
+        "group_and_format",
+        "merge_for_comparison",
+        "parse_tfvars_file",
+    ]
+    assert {r.size for r in results} == {50, 100}
+    assert set(to_baseline(results)["results"]) == {r.key for r in results}
+
+
+def test_main_saves_a_baseline_and_fails_on_regression(tmp_path: Path) -> None:
+    """--save records a baseline; a much faster baseline makes the run fail."""
+    baseline = tmp_path / "baseline.json"
+    argv = ["--sizes", "50", "--repeat", "1", "--baseline", str(baseline)]
+
+    assert main([*argv, "--save"]) == 0
+    saved = json.loads(baseline.read_text())
+    for entry in saved["results"].values():
+        entry["vars_per_second"] *= 1000
+    baseline.write_text(json.dumps(saved))
+
+    assert main(argv) == 1
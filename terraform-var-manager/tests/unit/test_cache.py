@@ -0,0 +1,204 @@
+"""
+Unit tests for the on-disk SnapshotCache and ParseCache.
+
+Every test uses pytest's tmp_path and a fake clock, so nothing outside the
+temporary directory is touched and expiry never depends on real time.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from terraform_var_manager.cache import ParseCache, SnapshotCache, default_cache_dir
+
+HOST = "app.terraform.io"
+VARIABLES = [{"id": "var-1", "attributes": {"key": "region", "value": "eu"}}]
+
+
+class FakeClock:
+    """Wall clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path: Path, clock: FakeClock) -> SnapshotCache:
+    return SnapshotCache(str(tmp_path), ttl=60, max_entries=3, clock=clock)
+
+
+# ---------------------------------------------------------------------------
+# get / put
+# ---------------------------------------------------------------------------
+
+
+def test_get_returns_none_when_nothing_is_cached(cache: SnapshotCache) -> None:
+    """A workspace that was never stored is a miss."""
+    assert cache.get(HOST, "ws-1") is None
+
+
+def test_put_then_get_round_trips(cache: SnapshotCache) -> None:
+    """A stored snapshot is returned unchanged while it is fresh."""
+    cache.put(HOST, "ws-1", VARIABLES)
+
+    assert cache.get(HOST, "ws-1") == VARIABLES
+
+
+def test_entries_are_keyed_by_host_and_workspace(cache: SnapshotCache) -> None:
+    """The same workspace ID on another host is a different entry."""
+    cache.put(HOST, "ws-1", VARIABLES)
+
+    assert cache.get("tfe.example.com", "ws-1") is None
+    assert cache.get(HOST, "ws-2") is None
+
+
+def test_expired_snapshot_is_a_miss(cache: SnapshotCache, clock: FakeClock) -> None:
+    """Snapshots older than the TTL are ignored and removed."""
+    cache.put(HOST, "ws-1", VARIABLES)
+    clock.now += 61
+
+    assert cache.get(HOST, "ws-1") is None
+    assert os.listdir(cache.directory) == []
+
+
+def test_unreadable_entry_is_a_miss(cache: SnapshotCache) -> None:
+    """A corrupt file is treated as a miss instead of raising."""
+    cache.put(HOST, "ws-1", VARIABLES)
+    (path,) = Path(cache.directory).glob("*.json")
+    path.write_text("{not json")
+
+    assert cache.get(HOST, "ws-1") is None
+    assert not path.exists()
+
+
+def test_entries_are_private_to_the_owner(cache: SnapshotCache) -> None:
+    """Snapshot files are only readable by the user that wrote them."""
+    cache.put(HOST, "ws-1", VARIABLES)
+    (path,) = Path(cache.directory).glob("*.json")
+
+    assert path.stat().st_mode & 0o077 == 0
+
+
+# ---------------------------------------------------------------------------
+# Eviction and invalidation
+# ---------------------------------------------------------------------------
+
+
+def test_least_recently_used_entry_is_evicted(
+    cache: SnapshotCache, clock: FakeClock
+) -> None:
+    """Beyond max_entries, the snapshot used longest ago is dropped."""
+    for ws in ("ws-1", "ws-2", "ws-3"):
+        cache.put(HOST, ws, VARIABLES)
+        clock.now += 1
+    cache.get(HOST, "ws-1")  # ws-2 is now the least recently used
+    clock.now += 1
+
+    cache.put(HOST, "ws-4", VARIABLES)
+
+    assert cache.get(HOST, "ws-2") is None
+    for ws in ("ws-1", "ws-3", "ws-4"):
+        assert cache.get(HOST, ws) == VARIABLES
+
+
+def test_invalidate_drops_only_that_workspace(cache: SnapshotCache) -> None:
+    """invalidate() removes one snapshot and leaves the others."""
+    cache.put(HOST, "ws-1", VARIABLES)
+    cache.put(HOST, "ws-2", VARIABLES)
+
+    cache.invalidate(HOST, "ws-1")
+
+    assert cache.get(HOST, "ws-1") is None
+    assert cache.get(HOST, "ws-2") == VARIABLES
+
+
+def test_clear_drops_everything(cache: SnapshotCache) -> None:
+    """clear() empties the cache directory of snapshots."""
+    cache.put(HOST, "ws-1", VARIABLES)
+    cache.put(HOST, "ws-2", VARIABLES)
+
+    cache.clear()
+
+    assert cache.get(HOST, "ws-1") is None
+    assert cache.get(HOST, "ws-2") is None
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+
+def test_default_directory_follows_xdg_cache_home(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """XDG_CACHE_HOME decides where snapshots go by default."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert default_cache_dir() == str(tmp_path / "terraform-var-manager" / "snapshots")
+
+
+@pytest.mark.parametrize("kwargs", [{"ttl": -1}, {"max_entries": 0}])
+def test_invalid_configuration_is_rejected(
+    tmp_path: Path, kwargs: dict[str, float]
+) -> None:
+    """A negative TTL or an empty cache cannot be configured."""
+    with pytest.raises(ValueError):
+        SnapshotCache(str(tmp_path), **kwargs)  # type: ignore[arg-type]
+
+
+# ---------------------------------------------------------------------------
+# ParseCache
+# ---------------------------------------------------------------------------
+
+PARSED = {
+    "region": {"value": "eu", "description": "[app]", "sensitive": False, "hcl": False},
+    "ports": {"value": "[80]", "description": "[app]", "sensitive": True, "hcl": True},
+}
+
+
+def test_parse_cache_round_trips_variables(tmp_path: Path) -> None:
+    """Parsed variables come back identical, in their original order."""
+    cache = ParseCache(str(tmp_path))
+    cache.put("digest-1", PARSED)
+
+    assert cache.get("digest-1") == PARSED
+    assert list(cache.get("digest-1") or {}) == ["region", "ports"]
+    assert cache.get("digest-2") is None
+
+
+def test_parse_cache_evicts_least_recently_used(
+    tmp_path: Path, clock: FakeClock
+) -> None:
+    """Beyond max_entries, the parse result unused for longest is dropped."""
+    cache = ParseCache(str(tmp_path), max_entries=2, clock=clock)
+    for digest in ["a", "b"]:
+        cache.put(digest, PARSED)
+        clock.now += 1
+    cache.get("a")
+    clock.now += 1
+
+    cache.put("c", PARSED)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_parse_cache_ignores_malformed_entries(tmp_path: Path) -> None:
+    cache = ParseCache(str(tmp_path))
+    cache.put("digest", PARSED)
+    (entry,) = tmp_path.iterdir()
+    entry.write_text('{"rows": [["only-a-key"]]}')
+
+    assert cache.get("digest") is None
+    assert not entry.exists()
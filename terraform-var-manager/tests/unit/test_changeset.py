@@ -0,0 +1,128 @@
+"""
+Unit tests for Changeset serialization and remote_digest.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from terraform_var_manager.changeset import Changeset, remote_digest
+from terraform_var_manager.exceptions import TerraformCloudError
+from terraform_var_manager.operations import CREATE, DELETE, UPDATE, VariableOperation
+
+
+def _payload(key: str, value: str) -> dict[str, Any]:
+    return {"data": {"type": "vars", "attributes": {"key": key, "value": value}}}
+
+
+def _changeset() -> Changeset:
+    return Changeset(
+        "ws-123",
+        [
+            VariableOperation(CREATE, "new", _payload("new", "1")),
+            VariableOperation(UPDATE, "changed", _payload("changed", "2"), "var-2"),
+            VariableOperation(DELETE, "gone", variable_id="var-3"),
+        ],
+        remote_digest="abc",
+    )
+
+
+def _remote(key: str, var_id: str, value: str) -> dict[str, Any]:
+    return {
+        "id": var_id,
+        "attributes": {
+            "key": key,
+            "value": value,
+            "description": "[default]",
+            "hcl": False,
+            "sensitive": False,
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Changeset
+# ---------------------------------------------------------------------------
+
+
+def test_counts_and_describe() -> None:
+    """The summary counts operations per action."""
+    changeset = _changeset()
+
+    assert changeset.counts() == {CREATE: 1, UPDATE: 1, DELETE: 1}
+    assert changeset.describe() == ("ws-123: 1 to create, 1 to update, 1 to delete")
+    assert not changeset.is_empty
+    assert Changeset("ws-123").is_empty
+
+
+def test_save_and_load_round_trip(tmp_path: Path) -> None:
+    """A saved changeset loads back identical, readable only by its owner."""
+    path = tmp_path / "plan.json"
+    changeset = _changeset()
+
+    changeset.save(str(path))
+
+    assert Changeset.load(str(path)) == changeset
+    assert path.stat().st_mode & 0o077 == 0
+
+
+def test_load_rejects_unknown_version(tmp_path: Path) -> None:
+    """A changeset from an incompatible version is refused."""
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps({**_changeset().to_dict(), "version": 99}))
+
+    with pytest.raises(TerraformCloudError, match="version"):
+        Changeset.load(str(path))
+
+
+def test_load_rejects_unknown_action(tmp_path: Path) -> None:
+    """Operations with an unknown action make the changeset invalid."""
+    data = _changeset().to_dict()
+    data["operations"][0]["action"] = "rename"
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps(data))
+
+    with pytest.raises(TerraformCloudError, match="Invalid changeset"):
+        Changeset.load(str(path))
+
+
+def test_load_wraps_unreadable_files(tmp_path: Path) -> None:
+    """Missing or malformed files raise TerraformCloudError."""
+    with pytest.raises(TerraformCloudError):
+        Changeset.load(str(tmp_path / "missing.json"))
+
+    (tmp_path / "bad.json").write_text("{not json")
+    with pytest.raises(TerraformCloudError):
+        Changeset.load(str(tmp_path / "bad.json"))
+
+
+# ---------------------------------------------------------------------------
+# remote_digest
+# ---------------------------------------------------------------------------
+
+
+def test_remote_digest_ignores_key_order() -> None:
+    """The digest depends on the variables, not on listing order."""
+    a = {"a": _remote("a", "var-1", "1"), "b": _remote("b", "var-2", "2")}
+    b = {"b": _remote("b", "var-2", "2"), "a": _remote("a", "var-1", "1")}
+
+    assert remote_digest(a) == remote_digest(b)
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        {"a": _remote("a", "var-1", "changed")},
+        {"a": _remote("a", "var-9", "1")},
+        {"a": _remote("a", "var-1", "1"), "b": _remote("b", "var-2", "2")},
+        {},
+    ],
+)
+def test_remote_digest_changes_with_the_workspace(changed: dict[str, Any]) -> None:
+    """Edited values, replaced variables and added or removed keys all show up."""
+    original = {"a": _remote("a", "var-1", "1")}
+
+    assert remote_digest(original) != remote_digest(changed)
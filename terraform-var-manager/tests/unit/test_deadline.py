@@ -0,0 +1,86 @@
+"""
+Unit tests for operation deadlines.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from terraform_var_manager.deadline import (
+    Deadline,
+    current_deadline,
+    deadline_scope,
+    submit,
+)
+from terraform_var_manager.exceptions import DeadlineExceeded, TerraformCloudError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_remaining_counts_down_to_zero() -> None:
+    clock = FakeClock()
+    deadline = Deadline(5, clock=clock)
+
+    assert deadline.remaining() == 5.0
+    clock.now += 2
+    assert deadline.remaining() == 3.0
+    assert not deadline.expired
+    clock.now += 10
+    assert deadline.remaining() == 0.0
+    assert deadline.expired
+
+
+def test_clamp_shortens_timeouts_to_the_time_left() -> None:
+    clock = FakeClock()
+    deadline = Deadline(5, clock=clock)
+    clock.now += 3
+
+    assert deadline.clamp(10.0) == 2.0
+    assert deadline.clamp(1.0) == 1.0
+    assert deadline.clamp(None) == 2.0
+
+
+def test_check_raises_once_expired() -> None:
+    clock = FakeClock()
+    deadline = Deadline(1.5, clock=clock)
+    deadline.check("GET /vars")
+
+    clock.now += 1.5
+
+    with pytest.raises(DeadlineExceeded, match=r"1\.5s exceeded \(GET /vars\)"):
+        deadline.check("GET /vars")
+    assert isinstance(deadline.error(), TerraformCloudError)
+
+
+def test_seconds_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        Deadline(0)
+
+
+def test_deadline_scope_sets_the_current_deadline_for_the_block() -> None:
+    outer, inner = Deadline(5), Deadline(1)
+
+    with deadline_scope(outer):
+        with deadline_scope(inner):
+            assert current_deadline() is inner
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_submit_runs_under_the_callers_deadline() -> None:
+    deadline = Deadline(5)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with deadline_scope(deadline):
+            inherited = submit(executor, current_deadline).result()
+            plain = executor.submit(current_deadline).result()
+
+    assert inherited is deadline
+    assert plain is None
@@ -0,0 +1,163 @@
+"""
+Unit tests for the sensitive-value FingerprintLedger.
+
+Ledgers live in pytest's tmp_path, so no real state directory is touched.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from terraform_var_manager.ledger import FingerprintLedger, default_ledger_path
+
+SECRET = {"value": "hunter2", "description": "[db]", "hcl": False, "sensitive": True}
+REMOTE = {
+    "key": "db_pass",
+    "value": None,
+    "description": "[db]",
+    "hcl": False,
+    "sensitive": True,
+}
+
+
+@pytest.fixture
+def ledger_path(tmp_path: Path) -> str:
+    return str(tmp_path / "state" / "ledger.json")
+
+
+def _recorded(path: str) -> FingerprintLedger:
+    """A saved ledger holding the fingerprint of SECRET for ws-1/db_pass."""
+    ledger = FingerprintLedger(path)
+    ledger.record("ws-1", "db_pass", SECRET)
+    ledger.save()
+    return ledger
+
+
+# ---------------------------------------------------------------------------
+# is_unchanged
+# ---------------------------------------------------------------------------
+
+
+def test_unknown_secret_is_not_unchanged(ledger_path: str) -> None:
+    """Without a recorded fingerprint the secret must be uploaded."""
+    assert not FingerprintLedger(ledger_path).is_unchanged(
+        "ws-1", "db_pass", REMOTE, SECRET
+    )
+
+
+def test_recorded_secret_is_unchanged_in_a_new_process(ledger_path: str) -> None:
+    """A saved fingerprint is found by a ledger loaded from the same file."""
+    _recorded(ledger_path)
+
+    assert FingerprintLedger(ledger_path).is_unchanged(
+        "ws-1", "db_pass", REMOTE, SECRET
+    )
+
+
+@pytest.mark.parametrize(
+    ("local", "remote"),
+    [
+        ({"value": "hunter3"}, {}),
+        ({"description": "[other]"}, {"description": "[other]"}),
+        ({"hcl": True}, {"hcl": True}),
+        ({}, {"description": "[changed-in-ui]"}),
+        ({}, {"sensitive": False}),
+    ],
+)
+def test_any_difference_requires_an_upload(
+    ledger_path: str, local: dict[str, Any], remote: dict[str, Any]
+) -> None:
+    """A new value, description or hcl flag, locally or remotely, is a change."""
+    ledger = _recorded(ledger_path)
+
+    assert not ledger.is_unchanged(
+        "ws-1", "db_pass", {**REMOTE, **remote}, {**SECRET, **local}
+    )
+
+
+def test_fingerprints_are_per_workspace(ledger_path: str) -> None:
+    """The same key in another workspace has its own fingerprint."""
+    ledger = _recorded(ledger_path)
+
+    assert not ledger.is_unchanged("ws-2", "db_pass", REMOTE, SECRET)
+
+
+def test_forget_drops_the_fingerprint(ledger_path: str) -> None:
+    """A forgotten variable is uploaded again next time."""
+    ledger = _recorded(ledger_path)
+    ledger.forget("ws-1", "db_pass")
+    ledger.save()
+
+    assert not FingerprintLedger(ledger_path).is_unchanged(
+        "ws-1", "db_pass", REMOTE, SECRET
+    )
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+def test_ledger_never_stores_the_value(ledger_path: str) -> None:
+    """Only salted fingerprints reach the disk, with owner-only permissions."""
+    _recorded(ledger_path)
+    path = Path(ledger_path)
+
+    assert "hunter2" not in path.read_text()
+    assert path.stat().st_mode & 0o077 == 0
+
+
+def test_salts_differ_between_ledgers(tmp_path: Path) -> None:
+    """The same secret has a different fingerprint in every ledger."""
+    _recorded(str(tmp_path / "a.json"))
+    _recorded(str(tmp_path / "b.json"))
+
+    assert (tmp_path / "a.json").read_text() != (tmp_path / "b.json").read_text()
+
+
+def test_save_merges_changes_from_another_process(ledger_path: str) -> None:
+    """Two ledgers on one file keep each other's fingerprints when saving."""
+    _recorded(ledger_path)
+    first = FingerprintLedger(ledger_path)
+    second = FingerprintLedger(ledger_path)
+    first.record("ws-1", "api_key", SECRET)
+    second.record("ws-2", "db_pass", SECRET)
+
+    first.save()
+    second.save()
+
+    reloaded = FingerprintLedger(ledger_path)
+    for workspace_id, key in [
+        ("ws-1", "db_pass"),
+        ("ws-1", "api_key"),
+        ("ws-2", "db_pass"),
+    ]:
+        assert reloaded.is_unchanged(workspace_id, key, REMOTE, SECRET)
+
+
+def test_unreadable_ledger_starts_over(ledger_path: str) -> None:
+    """A corrupt ledger is ignored, which only forces a full resync."""
+    Path(ledger_path).parent.mkdir(parents=True)
+    Path(ledger_path).write_text("{not json")
+
+    ledger = FingerprintLedger(ledger_path)
+    assert not ledger.is_unchanged("ws-1", "db_pass", REMOTE, SECRET)
+
+    ledger.record("ws-1", "db_pass", SECRET)
+    ledger.save()
+    assert FingerprintLedger(ledger_path).is_unchanged(
+        "ws-1", "db_pass", REMOTE, SECRET
+    )
+
+
+def test_default_path_follows_xdg_state_home(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """XDG_STATE_HOME decides where the ledger lives by default."""
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path))
+
+    assert default_ledger_path() == str(
+        tmp_path / "terraform-var-manager" / "secret-ledger.json"
+    )
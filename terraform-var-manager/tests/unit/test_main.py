@@ -6,12 +6,23 @@ or filesystem access occur. sys.exit is captured via pytest.raises(SystemExit).
 """
 from __future__ import annotations
 
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from terraform_var_manager.cache import ParseCache, SnapshotCache
+from terraform_var_manager.changeset import Changeset
 from terraform_var_manager.exceptions import TerraformCloudError
-
+from terraform_var_manager.ledger import FingerprintLedger
+from terraform_var_manager.metrics import RequestEvent, RequestMetrics
+from terraform_var_manager.operations import (
+    DownloadSummary,
+    UploadSummary,
+    VariableOperation,
+)
+from terraform_var_manager.profiling import PhaseProfiler
+from terraform_var_manager.workspace_index import WorkspaceIndex
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -26,7 +37,8 @@ def _run_main(argv: list[str], mock_manager: MagicMock) -> int:
     """
     with patch("sys.argv", ["terraform-var-manager"] + argv):
         with patch(
-            "terraform_var_manager.main.VariableManager", return_value=mock_manager
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
         ):
             with pytest.raises(SystemExit) as exc_info:
                 from terraform_var_manager.main import main
@@ -84,6 +96,96 @@ def test_download_uses_custom_output_file() -> None:
     mock_manager.download_variables.assert_called_once_with("ws-abc", "custom.tfvars")
 
 
+def test_download_several_ids_into_output_dir() -> None:
+    """Several --id values are downloaded to <id>.tfvars files in --output-dir."""
+    mock_manager = MagicMock()
+    mock_manager.download_workspaces.return_value = DownloadSummary(["ws-1", "ws-2"])
+
+    code = _run_main(
+        ["--download", "--id", "ws-1", "ws-2", "--output-dir", "out", "--max-age", "0"],
+        mock_manager,
+    )
+
+    assert code == 0
+    mock_manager.download_workspaces.assert_called_once_with(
+        {"ws-1": "ws-1.tfvars", "ws-2": "ws-2.tfvars"}, "out", max_age=0.0
+    )
+    mock_manager.download_variables.assert_not_called()
+
+
+def test_download_organization_passes_filter_and_exits_1_on_failure() -> None:
+    """--organization downloads the matching workspaces; failures exit 1."""
+    mock_manager = MagicMock()
+    mock_manager.download_organization.return_value = DownloadSummary(
+        failed={"ws-1": "boom"}
+    )
+
+    code = _run_main(
+        [
+            "--download",
+            "--organization",
+            "acme",
+            "--name-pattern",
+            "app-*",
+            "--output-dir",
+            "out",
+        ],
+        mock_manager,
+    )
+
+    assert code == 1
+    mock_manager.download_organization.assert_called_once_with(
+        "acme", "out", name_pattern="app-*", max_age=3600.0
+    )
+
+
+def test_download_several_ids_without_output_dir_exits_1() -> None:
+    """Bulk downloads need a directory to write into."""
+    mock_manager = MagicMock()
+
+    code = _run_main(["--download", "--id", "ws-1", "ws-2"], mock_manager)
+
+    assert code == 1
+    mock_manager.download_workspaces.assert_not_called()
+    mock_manager.download_variables.assert_not_called()
+
+
+def test_download_names_bulk_files_after_workspace_names() -> None:
+    """organization/name references are resolved and give their file names."""
+    mock_manager = MagicMock()
+    mock_manager.client.resolve_workspace.side_effect = {
+        "acme/app-prod": "ws-1"
+    }.__getitem__
+    mock_manager.download_workspaces.return_value = DownloadSummary(["ws-1", "ws-2"])
+
+    code = _run_main(
+        ["--download", "--id", "acme/app-prod", "ws-2", "--output-dir", "out"],
+        mock_manager,
+    )
+
+    assert code == 0
+    mock_manager.download_workspaces.assert_called_once_with(
+        {"ws-1": "app-prod.tfvars", "ws-2": "ws-2.tfvars"}, "out", max_age=3600.0
+    )
+
+
+def test_download_refuses_workspaces_sharing_a_file_name() -> None:
+    """Same-named workspaces of two organizations would overwrite each other."""
+    mock_manager = MagicMock()
+    mock_manager.client.resolve_workspace.side_effect = {
+        "org-a/app": "ws-1",
+        "org-b/app": "ws-2",
+    }.__getitem__
+
+    code = _run_main(
+        ["--download", "--id", "org-a/app", "org-b/app", "--output-dir", "out"],
+        mock_manager,
+    )
+
+    assert code == 1
+    mock_manager.download_workspaces.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # --upload
 # ---------------------------------------------------------------------------
@@ -99,7 +201,9 @@ def test_upload_calls_upload_variables_and_exits_0(tmp_path: object) -> None:
     )
 
     assert code == 0
-    mock_manager.upload_variables.assert_called_once_with("ws-xxx", "vars.tfvars", False)
+    mock_manager.upload_variables.assert_called_once_with(
+        "ws-xxx", "vars.tfvars", False, force_resync=False
+    )
 
 
 def test_upload_exits_1_when_operation_fails() -> None:
@@ -134,6 +238,25 @@ def test_upload_exits_1_when_tfvars_missing() -> None:
     mock_manager.upload_variables.assert_not_called()
 
 
+@pytest.mark.parametrize(
+    "argv",
+    [["--download"], ["--upload", "--id", "ws-xxx"], ["--compare", "ws-1"]],
+)
+def test_usage_errors_exit_before_building_a_manager(argv: list[str]) -> None:
+    """Missing options are reported before any client or manager exists."""
+    with patch("sys.argv", ["terraform-var-manager"] + argv):
+        with patch(
+            "terraform_var_manager.variable_manager.VariableManager"
+        ) as manager_cls:
+            with pytest.raises(SystemExit) as exc_info:
+                from terraform_var_manager.main import main
+
+                main()
+
+    assert exc_info.value.code == 1
+    manager_cls.assert_not_called()
+
+
 def test_upload_with_remove_flag_passes_true_to_manager() -> None:
     """--upload --remove passes remove_missing=True to upload_variables."""
     mock_manager = MagicMock()
@@ -145,7 +268,429 @@ def test_upload_with_remove_flag_passes_true_to_manager() -> None:
     )
 
     assert code == 0
-    mock_manager.upload_variables.assert_called_once_with("ws-xxx", "vars.tfvars", True)
+    mock_manager.upload_variables.assert_called_once_with(
+        "ws-xxx", "vars.tfvars", True, force_resync=False
+    )
+
+
+def test_concurrency_option_is_passed_to_manager() -> None:
+    """--concurrency N builds the VariableManager with that concurrency."""
+    mock_manager = MagicMock()
+    mock_manager.upload_variables.return_value = True
+
+    with patch(
+        "sys.argv",
+        [
+            "terraform-var-manager",
+            "--upload",
+            "--id",
+            "ws-xxx",
+            "--tfvars",
+            "vars.tfvars",
+            "--concurrency",
+            "8",
+        ],
+    ):
+        with patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls:
+            with pytest.raises(SystemExit):
+                from terraform_var_manager.main import main
+
+                main()
+
+    kwargs = manager_cls.call_args[1]
+    assert kwargs["concurrency"] == 8
+    assert kwargs["cache"] is None
+    assert kwargs["ledger"] is None
+
+
+def test_secret_ledger_options_are_passed_to_manager(tmp_path) -> None:
+    """--secret-ledger builds a ledger; --force-resync reaches upload_variables."""
+    mock_manager = MagicMock()
+    mock_manager.upload_variables.return_value = True
+    ledger_file = str(tmp_path / "ledger.json")
+
+    with patch(
+        "sys.argv",
+        [
+            "terraform-var-manager",
+            "--upload",
+            "--id",
+            "ws-xxx",
+            "--tfvars",
+            "vars.tfvars",
+            "--secret-ledger",
+            "--ledger-file",
+            ledger_file,
+            "--force-resync",
+        ],
+    ):
+        with patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls:
+            with pytest.raises(SystemExit):
+                from terraform_var_manager.main import main
+
+                main()
+
+    ledger = manager_cls.call_args[1]["ledger"]
+    assert isinstance(ledger, FingerprintLedger)
+    assert ledger.path == ledger_file
+    mock_manager.upload_variables.assert_called_once_with(
+        "ws-xxx", "vars.tfvars", False, force_resync=True
+    )
+
+
+def test_parse_cache_option_builds_a_parse_cache() -> None:
+    """--parse-cache passes a ParseCache; without it there is none."""
+    for argv, expected in [([], type(None)), (["--parse-cache"], ParseCache)]:
+        mock_manager = MagicMock()
+        mock_manager.upload_variables.return_value = True
+
+        with patch(
+            "sys.argv",
+            [
+                "terraform-var-manager",
+                "--upload",
+                "--id",
+                "ws-xxx",
+                "--tfvars",
+                "vars.tfvars",
+                *argv,
+            ],
+        ):
+            with patch(
+                "terraform_var_manager.variable_manager.VariableManager",
+                return_value=mock_manager,
+            ) as manager_cls:
+                with pytest.raises(SystemExit):
+                    from terraform_var_manager.main import main
+
+                    main()
+
+        assert isinstance(manager_cls.call_args[1]["parse_cache"], expected)
+
+
+def test_cache_options_build_a_snapshot_cache(tmp_path) -> None:
+    """--cache passes a SnapshotCache with the given directory and TTL."""
+    mock_manager = MagicMock()
+    mock_manager.download_variables.return_value = True
+
+    with patch(
+        "sys.argv",
+        [
+            "terraform-var-manager",
+            "--download",
+            "--id",
+            "ws-xxx",
+            "--cache",
+            "--cache-dir",
+            str(tmp_path),
+            "--cache-ttl",
+            "30",
+        ],
+    ):
+        with patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls:
+            with pytest.raises(SystemExit):
+                from terraform_var_manager.main import main
+
+                main()
+
+    cache = manager_cls.call_args[1]["cache"]
+    assert isinstance(cache, SnapshotCache)
+    assert cache.directory == str(tmp_path)
+    assert cache.ttl == 30
+
+
+def test_index_ttl_option_builds_a_workspace_index() -> None:
+    """--index-ttl sets the TTL of the index used to resolve workspace names."""
+    mock_manager = MagicMock()
+    mock_manager.download_variables.return_value = True
+
+    with patch(
+        "sys.argv",
+        ["terraform-var-manager", "--download", "--id", "ws-xxx", "--index-ttl", "60"],
+    ):
+        with patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls:
+            with pytest.raises(SystemExit):
+                from terraform_var_manager.main import main
+
+                main()
+
+    index = manager_cls.call_args[1]["workspace_index"]
+    assert isinstance(index, WorkspaceIndex)
+    assert index.ttl == 60
+
+
+def test_concurrency_option_rejects_zero() -> None:
+    """--concurrency 0 is an argument error (exit code 2)."""
+    mock_manager = MagicMock()
+
+    code = _run_main(
+        ["--download", "--id", "ws-xxx", "--concurrency", "0"], mock_manager
+    )
+
+    assert code == 2
+    mock_manager.download_variables.assert_not_called()
+
+
+def test_timeout_options_are_passed_to_manager() -> None:
+    """--timeout sets the operation deadline; the request timeouts have defaults."""
+    mock_manager = MagicMock()
+    mock_manager.download_variables.return_value = True
+
+    with patch(
+        "sys.argv",
+        [
+            "terraform-var-manager",
+            "--download",
+            "--id",
+            "ws-1",
+            "--timeout",
+            "90",
+            "--read-timeout",
+            "15",
+        ],
+    ):
+        with patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls:
+            with pytest.raises(SystemExit):
+                from terraform_var_manager.main import main
+
+                main()
+
+    kwargs = manager_cls.call_args[1]
+    assert kwargs["operation_timeout"] == 90
+    assert kwargs["connect_timeout"] == 10
+    assert kwargs["read_timeout"] == 15
+
+
+@pytest.mark.parametrize("option", ["--timeout", "--connect-timeout", "--read-timeout"])
+def test_timeout_options_reject_zero(option: str) -> None:
+    mock_manager = MagicMock()
+
+    code = _run_main(["--download", "--id", "ws-xxx", option, "0"], mock_manager)
+
+    assert code == 2
+
+
+@pytest.mark.parametrize(
+    "ids", [["--id", "ws-1", "--id", "ws-2"], ["--id", "ws-1", "ws-2"]]
+)
+def test_upload_to_several_ids_fans_out(ids: list[str]) -> None:
+    """--upload with several --id values syncs all of them in one call."""
+    mock_manager = MagicMock()
+    mock_manager.upload_to_workspaces.return_value = {
+        "ws-1": UploadSummary("ws-1"),
+        "ws-2": UploadSummary("ws-2"),
+    }
+
+    code = _run_main(["--upload", *ids, "--tfvars", "vars.tfvars"], mock_manager)
+
+    assert code == 0
+    mock_manager.upload_to_workspaces.assert_called_once_with(
+        ["ws-1", "ws-2"], "vars.tfvars", False, force_resync=False
+    )
+    mock_manager.upload_variables.assert_not_called()
+
+
+def test_upload_with_workspaces_file_exits_1_when_one_fails(tmp_path) -> None:
+    """IDs from --workspaces-file join --id (deduplicated); any failure exits 1."""
+    workspaces_file = tmp_path / "workspaces.txt"
+    workspaces_file.write_text("# shared vars\nws-1\n\nws-2  # prod\nws-3\n")
+    mock_manager = MagicMock()
+    mock_manager.upload_to_workspaces.return_value = {
+        "ws-1": UploadSummary("ws-1"),
+        "ws-2": UploadSummary("ws-2", error="boom"),
+        "ws-3": UploadSummary("ws-3"),
+    }
+
+    code = _run_main(
+        [
+            "--upload",
+            "--id",
+            "ws-1",
+            "--workspaces-file",
+            str(workspaces_file),
+            "--tfvars",
+            "vars.tfvars",
+        ],
+        mock_manager,
+    )
+
+    assert code == 1
+    assert mock_manager.upload_to_workspaces.call_args[0][0] == ["ws-1", "ws-2", "ws-3"]
+
+
+def test_several_ids_are_only_accepted_by_upload_and_download() -> None:
+    """--delete-all-variables with several workspaces is an error."""
+    mock_manager = MagicMock()
+
+    code = _run_main(["--delete-all-variables", "--id", "ws-1", "ws-2"], mock_manager)
+
+    assert code == 1
+    mock_manager.delete_all_variables.assert_not_called()
+
+
+def test_upload_resolves_workspace_names() -> None:
+    """--id organization/name uploads to the workspace ID it resolves to."""
+    mock_manager = MagicMock()
+    mock_manager.client.resolve_workspace.return_value = "ws-123"
+    mock_manager.upload_variables.return_value = True
+
+    code = _run_main(
+        ["--upload", "--id", "acme/app-prod", "--tfvars", "vars.tfvars"],
+        mock_manager,
+    )
+
+    assert code == 0
+    mock_manager.client.resolve_workspace.assert_called_once_with("acme/app-prod")
+    mock_manager.upload_variables.assert_called_once_with(
+        "ws-123", "vars.tfvars", False, force_resync=False
+    )
+
+
+def test_unknown_workspace_name_exits_1() -> None:
+    """A name that does not resolve is reported like any other API error."""
+    mock_manager = MagicMock()
+    mock_manager.client.resolve_workspace.side_effect = TerraformCloudError(
+        "Workspace not found: acme/nope"
+    )
+
+    code = _run_main(["--download", "--id", "acme/nope"], mock_manager)
+
+    assert code == 1
+    mock_manager.download_variables.assert_not_called()
+
+
+def test_attach_varset_to_several_workspaces() -> None:
+    """--attach-varset applies the variable set to every given workspace."""
+    mock_manager = MagicMock()
+    mock_manager.attach_varset.return_value = True
+
+    code = _run_main(
+        ["--attach-varset", "varset-1", "--id", "ws-1", "ws-2"], mock_manager
+    )
+
+    assert code == 0
+    mock_manager.attach_varset.assert_called_once_with("varset-1", ["ws-1", "ws-2"])
+
+
+def test_detach_varset_exits_1_when_it_fails() -> None:
+    mock_manager = MagicMock()
+    mock_manager.detach_varset.return_value = False
+
+    code = _run_main(["--detach-varset", "varset-1", "--id", "ws-1"], mock_manager)
+
+    assert code == 1
+    mock_manager.detach_varset.assert_called_once_with("varset-1", ["ws-1"])
+
+
+def test_varset_without_workspaces_exits_1() -> None:
+    mock_manager = MagicMock()
+
+    code = _run_main(["--attach-varset", "varset-1"], mock_manager)
+
+    assert code == 1
+    mock_manager.attach_varset.assert_not_called()
+
+
+def test_plan_out_with_several_ids_exits_1() -> None:
+    """Plans are saved per workspace, so --plan-out needs a single --id."""
+    mock_manager = MagicMock()
+
+    code = _run_main(
+        [
+            "--upload",
+            "--id",
+            "ws-1",
+            "ws-2",
+            "--tfvars",
+            "v.tfvars",
+            "--plan-out",
+            "plan.json",
+        ],
+        mock_manager,
+    )
+
+    assert code == 1
+    mock_manager.upload_to_workspaces.assert_not_called()
+
+
+def test_upload_with_plan_out_saves_plan_without_applying(tmp_path) -> None:
+    """--plan-out writes the changeset and does not upload."""
+    mock_manager = MagicMock()
+    mock_manager.plan_upload.return_value = Changeset(
+        "ws-xxx", [VariableOperation("delete", "old", variable_id="var-1")]
+    )
+    plan_file = tmp_path / "plan.json"
+
+    code = _run_main(
+        [
+            "--upload",
+            "--id",
+            "ws-xxx",
+            "--tfvars",
+            "vars.tfvars",
+            "--remove",
+            "--plan-out",
+            str(plan_file),
+        ],
+        mock_manager,
+    )
+
+    assert code == 0
+    mock_manager.plan_upload.assert_called_once_with(
+        "ws-xxx", "vars.tfvars", True, force_resync=False
+    )
+    mock_manager.upload_variables.assert_not_called()
+    assert Changeset.load(str(plan_file)).operations[0].key == "old"
+
+
+def test_apply_plan_applies_saved_changeset(tmp_path) -> None:
+    """--apply-plan loads the changeset and applies it."""
+    mock_manager = MagicMock()
+    mock_manager.apply_changeset.return_value = True
+    plan_file = tmp_path / "plan.json"
+    Changeset("ws-xxx").save(str(plan_file))
+
+    code = _run_main(["--apply-plan", str(plan_file)], mock_manager)
+
+    assert code == 0
+    mock_manager.apply_changeset.assert_called_once_with(Changeset("ws-xxx"))
+
+
+def test_apply_plan_for_another_workspace_exits_1(tmp_path) -> None:
+    """--id must match the workspace the plan was made for."""
+    mock_manager = MagicMock()
+    plan_file = tmp_path / "plan.json"
+    Changeset("ws-xxx").save(str(plan_file))
+
+    code = _run_main(["--apply-plan", str(plan_file), "--id", "ws-yyy"], mock_manager)
+
+    assert code == 1
+    mock_manager.apply_changeset.assert_not_called()
+
+
+def test_apply_plan_with_unreadable_file_exits_1(tmp_path) -> None:
+    """A missing plan file is reported as an error."""
+    mock_manager = MagicMock()
+
+    code = _run_main(["--apply-plan", str(tmp_path / "missing.json")], mock_manager)
+
+    assert code == 1
+    mock_manager.apply_changeset.assert_not_called()
 
 
 # ---------------------------------------------------------------------------
@@ -191,6 +736,45 @@ def test_compare_uses_custom_output_file() -> None:
     )
 
 
+def test_compare_resolves_workspace_names() -> None:
+    """--compare accepts organization/name references alongside IDs."""
+    mock_manager = MagicMock()
+    mock_manager.client.resolve_workspace.return_value = "ws-prod"
+    mock_manager.compare_workspaces.return_value = True
+
+    code = _run_main(["--compare", "acme/prod", "ws-dev"], mock_manager)
+
+    assert code == 0
+    mock_manager.compare_workspaces.assert_called_once_with(
+        "ws-prod", "ws-dev", "default.tfvars"
+    )
+
+
+def test_compare_with_more_than_two_workspaces_uses_matrix() -> None:
+    """--compare with three or more IDs produces a single matrix report."""
+    mock_manager = MagicMock()
+    mock_manager.compare_workspace_matrix.return_value = True
+
+    code = _run_main(["--compare", "ws-dev", "ws-stage", "ws-prod"], mock_manager)
+
+    assert code == 0
+    mock_manager.compare_workspace_matrix.assert_called_once_with(
+        ["ws-dev", "ws-stage", "ws-prod"], "default.tfvars"
+    )
+    mock_manager.compare_workspaces.assert_not_called()
+
+
+def test_compare_with_one_workspace_exits_1() -> None:
+    """--compare needs at least two workspaces."""
+    mock_manager = MagicMock()
+
+    code = _run_main(["--compare", "ws-1"], mock_manager)
+
+    assert code == 1
+    mock_manager.compare_workspaces.assert_not_called()
+    mock_manager.compare_workspace_matrix.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # --delete-all-variables
 # ---------------------------------------------------------------------------
@@ -207,7 +791,37 @@ def test_delete_all_variables_with_yes_confirmation_exits_0() -> None:
         )
 
     assert code == 0
-    mock_manager.delete_all_variables.assert_called_once_with("ws-xxx")
+    mock_manager.delete_all_variables.assert_called_once_with(
+        "ws-xxx", key_pattern=None, group=None
+    )
+
+
+def test_delete_all_variables_passes_filters_and_mentions_them_in_prompt() -> None:
+    """--key-pattern and --group are forwarded and shown in the confirmation prompt."""
+    mock_manager = MagicMock()
+    mock_manager.delete_all_variables.return_value = True
+
+    with patch("builtins.input", return_value="yes") as mock_input:
+        code = _run_main(
+            [
+                "--delete-all-variables",
+                "--id",
+                "ws-xxx",
+                "--key-pattern",
+                "preview_*",
+                "--group",
+                "app",
+            ],
+            mock_manager,
+        )
+
+    assert code == 0
+    mock_manager.delete_all_variables.assert_called_once_with(
+        "ws-xxx", key_pattern="preview_*", group="app"
+    )
+    prompt = mock_input.call_args[0][0]
+    assert "preview_*" in prompt
+    assert "[app]" in prompt
 
 
 def test_delete_all_variables_with_no_confirmation_exits_0_aborted() -> None:
@@ -309,6 +923,151 @@ def test_terraform_cloud_error_exits_1_on_delete_all() -> None:
     assert code == 1
 
 
+# ---------------------------------------------------------------------------
+# --metrics
+# ---------------------------------------------------------------------------
+
+
+def test_metrics_are_collected_and_exported_after_the_run(
+    tmp_path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """--metrics prints a summary and the export flags write their files."""
+    mock_manager = MagicMock()
+
+    def download(*args: object) -> bool:
+        hooks = manager_cls.call_args[1]["hooks"]
+        for hook in hooks:
+            hook(RequestEvent("GET", "/workspaces/{workspace_id}/vars", 200, 0.02))
+        return True
+
+    mock_manager.download_variables.side_effect = download
+    json_path = tmp_path / "metrics.json"
+    prom_path = tmp_path / "tfvm.prom"
+    argv = [
+        "terraform-var-manager",
+        "--download",
+        "--id",
+        "ws-1",
+        "--metrics",
+        "--metrics-json",
+        str(json_path),
+        "--metrics-prom",
+        str(prom_path),
+    ]
+
+    with (
+        patch("sys.argv", argv),
+        patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls,
+    ):
+        with pytest.raises(SystemExit) as exc_info:
+            from terraform_var_manager.main import main
+
+            main()
+
+    assert exc_info.value.code == 0
+    (hook,) = manager_cls.call_args[1]["hooks"]
+    assert isinstance(hook, RequestMetrics)
+    assert "GET /workspaces/{workspace_id}/vars" in capsys.readouterr().err
+    assert '"count": 1' in json_path.read_text()
+    assert "terraform_var_manager_requests_total" in prom_path.read_text()
+
+
+def test_no_metrics_hook_without_metrics_flags() -> None:
+    mock_manager = MagicMock()
+    mock_manager.download_variables.return_value = True
+
+    with patch("sys.argv", ["terraform-var-manager", "--download", "--id", "ws-1"]):
+        with patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls:
+            with pytest.raises(SystemExit):
+                from terraform_var_manager.main import main
+
+                main()
+
+    assert manager_cls.call_args[1]["hooks"] is None
+
+
+# ---------------------------------------------------------------------------
+# --profile
+# ---------------------------------------------------------------------------
+
+
+def test_profile_report_is_written_after_the_run(
+    tmp_path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """--profile-report passes a profiler to the manager and writes its report."""
+    mock_manager = MagicMock()
+
+    def upload(*args: object, **kwargs: object) -> bool:
+        profiler = manager_cls.call_args[1]["profiler"]
+        with profiler.phase("parse"):
+            pass
+        return True
+
+    mock_manager.upload_variables.side_effect = upload
+    report_path = tmp_path / "profile.json"
+    stats_path = tmp_path / "run.pstats"
+    tfvars = tmp_path / "vars.tfvars"
+    tfvars.write_text("")
+    argv = [
+        "terraform-var-manager",
+        "--upload",
+        "--id",
+        "ws-1",
+        "--tfvars",
+        str(tfvars),
+        "--profile-report",
+        str(report_path),
+        "--profile-memory",
+        "--profile-cprofile",
+        str(stats_path),
+    ]
+
+    with (
+        patch("sys.argv", argv),
+        patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls,
+    ):
+        with pytest.raises(SystemExit) as exc_info:
+            from terraform_var_manager.main import main
+
+            main()
+
+    assert exc_info.value.code == 0
+    assert isinstance(manager_cls.call_args[1]["profiler"], PhaseProfiler)
+    report = json.loads(report_path.read_text())
+    assert report["operation"] == "upload"
+    assert report["phases"][0]["name"] == "parse"
+    assert report["phases"][0]["peak_memory_bytes"] is not None
+    assert report["peak_memory_bytes"] is not None
+    assert stats_path.exists()
+    assert "parse" in capsys.readouterr().err
+
+
+def test_no_profiler_without_profile_flags() -> None:
+    mock_manager = MagicMock()
+    mock_manager.download_variables.return_value = True
+
+    with patch("sys.argv", ["terraform-var-manager", "--download", "--id", "ws-1"]):
+        with patch(
+            "terraform_var_manager.variable_manager.VariableManager",
+            return_value=mock_manager,
+        ) as manager_cls:
+            with pytest.raises(SystemExit):
+                from terraform_var_manager.main import main
+
+                main()
+
+    assert manager_cls.call_args[1]["profiler"] is None
+
+
 # ---------------------------------------------------------------------------
 # No arguments — print help and exit 1
 # ---------------------------------------------------------------------------
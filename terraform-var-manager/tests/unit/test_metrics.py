@@ -0,0 +1,180 @@
+"""
+Unit tests for request events, endpoint templates and RequestMetrics.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from terraform_var_manager.metrics import (
+    RequestEvent,
+    RequestMetrics,
+    _emit,
+    endpoint_template,
+)
+
+BASE_URL = "https://app.terraform.io/api/v2"
+
+
+def _event(seconds: float, **kwargs: object) -> RequestEvent:
+    fields: dict = {"method": "GET", "endpoint": "/workspaces/{workspace_id}/vars"}
+    fields.update(kwargs)
+    fields.setdefault("status", 200)
+    return RequestEvent(seconds=seconds, **fields)
+
+
+# ---------------------------------------------------------------------------
+# endpoint_template
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (f"{BASE_URL}/workspaces/ws-abc123/vars/", "/workspaces/{workspace_id}/vars"),
+        (
+            f"{BASE_URL}/workspaces/ws-abc/vars/var-xyz",
+            "/workspaces/{workspace_id}/vars/{variable_id}",
+        ),
+        (
+            f"{BASE_URL}/varsets/varset-1/relationships/vars/var-2",
+            "/varsets/{varset_id}/relationships/vars/{variable_id}",
+        ),
+        (
+            f"{BASE_URL}/organizations/acme/workspaces?page%5Bnumber%5D=2",
+            "/organizations/{organization}/workspaces",
+        ),
+        (
+            f"{BASE_URL}/organizations/acme/workspaces/app-prod",
+            "/organizations/{organization}/workspaces/{name}",
+        ),
+    ],
+)
+def test_endpoint_template_replaces_ids_and_names(url: str, expected: str) -> None:
+    assert endpoint_template(url, BASE_URL) == expected
+
+
+def test_endpoint_template_keeps_paths_outside_the_api_root() -> None:
+    """A next-page link on another root keeps its full path."""
+    url = "https://other.example/v2/workspaces/ws-1/vars"
+    assert endpoint_template(url, BASE_URL) == "/v2/workspaces/{workspace_id}/vars"
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+
+def test_record_aggregates_by_method_and_endpoint() -> None:
+    metrics = RequestMetrics()
+    metrics(_event(0.02, bytes_received=100, retries=1, rate_limit_wait=0.5))
+    metrics(_event(0.04, bytes_received=50))
+    metrics(_event(0.3, method="DELETE", status=404))
+    metrics(_event(0.1, method="DELETE", status=None, error="ConnectionError"))
+
+    rows = {row["method"]: row for row in metrics.to_dict()["requests"]}
+
+    assert metrics.count == 4
+    assert rows["GET"]["count"] == 2
+    assert rows["GET"]["bytes_received"] == 150
+    assert rows["GET"]["retries"] == 1
+    assert rows["GET"]["rate_limit_wait_seconds"] == 0.5
+    assert rows["GET"]["errors"] == 0
+    assert rows["DELETE"]["errors"] == 2
+    assert rows["DELETE"]["statuses"] == {"404": 1, "ConnectionError": 1}
+
+
+def test_quantile_interpolates_within_buckets() -> None:
+    """Percentiles are estimated from the bucket counts, capped at the maximum."""
+    metrics = RequestMetrics(buckets=[0.1, 1.0])
+    for _ in range(9):
+        metrics(_event(0.05))
+    metrics(_event(0.5, method="POST"))
+
+    assert metrics.quantile(0.5) == pytest.approx(0.1 * 5 / 9)
+    assert metrics.quantile(1.0) == pytest.approx(0.5)
+    assert metrics.quantile(0.5, method="POST") == pytest.approx(0.3)
+    assert RequestMetrics().quantile(0.5) == 0.0
+
+
+def test_buckets_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        RequestMetrics(buckets=[0, 1])
+
+
+def test_summary_lists_endpoints_and_histogram() -> None:
+    metrics = RequestMetrics(buckets=[0.1, 1.0])
+    metrics(_event(0.05))
+    metrics(_event(2.0, method="POST"))
+
+    summary = metrics.summary()
+
+    assert "GET /workspaces/{workspace_id}/vars" in summary
+    assert "POST /workspaces/{workspace_id}/vars" in summary
+    assert "Latency of 2 requests:" in summary
+    assert ">1000ms" in summary
+    assert RequestMetrics().summary() == "No API requests were made."
+
+
+def test_failing_hook_does_not_stop_the_others(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    metrics = RequestMetrics()
+
+    def broken(event: RequestEvent) -> None:
+        raise RuntimeError("boom")
+
+    with caplog.at_level(logging.WARNING):
+        _emit([broken, metrics], _event(0.01))
+
+    assert metrics.count == 1
+    assert "boom" in caplog.text
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+
+def test_write_json(tmp_path: Path) -> None:
+    metrics = RequestMetrics()
+    metrics(_event(0.02))
+    path = tmp_path / "out" / "metrics.json"
+
+    metrics.write_json(str(path))
+
+    data = json.loads(path.read_text())
+    assert data["requests"][0]["count"] == 1
+    assert sum(data["requests"][0]["histogram"]) == 1
+
+
+def test_write_prometheus_textfile(tmp_path: Path) -> None:
+    """The textfile has cumulative buckets, sums, counts and counters."""
+    metrics = RequestMetrics(buckets=[0.1, 1.0])
+    metrics(_event(0.05))
+    metrics(_event(0.5, retries=2))
+    path = tmp_path / "tfvm.prom"
+
+    metrics.write_prometheus(str(path))
+
+    lines = path.read_text().splitlines()
+    labels = 'method="GET",endpoint="/workspaces/{workspace_id}/vars"'
+    prefix = "terraform_var_manager"
+    assert f"# TYPE {prefix}_request_duration_seconds histogram" in lines
+    assert f'{prefix}_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in lines
+    assert f'{prefix}_request_duration_seconds_bucket{{{labels},le="1"}} 2' in lines
+    assert f'{prefix}_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"{prefix}_request_duration_seconds_count{{{labels}}} 2" in lines
+    assert f'{prefix}_requests_total{{{labels},status="200"}} 2' in lines
+    assert f"{prefix}_request_retries_total{{{labels}}} 2" in lines
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_prometheus_label_values_are_escaped() -> None:
+    metrics = RequestMetrics()
+    metrics(_event(0.01, endpoint='/odd"path\\'))
+
+    assert 'endpoint="/odd\\"path\\\\"' in metrics.to_prometheus()
@@ -0,0 +1,222 @@
+"""
+Unit tests for the concurrent apply engine in operations.py.
+
+All tests are fully isolated — the client is a mock, no real HTTP calls occur.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from terraform_var_manager.deadline import Deadline
+from terraform_var_manager.exceptions import DeadlineExceeded, TerraformCloudError
+from terraform_var_manager.operations import (
+    CREATE,
+    DELETE,
+    UPDATE,
+    DeleteSummary,
+    DownloadSummary,
+    OperationResult,
+    UploadSummary,
+    VariableOperation,
+    apply_operations,
+)
+
+
+def _ops(count: int) -> list[VariableOperation]:
+    """Build ``count`` create operations with keys var_0, var_1, ..."""
+    return [
+        VariableOperation(
+            CREATE, f"var_{i}", {"data": {"attributes": {"key": f"var_{i}"}}}
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_apply_operations_dispatches_each_action(
+    mock_client: MagicMock, concurrency: int
+) -> None:
+    """Each action calls the matching client method with the workspace and payload."""
+    mock_client.delete_variable.return_value = True
+    ops = [
+        VariableOperation(CREATE, "a", {"p": 1}),
+        VariableOperation(UPDATE, "b", {"p": 2}, "var-b"),
+        VariableOperation(DELETE, "c", variable_id="var-c"),
+    ]
+
+    results = apply_operations(mock_client, "ws-1", ops, concurrency)
+
+    assert all(r.success for r in results)
+    mock_client.create_variable.assert_called_once_with("ws-1", {"p": 1})
+    mock_client.update_variable.assert_called_once_with("ws-1", "var-b", {"p": 2})
+    mock_client.delete_variable.assert_called_once_with("ws-1", "var-c")
+
+
+def test_apply_operations_returns_results_in_input_order(
+    mock_client: MagicMock,
+) -> None:
+    """Results follow the input order even when later operations finish first."""
+
+    def slow_for_early_keys(workspace_id: str, payload: dict) -> dict:
+        index = int(payload["data"]["attributes"]["key"].split("_")[1])
+        time.sleep(0.01 * (5 - index))
+        return {}
+
+    mock_client.create_variable.side_effect = slow_for_early_keys
+
+    results = apply_operations(mock_client, "ws-1", _ops(5), concurrency=5)
+
+    assert [r.operation.key for r in results] == [f"var_{i}" for i in range(5)]
+
+
+def test_apply_operations_runs_in_parallel_up_to_concurrency(
+    mock_client: MagicMock,
+) -> None:
+    """No more than ``concurrency`` operations are in flight at the same time."""
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def track(workspace_id: str, payload: dict) -> dict:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return {}
+
+    mock_client.create_variable.side_effect = track
+
+    apply_operations(mock_client, "ws-1", _ops(12), concurrency=3)
+
+    assert 1 < peak <= 3
+
+
+def test_apply_operations_collects_failures_without_aborting(
+    mock_client: MagicMock,
+) -> None:
+    """A failing key is reported while the remaining operations still run."""
+    mock_client.create_variable.side_effect = [
+        {},
+        TerraformCloudError("boom"),
+        {},
+    ]
+
+    results = apply_operations(mock_client, "ws-1", _ops(3))
+
+    assert [r.success for r in results] == [True, False, True]
+    assert results[1].error == "boom"
+    assert mock_client.create_variable.call_count == 3
+
+
+def test_apply_operations_unconfirmed_delete_is_a_failure(
+    mock_client: MagicMock,
+) -> None:
+    """A delete the server does not confirm (non-204) is reported as failed."""
+    mock_client.delete_variable.return_value = False
+
+    results = apply_operations(
+        mock_client, "ws-1", [VariableOperation(DELETE, "k", variable_id="var-k")]
+    )
+
+    assert results[0].success is False
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_apply_operations_cancels_work_after_the_deadline(
+    mock_client: MagicMock, concurrency: int
+) -> None:
+    """Operations not started before the deadline are cancelled, not sent."""
+    now = [0.0]
+    deadline = Deadline(1.0, clock=lambda: now[0])
+
+    def create(workspace_id: str, payload: dict) -> dict:
+        now[0] += 0.6
+        return {}
+
+    mock_client.create_variable.side_effect = create
+
+    results = apply_operations(
+        mock_client, "ws-1", _ops(6), concurrency=concurrency, deadline=deadline
+    )
+
+    done = [r for r in results if r.success]
+    cancelled = [r for r in results if r.cancelled]
+    assert 2 <= len(done) < 6
+    assert len(done) + len(cancelled) == 6
+    assert mock_client.create_variable.call_count == len(done)
+    assert all("deadline" in (r.error or "") for r in cancelled)
+
+
+def test_deadline_hit_before_sending_cancels_the_operation(
+    mock_client: MagicMock,
+) -> None:
+    """Only a request that may have reached the server counts as failed."""
+    mock_client.create_variable.side_effect = DeadlineExceeded("waited", sent=False)
+    mock_client.delete_variable.side_effect = DeadlineExceeded("read timed out")
+
+    unsent, sent = apply_operations(
+        mock_client,
+        "ws-1",
+        [_ops(1)[0], VariableOperation(DELETE, "k", variable_id="var-k")],
+    )
+
+    assert unsent.cancelled and not unsent.success
+    assert not sent.cancelled and not sent.success
+
+
+# ---------------------------------------------------------------------------
+# UploadSummary
+# ---------------------------------------------------------------------------
+
+
+def test_upload_summary_sorts_results_by_outcome() -> None:
+    """Successful keys are grouped by action; failures keep their error."""
+    results = [
+        OperationResult(VariableOperation(CREATE, "a"), True),
+        OperationResult(VariableOperation(UPDATE, "b"), True),
+        OperationResult(VariableOperation(DELETE, "c"), True),
+        OperationResult(VariableOperation(UPDATE, "d"), False, "boom"),
+    ]
+
+    summary = UploadSummary.from_results("ws-1", results)
+
+    assert (summary.created, summary.updated, summary.deleted) == (["a"], ["b"], ["c"])
+    assert summary.failed == {"d": "boom"}
+    assert not summary.ok
+    assert summary.describe() == ("ws-1: 1 created, 1 updated, 1 deleted, 1 failed (d)")
+
+
+def test_upload_summary_with_error_is_not_ok() -> None:
+    """A workspace that could not be synced at all reports its error."""
+    summary = UploadSummary("ws-1", error="404 Not Found")
+
+    assert not summary.ok
+    assert summary.describe() == "ws-1: failed (404 Not Found)"
+    assert UploadSummary("ws-2").ok
+
+
+def test_summaries_with_cancelled_work_are_not_ok() -> None:
+    """Work cancelled by the deadline shows up in every summary."""
+    results = [
+        OperationResult(VariableOperation(CREATE, "a"), True),
+        OperationResult(VariableOperation(CREATE, "b"), False, "late", cancelled=True),
+    ]
+
+    summary = UploadSummary.from_results("ws-1", results)
+
+    assert summary.created == ["a"]
+    assert summary.cancelled == ["b"]
+    assert summary.failed == {}
+    assert not summary.ok
+    assert summary.describe() == (
+        "ws-1: 1 created, 0 updated, 0 deleted, 1 cancelled by the deadline"
+    )
+    assert not DeleteSummary(deleted=["a"], cancelled=["b"]).ok
+    assert not DownloadSummary(downloaded=["ws-1"], cancelled=["ws-2"]).ok
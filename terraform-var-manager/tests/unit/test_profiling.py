@@ -0,0 +1,185 @@
+"""
+Unit tests for PhaseProfiler.
+"""
+from __future__ import annotations
+
+import json
+import pstats
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from terraform_var_manager.deadline import submit
+from terraform_var_manager.metrics import RequestEvent
+from terraform_var_manager.profiling import OTHER, PhaseProfiler
+
+
+def _event(seconds: float = 0.01) -> RequestEvent:
+    return RequestEvent("GET", "/workspaces/{workspace_id}/vars", 200, seconds)
+
+
+# ---------------------------------------------------------------------------
+# Phases and API calls
+# ---------------------------------------------------------------------------
+
+
+def test_phases_accumulate_runs_and_time() -> None:
+    profiler = PhaseProfiler()
+
+    with profiler:
+        for _ in range(3):
+            with profiler.phase("fetch"):
+                sum(range(10_000))
+        with profiler.phase("write"):
+            pass
+
+    report = profiler.report()
+    phases = {p["name"]: p for p in report["phases"]}
+    assert list(phases) == ["fetch", "write"]
+    assert phases["fetch"]["runs"] == 3
+    assert phases["fetch"]["wall_seconds"] > 0
+    assert phases["fetch"]["cpu_seconds"] >= 0
+    assert phases["fetch"]["peak_memory_bytes"] is None
+    assert report["wall_seconds"] >= phases["fetch"]["wall_seconds"]
+
+
+def test_api_calls_count_in_the_innermost_open_phase() -> None:
+    """Calls made while a phase runs count there; the rest count as other."""
+    profiler = PhaseProfiler()
+
+    profiler(_event())
+    with profiler.phase("apply"):
+        profiler(_event(0.5))
+        profiler(_event(0.25))
+
+    phases = {p["name"]: p for p in profiler.report()["phases"]}
+    assert phases[OTHER]["api_calls"] == 1
+    assert phases["apply"]["api_calls"] == 2
+    assert phases["apply"]["api_seconds"] == pytest.approx(0.75)
+    assert profiler.api_calls == 3
+
+
+def test_api_calls_from_worker_threads_are_attributed() -> None:
+    """Hooks fire on the client's worker threads, not the phase's thread."""
+    profiler = PhaseProfiler()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with profiler.phase("fetch"):
+            for future in [submit(executor, profiler, _event()) for _ in range(4)]:
+                future.result()
+
+    assert profiler.phases["fetch"].api_calls == 4
+
+
+def test_concurrent_phases_keep_their_own_api_calls() -> None:
+    """A phase opened on another thread does not take this thread's calls."""
+    profiler = PhaseProfiler()
+    fetch_open, write_open, fetch_done = (threading.Event() for _ in range(3))
+
+    def fetch() -> None:
+        with profiler.phase("fetch"):
+            fetch_open.set()
+            write_open.wait()
+            profiler(_event())
+            fetch_done.set()
+
+    def write() -> None:
+        fetch_open.wait()
+        with profiler.phase("write"):
+            write_open.set()
+            fetch_done.wait()
+
+    threads = [threading.Thread(target=fetch), threading.Thread(target=write)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert profiler.phases["fetch"].api_calls == 1
+    assert profiler.phases["write"].api_calls == 0
+
+
+def test_phases_of_another_profiler_are_ignored() -> None:
+    profiler, other = PhaseProfiler(), PhaseProfiler()
+
+    with other.phase("fetch"):
+        profiler(_event())
+
+    assert list(profiler.phases) == [OTHER]
+
+
+def test_phase_is_recorded_when_it_raises() -> None:
+    profiler = PhaseProfiler()
+
+    with pytest.raises(RuntimeError):
+        with profiler.phase("parse"):
+            raise RuntimeError("bad file")
+
+    assert profiler.phases["parse"].runs == 1
+
+
+# ---------------------------------------------------------------------------
+# tracemalloc and cProfile
+# ---------------------------------------------------------------------------
+
+
+def test_trace_memory_records_peak_per_phase() -> None:
+    profiler = PhaseProfiler(trace_memory=True)
+
+    with profiler:
+        with profiler.phase("small"):
+            b"x" * 1_000
+        with profiler.phase("large"):
+            data = b"x" * 5_000_000
+            del data
+
+    assert profiler.phases["large"].peak_memory >= 5_000_000
+    assert profiler.phases["small"].peak_memory < 5_000_000
+    assert profiler.peak_memory >= 5_000_000
+
+
+def test_cprofile_hotspots_and_stats_file(tmp_path: Path) -> None:
+    profiler = PhaseProfiler(cprofile=True)
+
+    with profiler:
+        sorted(range(1000), key=lambda n: -n)
+
+    hotspots = profiler.report()["hotspots"]
+    assert hotspots
+    assert {"function", "calls", "total_seconds", "cumulative_seconds"} <= set(
+        hotspots[0]
+    )
+    path = tmp_path / "run.pstats"
+    profiler.dump_stats(str(path))
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_dump_stats_requires_cprofile(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        PhaseProfiler().dump_stats(str(tmp_path / "run.pstats"))
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+
+def test_write_json_and_summary(tmp_path: Path) -> None:
+    profiler = PhaseProfiler(operation="upload")
+    with profiler:
+        with profiler.phase("parse"):
+            pass
+        profiler(_event())
+    path = tmp_path / "profile.json"
+
+    profiler.write_json(str(path))
+
+    report = json.loads(path.read_text())
+    assert report["operation"] == "upload"
+    assert report["api_calls"] == 1
+    assert [p["name"] for p in report["phases"]] == ["parse", OTHER]
+    summary = profiler.summary()
+    assert summary.splitlines()[1].startswith("parse")
+    assert summary.splitlines()[-1].startswith("total")
@@ -0,0 +1,134 @@
+"""
+Unit tests for the token-bucket RateLimiter.
+
+A fake clock is used throughout, so no test ever really sleeps.
+"""
+from __future__ import annotations
+
+import pytest
+
+from terraform_var_manager.rate_limit import RateLimiter, retry_after_seconds
+
+
+class FakeClock:
+    """Monotonic clock whose sleep() just advances time."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def test_burst_is_served_without_waiting(clock: FakeClock) -> None:
+    """Up to ``burst`` requests go out immediately."""
+    limiter = RateLimiter(rate=10, clock=clock, sleep=clock.sleep)
+
+    waits = [limiter.acquire() for _ in range(10)]
+
+    assert waits == [0.0] * 10
+    assert clock.slept == []
+
+
+def test_requests_beyond_burst_are_paced_at_rate(clock: FakeClock) -> None:
+    """Once the bucket is empty, requests are spaced 1/rate seconds apart."""
+    limiter = RateLimiter(rate=10, burst=1, clock=clock, sleep=clock.sleep)
+
+    for _ in range(5):
+        limiter.acquire()
+
+    assert clock.now == pytest.approx(0.4)
+    assert clock.slept == pytest.approx([0.1] * 4)
+
+
+def test_pause_blocks_until_retry_after_elapses(clock: FakeClock) -> None:
+    """pause() (a 429 Retry-After) delays the next request by the pause length."""
+    limiter = RateLimiter(rate=10, clock=clock, sleep=clock.sleep)
+
+    limiter.pause(2.0)
+
+    assert limiter.available == 0.0
+    limiter.acquire()
+    assert clock.now == pytest.approx(2.1)
+
+
+def test_acquire_with_timeout_refuses_long_waits(clock: FakeClock) -> None:
+    """A wait longer than the timeout raises at once and returns the token."""
+    limiter = RateLimiter(rate=10, burst=1, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=0.05)
+
+    assert clock.slept == []
+    assert limiter.acquire(timeout=0.1) == pytest.approx(0.1)
+
+
+def test_observe_shrinks_budget_to_server_remaining(clock: FakeClock) -> None:
+    """X-RateLimit-Remaining below the local budget lowers the available tokens."""
+    limiter = RateLimiter(rate=30, clock=clock, sleep=clock.sleep)
+
+    limiter.observe({"X-RateLimit-Limit": "30.000", "X-RateLimit-Remaining": "5.000"})
+
+    assert limiter.available == pytest.approx(5.0)
+    assert limiter.server_remaining == 5.0
+
+
+def test_observe_adopts_lower_server_limit(clock: FakeClock) -> None:
+    """A server limit lower than the configured rate becomes the new rate."""
+    limiter = RateLimiter(rate=50, clock=clock, sleep=clock.sleep)
+
+    limiter.observe({"X-RateLimit-Limit": "30"})
+
+    assert limiter.rate == 30.0
+    assert limiter.burst == 30.0
+
+
+def test_observe_exhausted_budget_pauses_until_reset(clock: FakeClock) -> None:
+    """Remaining 0 with a reset time pauses callers until the window resets."""
+    limiter = RateLimiter(rate=30, clock=clock, sleep=clock.sleep)
+
+    limiter.observe({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0.5"})
+
+    limiter.acquire()
+    assert clock.now >= 0.5
+
+
+def test_observe_ignores_missing_or_malformed_headers(clock: FakeClock) -> None:
+    """Headers that are absent or not numbers leave the budget untouched."""
+    limiter = RateLimiter(rate=30, clock=clock, sleep=clock.sleep)
+
+    limiter.observe({})
+    limiter.observe({"X-RateLimit-Remaining": "lots"})
+
+    assert limiter.available == pytest.approx(30.0)
+
+
+def test_rate_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"Retry-After": "3"}, 3.0),
+        ({"Retry-After": "0.25"}, 0.25),
+        ({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        ({"Retry-After": "soon"}, None),
+        ({}, None),
+    ],
+)
+def test_retry_after_seconds(headers: dict, expected: float | None) -> None:
+    """Retry-After is parsed as seconds or an HTTP date (past dates mean now)."""
+    assert retry_after_seconds(headers) == expected
@@ -0,0 +1,220 @@
+"""
+Unit tests for the streaming .tfvars parser.
+"""
+from __future__ import annotations
+
+import io
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from terraform_var_manager.cache import ParseCache
+from terraform_var_manager.tfvars import content_digest, iter_tfvars, load_tfvars
+
+
+def _parse(text: str) -> dict[str, dict]:
+    return dict(iter_tfvars(io.StringIO(text)))
+
+
+# ---------------------------------------------------------------------------
+# Single-line variables
+# ---------------------------------------------------------------------------
+
+
+def test_parses_values_and_tags() -> None:
+    """Quoted and hcl values with their group and flags."""
+    parsed = _parse(
+        "# ========== app ==========\n"
+        'region = "eu-west-1" # [app]\n'
+        'db_pass = "_SECRET" # [db], sensitive\n'
+        "ports = [80, 443] # [app], hcl, keep_in_all_workspaces\n"
+        'plain = "x"\n'
+    )
+
+    assert parsed == {
+        "region": {
+            "value": "eu-west-1",
+            "description": "[app]",
+            "sensitive": False,
+            "hcl": False,
+        },
+        "db_pass": {
+            "value": "_SECRET",
+            "description": "[db]",
+            "sensitive": True,
+            "hcl": False,
+        },
+        "ports": {
+            "value": "[80, 443]",
+            "description": "[app], keep_in_all_workspaces",
+            "sensitive": False,
+            "hcl": True,
+        },
+        "plain": {
+            "value": "x",
+            "description": "[default]",
+            "sensitive": False,
+            "hcl": False,
+        },
+    }
+
+
+def test_skips_lines_that_are_not_assignments() -> None:
+    """Comments, blank lines and '=' only inside a comment are ignored."""
+    parsed = _parse('\n# a = b\nnot an assignment # x=y\nkey = "v"\n')
+
+    assert list(parsed) == ["key"]
+
+
+def test_last_duplicate_key_wins() -> None:
+    """Both assignments are yielded; collecting into a dict keeps the last."""
+    pairs = list(iter_tfvars(io.StringIO('a = "1"\na = "2"\n')))
+
+    assert [value["value"] for _, value in pairs] == ["1", "2"]
+    assert _parse('a = "1"\na = "2"\n')["a"]["value"] == "2"
+
+
+def test_hcl_value_begin_is_not_a_block() -> None:
+    """An hcl variable whose value is the word 'begin' stays single-line."""
+    parsed = _parse('A0 = begin # [A], hcl\nB0 = "x" # [B]\n')
+
+    assert parsed["A0"]["value"] == "begin"
+    assert parsed["A0"]["hcl"] is True
+    assert parsed["B0"]["value"] == "x"
+
+
+# ---------------------------------------------------------------------------
+# Multiline blocks
+# ---------------------------------------------------------------------------
+
+
+def test_begin_end_block_takes_tags_from_end_line() -> None:
+    """Block lines are kept verbatim and the end line's tags apply."""
+    parsed = _parse(
+        "key = begin\n"
+        "  -----BEGIN KEY-----\n"
+        "  # not a comment\n"
+        "  endpoint = x\n"
+        "end # [security], sensitive, mline\n"
+        'after = "y"\n'
+    )
+
+    assert parsed["key"] == {
+        "value": "  -----BEGIN KEY-----\n  # not a comment\n  endpoint = x",
+        "description": "[security], mline",
+        "sensitive": True,
+        "hcl": False,
+    }
+    assert parsed["after"]["value"] == "y"
+
+
+def test_unterminated_block_runs_to_end_of_file() -> None:
+    """A block without 'end' takes every remaining line."""
+    assert _parse("key = begin\nline1\nline2")["key"]["value"] == "line1\nline2"
+
+
+def test_windows_line_endings() -> None:
+    """CRLF files parse like LF files when read in text mode."""
+    raw = b'a = "1" # [g]\r\nkey = begin\r\nx\r\nend # [g], mline\r\n'
+    text = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8")
+
+    parsed = dict(iter_tfvars(text))
+
+    assert parsed["a"]["value"] == "1"
+    assert parsed["key"]["value"] == "x"
+
+
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+
+def test_reads_lazily_one_variable_at_a_time() -> None:
+    """Only the lines of the first variable are read before it is yielded."""
+    consumed: list[str] = []
+
+    def lines() -> Iterator[str]:
+        for line in ['a = "1"\n', "b = begin\n", "x\n", "end\n", 'c = "3"\n']:
+            consumed.append(line)
+            yield line
+
+    parser = iter_tfvars(lines())
+
+    assert next(parser)[0] == "a"
+    assert consumed == ['a = "1"\n']
+    assert next(parser) == (
+        "b",
+        {
+            "value": "x",
+            "description": "[default], mline",
+            "sensitive": False,
+            "hcl": False,
+        },
+    )
+    assert len(consumed) == 4
+
+
+def test_parses_large_files() -> None:
+    """A 100k-line file with blocks is parsed completely in one pass."""
+
+    def lines() -> Iterator[str]:
+        for i in range(20_000):
+            yield f'var_{i} = "value {i}" # [g{i % 10}]\n'
+            yield f"blob_{i} = begin\n"
+            yield "line\n"
+            yield "line\n"
+            yield "end # [blobs], mline\n"
+
+    parsed = dict(iter_tfvars(lines()))
+
+    assert len(parsed) == 40_000
+    assert parsed["blob_19999"]["value"] == "line\nline"
+
+
+def test_load_tfvars_reads_stdin(monkeypatch: pytest.MonkeyPatch) -> None:
+    """'-' reads the variables from standard input."""
+    monkeypatch.setattr("sys.stdin", io.StringIO('a = "1" # [g]\n'))
+
+    assert load_tfvars("-")["a"]["value"] == "1"
+
+
+# ---------------------------------------------------------------------------
+# Parse cache
+# ---------------------------------------------------------------------------
+
+
+def test_load_tfvars_with_cache_parses_unchanged_content_once(tmp_path: Path) -> None:
+    """A second load of the same content, even from another path, skips parsing."""
+    content = 'a = "1" # [g]\r\nkey = begin\r\nx\r\nend # [g], mline\r\n'
+    first, second = tmp_path / "one.tfvars", tmp_path / "two.tfvars"
+    first.write_bytes(content.encode())
+    second.write_bytes(content.encode())
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    parsed = load_tfvars(str(first), cache)
+    with patch("terraform_var_manager.tfvars.iter_tfvars") as parser:
+        assert load_tfvars(str(second), cache) == parsed
+
+    parser.assert_not_called()
+    assert parsed == load_tfvars(str(first))
+
+
+def test_load_tfvars_with_cache_reparses_changed_content(tmp_path: Path) -> None:
+    path = tmp_path / "vars.tfvars"
+    cache = ParseCache(str(tmp_path / "cache"))
+    path.write_text('a = "1"\n')
+    load_tfvars(str(path), cache)
+
+    path.write_text('a = "2"\n')
+
+    assert load_tfvars(str(path), cache)["a"]["value"] == "2"
+
+
+def test_content_digest_covers_the_parser_version() -> None:
+    """Results cached by another parser version are never reused."""
+    with patch("terraform_var_manager.tfvars.PARSER_VERSION", 999):
+        other = content_digest(b'a = "1"\n')
+
+    assert content_digest(b'a = "1"\n') != other
@@ -1,8 +1,19 @@
 """
 Tests for utility functions.
 """
+import io
+import os
+from unittest.mock import patch
+
 import pytest
-from terraform_var_manager.utils import extract_group, format_var_line, group_and_format_vars_for_tfvars
+
+from terraform_var_manager.utils import (
+    extract_group,
+    format_var_line,
+    group_and_format_vars_for_tfvars,
+    write_atomically,
+    write_tfvars,
+)
 
 
 def test_extract_group():
@@ -64,3 +75,96 @@ def test_group_and_format_vars_for_tfvars():
     assert "api_var" in result
     assert "db_var" in result
     assert "_SECRET" in result  # sensitive variable should be masked
+
+
+def test_write_tfvars_streams_the_formatted_output():
+    """write_tfvars writes the same text group_and_format_vars_for_tfvars returns."""
+    variables = {
+        "b": {
+            "attributes": {
+                "value": "2",
+                "description": "[z]",
+                "sensitive": False,
+                "hcl": False,
+            }
+        },
+        "a": {
+            "attributes": {
+                "value": "line1\nline2\n",
+                "description": "[z], mline",
+                "sensitive": False,
+                "hcl": False,
+            }
+        },
+        "c": {
+            "attributes": {
+                "value": "3",
+                "description": "",
+                "sensitive": False,
+                "hcl": True,
+            }
+        },
+    }
+    out = io.StringIO()
+
+    write_tfvars(variables, out)
+
+    assert out.getvalue() == (
+        "# ========== default ==========\n"
+        "c = 3 # [default], hcl\n"
+        "\n"
+        "# ========== z ==========\n"
+        "a = begin\nline1\nline2\nend # [z], mline\n"
+        'b = "2" # [z]'
+    )
+    assert group_and_format_vars_for_tfvars(variables) == out.getvalue()
+
+
+def test_write_tfvars_with_no_variables_writes_nothing():
+    """An empty workspace produces an empty file, as before."""
+    out = io.StringIO()
+
+    write_tfvars({}, out)
+
+    assert out.getvalue() == ""
+
+
+@pytest.mark.parametrize("mode", [0o644, 0o600])
+def test_write_atomically_replaces_the_file_with_the_given_mode(tmp_path, mode):
+    path = tmp_path / "out.json"
+    path.write_text("old")
+
+    write_atomically(str(path), "new", mode)
+
+    assert path.read_text() == "new"
+    assert path.stat().st_mode & 0o777 == mode
+    assert os.listdir(tmp_path) == ["out.json"]
+
+
+def test_write_atomically_streams_from_a_writer(tmp_path):
+    """A callable content writes straight into the temporary file."""
+    path = tmp_path / "out.tfvars"
+    path.write_text("old")
+    seen_while_writing = []
+
+    def writer(f):
+        f.write("a = 1\n")
+        seen_while_writing.append(path.read_text())
+
+    write_atomically(str(path), writer)
+
+    assert seen_while_writing == ["old"]
+    assert path.read_text() == "a = 1\n"
+
+
+def test_write_atomically_keeps_the_old_file_on_failure(tmp_path):
+    """The original error is raised even when the cleanup fails too."""
+    path = tmp_path / "out.json"
+    path.write_text("old")
+
+    with patch("os.replace", side_effect=OSError("disk full")):
+        with patch("os.remove", side_effect=OSError("busy")):
+            with pytest.raises(OSError, match="disk full"):
+                write_atomically(str(path), "new")
+
+    assert path.read_text() == "old"
@@ -6,12 +6,13 @@ Validates: Requirements 12.1, 12.2, 12.3, 12.4, 12.5
 """
 from __future__ import annotations
 
-import tempfile
+import io
 import os
+import tempfile
 from typing import Any
 
 import pytest
-from hypothesis import given, settings, assume
+from hypothesis import assume, given, settings
 from hypothesis import strategies as st
 
 from terraform_var_manager.utils import group_and_format_vars_for_tfvars
@@ -241,3 +242,78 @@ def test_sensitive_always_secret(key: str, value: str, group: str) -> None:
             f"Expected value token '\"_SECRET\"' for sensitive variable '{key}', "
             f"got {value_token!r} in line: {assignment_line!r}"
         )
+
+
+# ---------------------------------------------------------------------------
+# Property 3: The streaming writer matches the original string builder
+#
+# write_tfvars must produce byte-for-byte the output of the original
+# concatenate-then-strip implementation, for any mix of groups and tags.
+# ---------------------------------------------------------------------------
+
+
+def _concatenated_tfvars(variables_dict: dict[str, Any]) -> str:
+    """The original group_and_format_vars_for_tfvars body, kept as a reference."""
+    from terraform_var_manager.utils import extract_group, format_var_line
+
+    grouped_vars: dict[str, list[str]] = {}
+    for key, var in variables_dict.items():
+        attributes = var["attributes"]
+        description = attributes.get("description", "") or ""
+        value = "_SECRET" if attributes["sensitive"] else attributes["value"]
+        group = extract_group(description)
+        var_line = format_var_line(
+            key,
+            value,
+            group,
+            attributes["sensitive"],
+            attributes["hcl"],
+            "keep_in_all_workspaces" in description,
+            "mline" in description,
+        )
+        grouped_vars.setdefault(group, []).append(var_line)
+
+    tfvars_content = ""
+    for group, vars_list in sorted(grouped_vars.items()):
+        tfvars_content += f"\n# {'=' * 10} {group} {'=' * 10}\n"
+        for var_line in sorted(vars_list):
+            tfvars_content += f"{var_line}\n"
+    return tfvars_content.strip()
+
+
+@given(
+    variables=st.dictionaries(
+        keys=valid_identifier,
+        values=st.fixed_dictionaries(
+            {
+                "value": st.text(max_size=80),
+                "description": st.sampled_from(
+                    [
+                        "",
+                        "[a]",
+                        "[b], keep_in_all_workspaces",
+                        "[a], mline",
+                        "[c], keep_in_all_workspaces, mline",
+                    ]
+                ),
+                "sensitive": st.booleans(),
+                "hcl": st.booleans(),
+            }
+        ),
+        max_size=15,
+    )
+)
+@settings(max_examples=200)
+def test_write_tfvars_matches_concatenated_output(
+    variables: dict[str, dict[str, Any]],
+) -> None:
+    """Streaming the output gives exactly the text the string builder gave."""
+    from terraform_var_manager.utils import write_tfvars
+
+    variables_dict = {key: {"attributes": data} for key, data in variables.items()}
+    out = io.StringIO()
+
+    write_tfvars(variables_dict, out)
+
+    assert out.getvalue() == _concatenated_tfvars(variables_dict)
+    assert group_and_format_vars_for_tfvars(variables_dict) == out.getvalue()
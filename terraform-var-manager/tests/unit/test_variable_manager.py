@@ -6,14 +6,23 @@ All tests are fully isolated — no real HTTP calls, no real filesystem access
 """
 from __future__ import annotations
 
+import os
+import threading
+import time
 from typing import Any
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
+from terraform_var_manager.cache import ParseCache
+from terraform_var_manager.changeset import Changeset
+from terraform_var_manager.deadline import Deadline, current_deadline
+from terraform_var_manager.exceptions import DeadlineExceeded, TerraformCloudError
+from terraform_var_manager.ledger import FingerprintLedger
+from terraform_var_manager.metrics import RequestEvent
+from terraform_var_manager.profiling import PhaseProfiler
 from terraform_var_manager.variable_manager import VariableManager
 
-
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -41,6 +50,16 @@ def _make_api_var(
     }
 
 
+def _by_workspace(
+    variables: dict[str, list[dict[str, Any]]],
+) -> Any:
+    """iter_variables side effect returning each workspace's variables by ID.
+
+    Workspaces are fetched concurrently, so tests must not rely on call order.
+    """
+    return lambda workspace_id, *args, **kwargs: iter(variables[workspace_id])
+
+
 def _write_tfvars(tmp_path: Any, content: str) -> str:
     """Write a .tfvars file to tmp_path and return its path as a string."""
     tfvars_file = tmp_path / "test.tfvars"
@@ -48,16 +67,40 @@ def _write_tfvars(tmp_path: Any, content: str) -> str:
     return str(tfvars_file)
 
 
+# ---------------------------------------------------------------------------
+# client lifecycle
+# ---------------------------------------------------------------------------
+
+
+def test_context_manager_leaves_injected_client_open(mock_client: MagicMock) -> None:
+    """An injected client is shared with the caller and is not closed on exit."""
+    with VariableManager(client=mock_client):
+        pass
+
+    mock_client.close.assert_not_called()
+
+
+def test_context_manager_closes_owned_client() -> None:
+    """A client created by the manager is closed when the ``with`` block exits."""
+    with patch(
+        "terraform_var_manager.variable_manager.TerraformCloudClient"
+    ) as client_cls:
+        with VariableManager():
+            pass
+
+    client_cls.return_value.close.assert_called_once()
+
+
 # ---------------------------------------------------------------------------
 # download_variables
 # ---------------------------------------------------------------------------
 
 
-def test_download_variables_calls_get_variables_and_writes_file(
+def test_download_variables_calls_iter_variables_and_writes_file(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
-    """download_variables calls client.get_variables and writes the output file."""
-    mock_client.get_variables.return_value = [
+    """download_variables streams client.iter_variables and writes the output file."""
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-1", "my_var", "my_value"),
     ]
 
@@ -66,7 +109,7 @@ def test_download_variables_calls_get_variables_and_writes_file(
     result = manager.download_variables("ws-123", output_file=output_file)
 
     assert result is True
-    mock_client.get_variables.assert_called_once_with("ws-123")
+    mock_client.iter_variables.assert_called_once_with("ws-123", use_cache=True)
 
     written = (tmp_path / "output.tfvars").read_text()
     assert "my_var" in written
@@ -76,7 +119,7 @@ def test_download_variables_returns_false_on_api_error(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
     """download_variables returns False when the API call raises an exception."""
-    mock_client.get_variables.side_effect = Exception("API error")
+    mock_client.iter_variables.side_effect = Exception("API error")
 
     manager = VariableManager(client=mock_client)
     result = manager.download_variables("ws-123", output_file=str(tmp_path / "out.tfvars"))
@@ -88,7 +131,7 @@ def test_download_variables_writes_multiple_variables(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
     """download_variables writes all variables returned by the API."""
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-1", "alpha", "val_a"),
         _make_api_var("var-2", "beta", "val_b"),
     ]
@@ -103,6 +146,23 @@ def test_download_variables_writes_multiple_variables(
     assert "beta" in written
 
 
+def test_download_variables_to_stdout(
+    mock_client: MagicMock, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """An output file of '-' writes the tfvars to standard output."""
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-1", "alpha", "val_a", description="[app]"),
+    ]
+
+    manager = VariableManager(client=mock_client)
+    result = manager.download_variables("ws-abc", output_file="-")
+
+    assert result is True
+    assert capsys.readouterr().out == (
+        '# ========== app ==========\nalpha = "val_a" # [app]'
+    )
+
+
 # ---------------------------------------------------------------------------
 # upload_variables — skip "None" and "_SECRET" values
 # ---------------------------------------------------------------------------
@@ -115,7 +175,7 @@ def test_upload_variables_skips_none_value(
     tfvars_content = 'skip_me = "None" # [default]\n'
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
-    mock_client.get_variables.return_value = []
+    mock_client.iter_variables.return_value = []
 
     manager = VariableManager(client=mock_client)
     result = manager.upload_variables("ws-123", tfvars_file)
@@ -132,7 +192,7 @@ def test_upload_variables_skips_secret_value(
     tfvars_content = 'secret_var = "_SECRET" # [default], sensitive\n'
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
-    mock_client.get_variables.return_value = []
+    mock_client.iter_variables.return_value = []
 
     manager = VariableManager(client=mock_client)
     result = manager.upload_variables("ws-123", tfvars_file)
@@ -153,7 +213,7 @@ def test_upload_variables_skips_none_and_secret_but_uploads_others(
     )
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
-    mock_client.get_variables.return_value = []
+    mock_client.iter_variables.return_value = []
     mock_client.create_variable.return_value = {}
 
     manager = VariableManager(client=mock_client)
@@ -181,7 +241,7 @@ def test_upload_variables_calls_create_for_new_variable(
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
     # No existing variables in the workspace
-    mock_client.get_variables.return_value = []
+    mock_client.iter_variables.return_value = []
     mock_client.create_variable.return_value = {}
 
     manager = VariableManager(client=mock_client)
@@ -206,7 +266,7 @@ def test_upload_variables_calls_update_for_existing_variable(
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
     # Variable already exists with a different value
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-existing", "existing_var", "old_value"),
     ]
     mock_client.update_variable.return_value = {}
@@ -232,7 +292,7 @@ def test_upload_variables_no_update_when_value_unchanged(
     tfvars_content = 'stable_var = "same_value" # [default]\n'
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-stable", "stable_var", "same_value"),
     ]
 
@@ -254,7 +314,7 @@ def test_upload_variables_creates_and_updates_mixed(
     )
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-existing", "existing_var", "old_value"),
     ]
     mock_client.create_variable.return_value = {}
@@ -280,7 +340,7 @@ def test_upload_variables_remove_missing_deletes_absent_variables(
     tfvars_content = 'keep_me = "value" # [default]\n'
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-keep", "keep_me", "value"),
         _make_api_var("var-remove", "remove_me", "old_value"),
     ]
@@ -300,7 +360,7 @@ def test_upload_variables_remove_missing_false_does_not_delete(
     tfvars_content = 'keep_me = "value" # [default]\n'
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-keep", "keep_me", "value"),
         _make_api_var("var-extra", "extra_var", "extra_value"),
     ]
@@ -319,7 +379,7 @@ def test_upload_variables_remove_missing_deletes_multiple_absent_variables(
     tfvars_content = 'keep_me = "value" # [default]\n'
     tfvars_file = _write_tfvars(tmp_path, tfvars_content)
 
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-keep", "keep_me", "value"),
         _make_api_var("var-del-1", "delete_me_1", "v1"),
         _make_api_var("var-del-2", "delete_me_2", "v2"),
@@ -335,6 +395,479 @@ def test_upload_variables_remove_missing_deletes_multiple_absent_variables(
     assert deleted_ids == {"var-del-1", "var-del-2"}
 
 
+# ---------------------------------------------------------------------------
+# plan_upload / apply_changeset
+# ---------------------------------------------------------------------------
+
+
+def test_plan_upload_lists_changes_without_writing(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """plan_upload returns creates, updates and --remove deletes but writes nothing."""
+    tfvars_file = _write_tfvars(
+        tmp_path, 'new = "1" # [default]\nchanged = "2" # [default]\n'
+    )
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-2", "changed", "old"),
+        _make_api_var("var-3", "gone"),
+    ]
+
+    manager = VariableManager(client=mock_client)
+    changeset = manager.plan_upload("ws-123", tfvars_file, remove_missing=True)
+
+    assert changeset.workspace_id == "ws-123"
+    assert [(op.action, op.key) for op in changeset.operations] == [
+        ("create", "new"),
+        ("update", "changed"),
+        ("delete", "gone"),
+    ]
+    assert changeset.remote_digest
+    mock_client.create_variable.assert_not_called()
+    mock_client.update_variable.assert_not_called()
+    mock_client.delete_variable.assert_not_called()
+
+
+def test_saved_plan_applies_later(mock_client: MagicMock, tmp_path: Any) -> None:
+    """A changeset saved to disk applies the planned operations."""
+    tfvars_file = _write_tfvars(tmp_path, 'changed = "2" # [default]\n')
+    mock_client.iter_variables.return_value = [_make_api_var("var-2", "changed", "old")]
+    manager = VariableManager(client=mock_client)
+    manager.plan_upload("ws-123", tfvars_file).save(str(tmp_path / "plan.json"))
+
+    result = manager.apply_changeset(Changeset.load(str(tmp_path / "plan.json")))
+
+    assert result is True
+    # Both the plan and the verification list the live variables.
+    assert [call[1] for call in mock_client.iter_variables.call_args_list] == [
+        {"use_cache": False},
+        {"use_cache": False},
+    ]
+    mock_client.update_variable.assert_called_once()
+    assert mock_client.update_variable.call_args[0][1] == "var-2"
+
+
+def test_apply_changeset_refuses_a_stale_plan(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """If the workspace changed after planning, nothing is applied."""
+    tfvars_file = _write_tfvars(tmp_path, 'changed = "2" # [default]\n')
+    mock_client.iter_variables.return_value = [_make_api_var("var-2", "changed", "old")]
+    manager = VariableManager(client=mock_client)
+    changeset = manager.plan_upload("ws-123", tfvars_file)
+
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-2", "changed", "edited-in-the-ui")
+    ]
+    result = manager.apply_changeset(changeset)
+
+    assert result is False
+    mock_client.update_variable.assert_not_called()
+
+
+def test_apply_changeset_without_verify_skips_the_check(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """verify=False applies the plan without listing the workspace again."""
+    tfvars_file = _write_tfvars(tmp_path, 'changed = "2" # [default]\n')
+    mock_client.iter_variables.return_value = [_make_api_var("var-2", "changed", "old")]
+    manager = VariableManager(client=mock_client)
+    changeset = manager.plan_upload("ws-123", tfvars_file)
+    mock_client.iter_variables.reset_mock()
+
+    assert manager.apply_changeset(changeset, verify=False) is True
+    mock_client.iter_variables.assert_not_called()
+    mock_client.update_variable.assert_called_once()
+
+
+def test_apply_empty_changeset_makes_no_requests(mock_client: MagicMock) -> None:
+    """An empty plan is a successful no-op."""
+    manager = VariableManager(client=mock_client)
+
+    assert manager.apply_changeset(Changeset("ws-123", remote_digest="abc")) is True
+    mock_client.iter_variables.assert_not_called()
+
+
+def test_plan_uploads_plans_every_workspace_and_skips_failures(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Workspaces are planned concurrently; one that fails is left out."""
+    tfvars_file = _write_tfvars(tmp_path, 'region = "eu" # [default]\n')
+    variables = {f"ws-{i}": [_make_api_var("v", "region", "us")] for i in range(5)}
+    variables["ws-2"] = []
+
+    def iter_variables(workspace_id: str, *args: Any, **kwargs: Any) -> Any:
+        if workspace_id == "ws-4":
+            raise TerraformCloudError("boom")
+        return iter(variables[workspace_id])
+
+    mock_client.iter_variables.side_effect = iter_variables
+    manager = VariableManager(client=mock_client)
+    plans = manager.plan_uploads({f"ws-{i}": tfvars_file for i in range(5)})
+
+    assert sorted(plans) == ["ws-0", "ws-1", "ws-2", "ws-3"]
+    assert plans["ws-2"].counts()["create"] == 1
+    assert plans["ws-0"].counts()["update"] == 1
+
+
+def test_plans_reuse_the_parse_cache_across_managers(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """A second manager planning the same file does not parse it again."""
+    tfvars_file = _write_tfvars(tmp_path, 'region = "eu" # [default]\n')
+    mock_client.iter_variables.return_value = []
+    cache_dir = str(tmp_path / "parsed")
+
+    first = VariableManager(client=mock_client, parse_cache=ParseCache(cache_dir))
+    planned = first.plan_upload("ws-1", tfvars_file)
+    second = VariableManager(client=mock_client, parse_cache=ParseCache(cache_dir))
+    with patch("terraform_var_manager.tfvars.iter_tfvars") as parser:
+        assert second.plan_upload("ws-1", tfvars_file) == planned
+
+    parser.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# upload_to_workspaces
+# ---------------------------------------------------------------------------
+
+
+def test_upload_to_workspaces_parses_once_and_summarizes_each_workspace(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """One parse, one plan and apply per workspace, one summary per workspace."""
+    tfvars_file = _write_tfvars(tmp_path, 'region = "eu" # [default]\n')
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            "ws-new": [],
+            "ws-old": [_make_api_var("var-1", "region", "us")],
+            "ws-same": [_make_api_var("var-2", "region", "eu")],
+        }
+    )
+
+    manager = VariableManager(client=mock_client)
+    with patch.object(
+        VariableManager, "_parse_tfvars_file", wraps=VariableManager._parse_tfvars_file
+    ) as parse:
+        summaries = manager.upload_to_workspaces(
+            ["ws-new", "ws-old", "ws-same"], tfvars_file
+        )
+
+    parse.assert_called_once_with(tfvars_file, None)
+    assert list(summaries) == ["ws-new", "ws-old", "ws-same"]
+    assert summaries["ws-new"].created == ["region"]
+    assert summaries["ws-old"].updated == ["region"]
+    assert summaries["ws-same"].describe() == (
+        "ws-same: 0 created, 0 updated, 0 deleted"
+    )
+    assert all(summary.ok for summary in summaries.values())
+
+
+def test_upload_to_workspaces_runs_workspaces_concurrently(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """All workspaces are fetched at the same time, not one after the other."""
+    tfvars_file = _write_tfvars(tmp_path, 'region = "eu" # [default]\n')
+    all_started = threading.Barrier(4, timeout=5)
+
+    def fetch(workspace_id: str, **kwargs: Any) -> Any:
+        all_started.wait()  # raises BrokenBarrierError if fetched serially
+        return iter([])
+
+    mock_client.iter_variables.side_effect = fetch
+
+    manager = VariableManager(client=mock_client)
+    summaries = manager.upload_to_workspaces([f"ws-{i}" for i in range(4)], tfvars_file)
+
+    assert all(summary.created == ["region"] for summary in summaries.values())
+    assert mock_client.create_variable.call_count == 4
+
+
+def test_upload_to_workspaces_isolates_failing_workspaces(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """A workspace that cannot be read or written does not stop the others."""
+    tfvars_file = _write_tfvars(tmp_path, 'region = "eu" # [default]\n')
+
+    def fetch(workspace_id: str, **kwargs: Any) -> Any:
+        if workspace_id == "ws-missing":
+            raise TerraformCloudError("404 Not Found")
+        return iter([])
+
+    def create(workspace_id: str, payload: dict[str, Any]) -> dict[str, Any]:
+        if workspace_id == "ws-locked":
+            raise TerraformCloudError("409 Conflict")
+        return {}
+
+    mock_client.iter_variables.side_effect = fetch
+    mock_client.create_variable.side_effect = create
+
+    manager = VariableManager(client=mock_client)
+    summaries = manager.upload_to_workspaces(
+        ["ws-ok", "ws-missing", "ws-locked"], tfvars_file
+    )
+
+    assert summaries["ws-ok"].ok
+    assert summaries["ws-missing"].error == "404 Not Found"
+    assert summaries["ws-locked"].failed == {"region": "409 Conflict"}
+
+
+# ---------------------------------------------------------------------------
+# download_workspaces / download_organization
+# ---------------------------------------------------------------------------
+
+
+def test_download_workspaces_writes_one_file_per_workspace(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Each workspace lands in its own file inside the output directory."""
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            "ws-a": [_make_api_var("var-1", "region", "eu")],
+            "ws-b": [_make_api_var("var-2", "region", "us")],
+        }
+    )
+    output_dir = tmp_path / "out"
+
+    manager = VariableManager(client=mock_client)
+    summary = manager.download_workspaces(
+        {"ws-a": "a.tfvars", "ws-b": "b.tfvars"}, str(output_dir)
+    )
+
+    assert summary.ok
+    assert summary.downloaded == ["ws-a", "ws-b"]
+    assert 'region = "eu"' in (output_dir / "a.tfvars").read_text()
+    assert 'region = "us"' in (output_dir / "b.tfvars").read_text()
+    assert sorted(p.name for p in output_dir.iterdir()) == ["a.tfvars", "b.tfvars"]
+
+
+def test_download_workspaces_runs_concurrently(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """All workspaces are fetched at the same time, not one after the other."""
+    all_started = threading.Barrier(4, timeout=5)
+
+    def fetch(workspace_id: str, **kwargs: Any) -> Any:
+        all_started.wait()  # raises BrokenBarrierError if fetched serially
+        return iter([])
+
+    mock_client.iter_variables.side_effect = fetch
+
+    manager = VariableManager(client=mock_client)
+    summary = manager.download_workspaces(
+        {f"ws-{i}": f"{i}.tfvars" for i in range(4)}, str(tmp_path)
+    )
+
+    assert len(summary.downloaded) == 4
+
+
+def test_download_workspaces_resumes_by_skipping_fresh_files(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Files younger than the default max_age are kept; the rest are fetched."""
+    (tmp_path / "fresh.tfvars").write_text("kept")
+    stale = tmp_path / "stale.tfvars"
+    stale.write_text("old")
+    os.utime(stale, (0, 0))
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {"ws-stale": [], "ws-new": []}
+    )
+
+    manager = VariableManager(client=mock_client)
+    summary = manager.download_workspaces(
+        {
+            "ws-fresh": "fresh.tfvars",
+            "ws-stale": "stale.tfvars",
+            "ws-new": "new.tfvars",
+        },
+        str(tmp_path),
+    )
+
+    assert summary.skipped == ["ws-fresh"]
+    assert summary.downloaded == ["ws-stale", "ws-new"]
+    assert (tmp_path / "fresh.tfvars").read_text() == "kept"
+    assert stale.read_text() != "old"
+
+
+def test_download_workspaces_isolates_failures(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """A failing workspace is reported and leaves no file behind."""
+
+    def fetch(workspace_id: str, **kwargs: Any) -> Any:
+        if workspace_id == "ws-missing":
+            raise TerraformCloudError("404 Not Found")
+        return iter([])
+
+    mock_client.iter_variables.side_effect = fetch
+
+    manager = VariableManager(client=mock_client)
+    summary = manager.download_workspaces(
+        {"ws-ok": "ok.tfvars", "ws-missing": "missing.tfvars"}, str(tmp_path)
+    )
+
+    assert not summary.ok
+    assert summary.downloaded == ["ws-ok"]
+    assert summary.failed == {"ws-missing": "404 Not Found"}
+    assert [p.name for p in tmp_path.iterdir()] == ["ok.tfvars"]
+
+
+def test_download_organization_filters_workspaces_by_name(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Only workspaces whose name matches the glob are downloaded, by name."""
+    mock_client.iter_workspaces.return_value = iter(
+        [
+            {"id": "ws-1", "attributes": {"name": "app-prod"}},
+            {"id": "ws-2", "attributes": {"name": "app-dev"}},
+            {"id": "ws-3", "attributes": {"name": "db-prod"}},
+        ]
+    )
+    mock_client.iter_variables.side_effect = _by_workspace({"ws-1": [], "ws-3": []})
+
+    manager = VariableManager(client=mock_client)
+    summary = manager.download_organization("acme", str(tmp_path), "*-prod")
+
+    mock_client.iter_workspaces.assert_called_once_with("acme")
+    assert summary.downloaded == ["ws-1", "ws-3"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "app-prod.tfvars",
+        "db-prod.tfvars",
+    ]
+
+
+# ---------------------------------------------------------------------------
+# upload_variables — secret ledger
+# ---------------------------------------------------------------------------
+
+
+def _secret_workspace(mock_client: MagicMock) -> None:
+    """Point mock_client at a workspace holding a sensitive db_pass."""
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-1", "db_pass", None, sensitive=True, description="[db]")
+    ]
+    mock_client.update_variable.reset_mock()
+    mock_client.update_variable.side_effect = None
+
+
+def test_upload_with_ledger_skips_unchanged_secrets(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """The second upload of the same secret sends nothing."""
+    tfvars_file = _write_tfvars(tmp_path, 'db_pass = "hunter2" # [db], sensitive\n')
+    manager = VariableManager(
+        client=mock_client, ledger=FingerprintLedger(str(tmp_path / "ledger.json"))
+    )
+
+    _secret_workspace(mock_client)
+    assert manager.upload_variables("ws-123", tfvars_file) is True
+    assert mock_client.update_variable.call_count == 1
+
+    _secret_workspace(mock_client)
+    assert manager.upload_variables("ws-123", tfvars_file) is True
+    mock_client.update_variable.assert_not_called()
+
+
+def test_upload_with_ledger_sends_changed_secrets(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """A new secret value is uploaded even though the old one was recorded."""
+    ledger = FingerprintLedger(str(tmp_path / "ledger.json"))
+    manager = VariableManager(client=mock_client, ledger=ledger)
+    _secret_workspace(mock_client)
+    manager.upload_variables(
+        "ws-123", _write_tfvars(tmp_path, 'db_pass = "old" # [db], sensitive\n')
+    )
+
+    _secret_workspace(mock_client)
+    manager.upload_variables(
+        "ws-123", _write_tfvars(tmp_path, 'db_pass = "new" # [db], sensitive\n')
+    )
+
+    mock_client.update_variable.assert_called_once()
+
+
+def test_upload_force_resync_sends_unchanged_secrets(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """force_resync ignores the ledger and uploads every secret."""
+    tfvars_file = _write_tfvars(tmp_path, 'db_pass = "hunter2" # [db], sensitive\n')
+    manager = VariableManager(
+        client=mock_client, ledger=FingerprintLedger(str(tmp_path / "ledger.json"))
+    )
+    _secret_workspace(mock_client)
+    manager.upload_variables("ws-123", tfvars_file)
+
+    _secret_workspace(mock_client)
+    manager.upload_variables("ws-123", tfvars_file, force_resync=True)
+
+    mock_client.update_variable.assert_called_once()
+
+
+def test_upload_failed_secret_is_not_recorded(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """A secret whose update failed is sent again on the next upload."""
+    tfvars_file = _write_tfvars(tmp_path, 'db_pass = "hunter2" # [db], sensitive\n')
+    manager = VariableManager(
+        client=mock_client, ledger=FingerprintLedger(str(tmp_path / "ledger.json"))
+    )
+    _secret_workspace(mock_client)
+    mock_client.update_variable.side_effect = TerraformCloudError("boom")
+    assert manager.upload_variables("ws-123", tfvars_file) is False
+
+    _secret_workspace(mock_client)
+    manager.upload_variables("ws-123", tfvars_file)
+
+    mock_client.update_variable.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# upload_variables — concurrent apply
+# ---------------------------------------------------------------------------
+
+
+def test_upload_variables_with_concurrency_applies_all_operations(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """With concurrency > 1 every create, update and delete is still applied once."""
+    tfvars_content = "".join(f'new_{i} = "v{i}" # [default]\n' for i in range(10))
+    tfvars_content += 'existing_var = "new_value" # [default]\n'
+    tfvars_file = _write_tfvars(tmp_path, tfvars_content)
+
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-existing", "existing_var", "old_value"),
+        _make_api_var("var-stale", "stale_var", "old"),
+    ]
+    mock_client.delete_variable.return_value = True
+
+    manager = VariableManager(client=mock_client, concurrency=4)
+    result = manager.upload_variables("ws-123", tfvars_file, remove_missing=True)
+
+    assert result is True
+    assert mock_client.create_variable.call_count == 10
+    mock_client.update_variable.assert_called_once()
+    mock_client.delete_variable.assert_called_once_with("ws-123", "var-stale")
+
+
+def test_upload_variables_continues_after_a_failed_key(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """A failing key does not stop the other keys, but the upload reports failure."""
+    tfvars_content = (
+        'first = "1" # [default]\nsecond = "2" # [default]\nthird = "3" # [default]\n'
+    )
+    tfvars_file = _write_tfvars(tmp_path, tfvars_content)
+
+    mock_client.iter_variables.return_value = []
+    mock_client.create_variable.side_effect = [{}, Exception("API error"), {}]
+
+    manager = VariableManager(client=mock_client)
+    result = manager.upload_variables("ws-123", tfvars_file)
+
+    assert result is False
+    assert mock_client.create_variable.call_count == 3
+
+
 # ---------------------------------------------------------------------------
 # compare_workspaces
 # ---------------------------------------------------------------------------
@@ -344,10 +877,12 @@ def test_compare_workspaces_variable_in_both_workspaces(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
     """compare_workspaces produces a side-by-side diff for variables in both workspaces."""
-    mock_client.get_variables.side_effect = [
-        [_make_api_var("var-1", "shared_var", "value_ws1")],
-        [_make_api_var("var-2", "shared_var", "value_ws2")],
-    ]
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            "ws-1": [_make_api_var("var-1", "shared_var", "value_ws1")],
+            "ws-2": [_make_api_var("var-2", "shared_var", "value_ws2")],
+        }
+    )
 
     output_file = str(tmp_path / "comparison.tfvars")
     manager = VariableManager(client=mock_client)
@@ -366,10 +901,12 @@ def test_compare_workspaces_variable_only_in_first_workspace(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
     """compare_workspaces marks variables present only in workspace 1 with a placeholder."""
-    mock_client.get_variables.side_effect = [
-        [_make_api_var("var-1", "only_in_ws1", "ws1_value")],
-        [],  # workspace 2 has no variables
-    ]
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            "ws-1": [_make_api_var("var-1", "only_in_ws1", "ws1_value")],
+            "ws-2": [],
+        }
+    )
 
     output_file = str(tmp_path / "comparison.tfvars")
     manager = VariableManager(client=mock_client)
@@ -386,10 +923,12 @@ def test_compare_workspaces_variable_only_in_second_workspace(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
     """compare_workspaces marks variables present only in workspace 2 with '<undefined>'."""
-    mock_client.get_variables.side_effect = [
-        [],  # workspace 1 has no variables
-        [_make_api_var("var-2", "only_in_ws2", "ws2_value")],
-    ]
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            "ws-1": [],
+            "ws-2": [_make_api_var("var-2", "only_in_ws2", "ws2_value")],
+        }
+    )
 
     output_file = str(tmp_path / "comparison.tfvars")
     manager = VariableManager(client=mock_client)
@@ -406,10 +945,16 @@ def test_compare_workspaces_sensitive_variable_masked(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
     """compare_workspaces masks sensitive variables as '_SECRET' regardless of workspace."""
-    mock_client.get_variables.side_effect = [
-        [_make_api_var("var-1", "secret_var", "real_secret", sensitive=True)],
-        [_make_api_var("var-2", "secret_var", "another_secret", sensitive=True)],
-    ]
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            "ws-1": [
+                _make_api_var("var-1", "secret_var", "real_secret", sensitive=True)
+            ],
+            "ws-2": [
+                _make_api_var("var-2", "secret_var", "another_secret", sensitive=True)
+            ],
+        }
+    )
 
     output_file = str(tmp_path / "comparison.tfvars")
     manager = VariableManager(client=mock_client)
@@ -427,7 +972,7 @@ def test_compare_workspaces_returns_false_on_api_error(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
     """compare_workspaces returns False when the API call raises an exception."""
-    mock_client.get_variables.side_effect = Exception("API error")
+    mock_client.iter_variables.side_effect = Exception("API error")
 
     output_file = str(tmp_path / "comparison.tfvars")
     manager = VariableManager(client=mock_client)
@@ -436,22 +981,180 @@ def test_compare_workspaces_returns_false_on_api_error(
     assert result is False
 
 
-def test_compare_workspaces_calls_get_variables_for_both_workspaces(
+def test_compare_workspaces_calls_iter_variables_for_both_workspaces(
     mock_client: MagicMock, tmp_path: Any
 ) -> None:
-    """compare_workspaces calls get_variables for both workspace IDs."""
-    mock_client.get_variables.return_value = []
+    """compare_workspaces streams variables for both workspace IDs."""
+    mock_client.iter_variables.return_value = []
 
     output_file = str(tmp_path / "comparison.tfvars")
     manager = VariableManager(client=mock_client)
     manager.compare_workspaces("ws-aaa", "ws-bbb", output_file=output_file)
 
-    assert mock_client.get_variables.call_count == 2
-    call_ids = [call[0][0] for call in mock_client.get_variables.call_args_list]
+    assert mock_client.iter_variables.call_count == 2
+    call_ids = [call[0][0] for call in mock_client.iter_variables.call_args_list]
     assert "ws-aaa" in call_ids
     assert "ws-bbb" in call_ids
 
 
+def test_compare_workspaces_fetches_both_workspaces_concurrently(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Both fetches are in flight at the same time rather than one after the other."""
+    both_started = threading.Barrier(2, timeout=5)
+
+    def fetch(workspace_id: str, **kwargs: Any) -> Any:
+        both_started.wait()  # raises BrokenBarrierError if fetched serially
+        return iter([_make_api_var(f"var-{workspace_id}", "shared", workspace_id)])
+
+    mock_client.iter_variables.side_effect = fetch
+
+    output_file = str(tmp_path / "comparison.tfvars")
+    manager = VariableManager(client=mock_client)
+    result = manager.compare_workspaces("ws-1", "ws-2", output_file=output_file)
+
+    assert result is True
+    assert "ws-1 |<->| ws-2" in (tmp_path / "comparison.tfvars").read_text()
+
+
+# ---------------------------------------------------------------------------
+# compare_workspace_matrix
+# ---------------------------------------------------------------------------
+
+
+def test_compare_workspace_matrix_lists_values_per_workspace(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Each key shows one value per workspace, in the order the IDs were given."""
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            "ws-dev": [_make_api_var("v1", "region", "eu-west-1")],
+            "ws-stage": [_make_api_var("v2", "region", "eu-west-2")],
+            "ws-prod": [_make_api_var("v3", "region", "us-east-1")],
+        }
+    )
+
+    output_file = tmp_path / "matrix.tfvars"
+    manager = VariableManager(client=mock_client)
+    result = manager.compare_workspace_matrix(
+        ["ws-dev", "ws-stage", "ws-prod"], output_file=str(output_file)
+    )
+
+    assert result is True
+    written = output_file.read_text()
+    assert written.startswith("# Workspaces: ws-dev |<->| ws-stage |<->| ws-prod\n")
+    assert 'region = "eu-west-1 |<->| eu-west-2 |<->| us-east-1"' in written
+    assert mock_client.iter_variables.call_count == 3
+
+
+def test_compare_workspace_matrix_marks_missing_keys(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Missing in the first workspace is <undefined>; elsewhere <enter_new_value>."""
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            "ws-a": [_make_api_var("v1", "only_a", "x")],
+            "ws-b": [_make_api_var("v2", "only_b", "y")],
+            "ws-c": [],
+        }
+    )
+
+    output_file = tmp_path / "matrix.tfvars"
+    manager = VariableManager(client=mock_client)
+    manager.compare_workspace_matrix(["ws-a", "ws-b", "ws-c"], str(output_file))
+
+    written = output_file.read_text()
+    assert 'only_a = "x |<->| <enter_new_value> |<->| <enter_new_value>"' in written
+    assert 'only_b = "<undefined> |<->| y |<->| <enter_new_value>"' in written
+
+
+def test_compare_workspace_matrix_keep_tag_collapses_equal_values(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """keep_in_all_workspaces keys with one value everywhere show that value once."""
+    keep = "[shared], keep_in_all_workspaces"
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {
+            ws: [_make_api_var(f"v-{ws}", "account", "123", description=keep)]
+            for ws in ("ws-a", "ws-b", "ws-c")
+        }
+    )
+
+    output_file = tmp_path / "matrix.tfvars"
+    manager = VariableManager(client=mock_client)
+    manager.compare_workspace_matrix(["ws-a", "ws-b", "ws-c"], str(output_file))
+
+    matrix = output_file.read_text()
+    assert 'account = "123" # [shared], keep_in_all_workspaces' in matrix
+
+
+@pytest.mark.parametrize(
+    ("v1", "v2"),
+    [
+        (_make_api_var("a", "k", "x"), _make_api_var("b", "k", "y")),
+        (_make_api_var("a", "k", "x"), None),
+        (None, _make_api_var("b", "k", "y")),
+        (
+            _make_api_var("a", "k", "x", description="[g], keep_in_all_workspaces"),
+            _make_api_var("b", "k", "x"),
+        ),
+        (
+            _make_api_var("a", "k", "x", description="[g], keep_in_all_workspaces"),
+            None,
+        ),
+        (_make_api_var("a", "k", "x", sensitive=True), _make_api_var("b", "k", "y")),
+        (None, None),
+    ],
+)
+def test_two_way_merge_matches_n_way_merge(
+    v1: dict[str, Any] | None, v2: dict[str, Any] | None
+) -> None:
+    """The two-workspace merge is the N-way merge with N=2."""
+    assert VariableManager._merge_variable_for_comparison(
+        v1, v2, "k"
+    ) == VariableManager._merge_variables_for_comparison([v1, v2], "k")
+
+
+# ---------------------------------------------------------------------------
+# Variable sets
+# ---------------------------------------------------------------------------
+
+
+def test_upload_variables_to_a_varset(mock_client: MagicMock, tmp_path: Any) -> None:
+    """A varset ID goes through the same plan and apply as a workspace."""
+    tfvars_file = _write_tfvars(tmp_path, 'region = "eu" # [shared]\n')
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-1", "region", "us", description="[shared]")
+    ]
+
+    manager = VariableManager(client=mock_client)
+    assert manager.upload_variables("varset-1", tfvars_file)
+
+    mock_client.iter_variables.assert_called_once_with("varset-1", use_cache=False)
+    mock_client.update_variable.assert_called_once()
+    assert mock_client.update_variable.call_args[0][:2] == ("varset-1", "var-1")
+
+
+@pytest.mark.parametrize("verb", ["attach", "detach"])
+def test_attach_and_detach_varset(mock_client: MagicMock, verb: str) -> None:
+    """The whole workspace list is passed to the client in one call."""
+    manager = VariableManager(client=mock_client)
+
+    assert getattr(manager, f"{verb}_varset")("varset-1", ["ws-1", "ws-2"])
+
+    getattr(mock_client, f"{verb}_varset").assert_called_once_with(
+        "varset-1", ["ws-1", "ws-2"]
+    )
+
+
+def test_attach_varset_returns_false_on_api_error(mock_client: MagicMock) -> None:
+    mock_client.attach_varset.side_effect = TerraformCloudError("404 Not Found")
+
+    manager = VariableManager(client=mock_client)
+
+    assert not manager.attach_varset("varset-1", ["ws-1"])
+
+
 # ---------------------------------------------------------------------------
 # delete_all_variables
 # ---------------------------------------------------------------------------
@@ -461,7 +1164,7 @@ def test_delete_all_variables_calls_delete_for_each_variable(
     mock_client: MagicMock,
 ) -> None:
     """delete_all_variables calls delete_variable for every variable in the workspace."""
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-1", "alpha"),
         _make_api_var("var-2", "beta"),
         _make_api_var("var-3", "gamma"),
@@ -481,7 +1184,7 @@ def test_delete_all_variables_empty_workspace(
     mock_client: MagicMock,
 ) -> None:
     """delete_all_variables returns True and makes no delete calls for an empty workspace."""
-    mock_client.get_variables.return_value = []
+    mock_client.iter_variables.return_value = []
 
     manager = VariableManager(client=mock_client)
     result = manager.delete_all_variables("ws-empty")
@@ -493,8 +1196,8 @@ def test_delete_all_variables_empty_workspace(
 def test_delete_all_variables_returns_false_on_api_error(
     mock_client: MagicMock,
 ) -> None:
-    """delete_all_variables returns False when get_variables raises an exception."""
-    mock_client.get_variables.side_effect = Exception("API error")
+    """delete_all_variables returns False when iter_variables raises an exception."""
+    mock_client.iter_variables.side_effect = Exception("API error")
 
     manager = VariableManager(client=mock_client)
     result = manager.delete_all_variables("ws-123")
@@ -506,7 +1209,7 @@ def test_delete_all_variables_uses_correct_workspace_id(
     mock_client: MagicMock,
 ) -> None:
     """delete_all_variables passes the correct workspace ID to both get and delete calls."""
-    mock_client.get_variables.return_value = [
+    mock_client.iter_variables.return_value = [
         _make_api_var("var-x", "some_var"),
     ]
     mock_client.delete_variable.return_value = True
@@ -514,5 +1217,297 @@ def test_delete_all_variables_uses_correct_workspace_id(
     manager = VariableManager(client=mock_client)
     manager.delete_all_variables("ws-specific")
 
-    mock_client.get_variables.assert_called_once_with("ws-specific")
+    mock_client.iter_variables.assert_called_once_with("ws-specific", use_cache=False)
     mock_client.delete_variable.assert_called_once_with("ws-specific", "var-x")
+
+
+def test_delete_all_variables_returns_false_when_a_delete_fails(
+    mock_client: MagicMock,
+) -> None:
+    """A failed delete makes delete_all_variables return False, after every key."""
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-1", "alpha"),
+        _make_api_var("var-2", "beta"),
+    ]
+    mock_client.delete_variable.side_effect = [Exception("API error"), True]
+
+    manager = VariableManager(client=mock_client)
+    result = manager.delete_all_variables("ws-123")
+
+    assert result is False
+    assert mock_client.delete_variable.call_count == 2
+
+
+# ---------------------------------------------------------------------------
+# delete_variables — filters, parallelism and summary
+# ---------------------------------------------------------------------------
+
+
+def test_delete_variables_returns_summary_of_deleted_failed_and_skipped(
+    mock_client: MagicMock,
+) -> None:
+    """The summary lists deleted keys, failed keys with errors and filtered-out keys."""
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-1", "preview_a"),
+        _make_api_var("var-2", "preview_b"),
+        _make_api_var("var-3", "shared"),
+    ]
+
+    def delete(workspace_id: str, var_id: str) -> bool:
+        if var_id == "var-2":
+            raise Exception("boom")
+        return True
+
+    mock_client.delete_variable.side_effect = delete
+
+    manager = VariableManager(client=mock_client, concurrency=4)
+    summary = manager.delete_variables("ws-123", key_pattern="preview_*")
+
+    assert summary.deleted == ["preview_a"]
+    assert summary.failed == {"preview_b": "boom"}
+    assert summary.skipped == ["shared"]
+    assert summary.ok is False
+
+
+def test_delete_variables_filters_by_group(mock_client: MagicMock) -> None:
+    """group= only deletes variables tagged with that [group]."""
+    mock_client.iter_variables.return_value = [
+        _make_api_var("var-1", "db_host", description="[database]"),
+        _make_api_var("var-2", "app_name", description="[app], keep_in_all_workspaces"),
+    ]
+    mock_client.delete_variable.return_value = True
+
+    manager = VariableManager(client=mock_client)
+    summary = manager.delete_variables("ws-123", group="app")
+
+    mock_client.delete_variable.assert_called_once_with("ws-123", "var-2")
+    assert summary.skipped == ["db_host"]
+
+
+def test_delete_variables_reports_progress_for_every_key(
+    mock_client: MagicMock,
+) -> None:
+    """progress(done, total, result) is called once per delete, counting up to total."""
+    mock_client.iter_variables.return_value = [
+        _make_api_var(f"var-{i}", f"key_{i}") for i in range(6)
+    ]
+    mock_client.delete_variable.return_value = True
+    calls: list[tuple[int, int]] = []
+
+    manager = VariableManager(client=mock_client, concurrency=3)
+    manager.delete_variables(
+        "ws-123", progress=lambda done, total, result: calls.append((done, total))
+    )
+
+    assert calls == [(i, 6) for i in range(1, 7)]
+
+
+
+# ---------------------------------------------------------------------------
+# Phase profiling
+# ---------------------------------------------------------------------------
+
+
+def _phase_runs(profiler: PhaseProfiler) -> dict[str, int]:
+    return {name: stats.runs for name, stats in profiler.phases.items()}
+
+
+def test_upload_is_profiled_by_phase(mock_client: MagicMock, tmp_path: Any) -> None:
+    """An upload parses, fetches, diffs and applies; API calls land in their phase."""
+    profiler = PhaseProfiler()
+
+    def create(*args: Any) -> dict[str, Any]:
+        profiler(RequestEvent("POST", "/workspaces/{workspace_id}/vars", 201, 0.01))
+        return {}
+
+    mock_client.iter_variables.return_value = []
+    mock_client.create_variable.side_effect = create
+    tfvars_file = _write_tfvars(tmp_path, 'a = "1" # [app]\nb = "2" # [app]\n')
+
+    manager = VariableManager(client=mock_client, profiler=profiler)
+    assert manager.upload_variables("ws-1", tfvars_file)
+
+    assert _phase_runs(profiler) == {"parse": 1, "fetch": 1, "diff": 1, "apply": 1}
+    assert profiler.phases["apply"].api_calls == 2
+
+
+def test_download_compare_and_delete_are_profiled_by_phase(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    mock_client.iter_variables.side_effect = _by_workspace(
+        {"ws-1": [_make_api_var("var-1", "a")], "ws-2": [_make_api_var("var-2", "a")]}
+    )
+    mock_client.delete_variable.return_value = True
+
+    download, compare, delete = PhaseProfiler(), PhaseProfiler(), PhaseProfiler()
+    VariableManager(client=mock_client, profiler=download).download_variables(
+        "ws-1", str(tmp_path / "out.tfvars")
+    )
+    VariableManager(client=mock_client, profiler=compare).compare_workspaces(
+        "ws-1", "ws-2", str(tmp_path / "cmp.tfvars")
+    )
+    VariableManager(client=mock_client, profiler=delete).delete_all_variables("ws-1")
+
+    assert _phase_runs(download) == {"fetch": 1, "write": 1}
+    assert _phase_runs(compare) == {"fetch": 2, "diff": 1, "write": 1}
+    assert _phase_runs(delete) == {"fetch": 1, "apply": 1}
+
+
+@pytest.mark.parametrize(
+    ("concurrency", "pool_size"), [(1, 10), (4, 32), (8, 64), (16, 256)]
+)
+def test_owned_client_pool_fits_every_request_in_flight(
+    concurrency: int, pool_size: int
+) -> None:
+    """Fan-outs run max(concurrency, 8) workspaces of ``concurrency`` writes."""
+    with patch(
+        "terraform_var_manager.variable_manager.TerraformCloudClient"
+    ) as client_cls:
+        VariableManager(concurrency=concurrency)
+
+    assert client_cls.call_args[1]["pool_size"] == pool_size
+
+
+def test_profiler_is_added_to_the_hooks_of_an_owned_client() -> None:
+    profiler = PhaseProfiler()
+    hook = MagicMock()
+
+    with patch(
+        "terraform_var_manager.variable_manager.TerraformCloudClient"
+    ) as client_cls:
+        VariableManager(hooks=[hook], profiler=profiler)
+
+    assert client_cls.call_args[1]["hooks"] == [hook, profiler]
+
+
+# ---------------------------------------------------------------------------
+# Operation deadlines
+# ---------------------------------------------------------------------------
+
+
+def test_each_operation_gets_its_own_deadline(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Requests run under a new deadline during each operation, and only then.
+
+    download_organization runs download_workspaces, whose fetches happen on
+    worker threads, under its own deadline.
+    """
+    seen: list[Any] = []
+
+    def iter_variables(workspace_id: str, *args: Any, **kwargs: Any) -> Any:
+        seen.append(current_deadline())
+        return iter([_make_api_var("var-1", "a")])
+
+    mock_client.iter_variables.side_effect = iter_variables
+    mock_client.iter_workspaces.return_value = iter(
+        [
+            {"id": "ws-1", "attributes": {"name": "app-1"}},
+            {"id": "ws-2", "attributes": {"name": "app-2"}},
+        ]
+    )
+    manager = VariableManager(client=mock_client, operation_timeout=30)
+
+    manager.download_variables("ws-1", str(tmp_path / "one.tfvars"))
+    manager.download_organization("acme", str(tmp_path / "org"))
+
+    assert all(isinstance(deadline, Deadline) for deadline in seen)
+    assert seen[0] is not seen[1]
+    assert seen[1] is seen[2]
+    assert seen[1].seconds == 30
+    assert current_deadline() is None
+
+
+def test_deadline_does_not_leak_to_other_managers_of_a_shared_client(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """An operation running meanwhile on another manager keeps its own deadline."""
+    seen: dict[str, Any] = {}
+    other = VariableManager(client=mock_client)
+
+    def iter_variables(workspace_id: str, *args: Any, **kwargs: Any) -> Any:
+        seen[workspace_id] = current_deadline()
+        if workspace_id == "ws-1":
+            thread = threading.Thread(
+                target=other.download_variables,
+                args=("ws-2", str(tmp_path / "two.tfvars")),
+            )
+            thread.start()
+            thread.join()
+        return iter([_make_api_var("var-1", "a")])
+
+    mock_client.iter_variables.side_effect = iter_variables
+    manager = VariableManager(client=mock_client, operation_timeout=0.1)
+
+    manager.download_variables("ws-1", str(tmp_path / "one.tfvars"))
+
+    assert isinstance(seen["ws-1"], Deadline)
+    assert seen["ws-2"] is None
+
+
+def test_operation_timeout_must_be_positive(mock_client: MagicMock) -> None:
+    with pytest.raises(ValueError):
+        VariableManager(client=mock_client, operation_timeout=0)
+
+
+def test_upload_reports_partial_progress_at_the_deadline(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """Creates not started before the deadline are cancelled, not sent."""
+
+    def slow_create(*args: Any) -> dict[str, Any]:
+        time.sleep(0.05)
+        return {}
+
+    mock_client.iter_variables.return_value = []
+    mock_client.create_variable.side_effect = slow_create
+    content = "".join(f'key_{i} = "{i}" # [app]\n' for i in range(20))
+    tfvars_file = _write_tfvars(tmp_path, content)
+
+    manager = VariableManager(client=mock_client, operation_timeout=0.2)
+    summary = manager.upload_to_workspaces(["ws-1"], tfvars_file)["ws-1"]
+
+    assert summary.created and summary.cancelled
+    assert len(summary.created) + len(summary.cancelled) == 20
+    assert mock_client.create_variable.call_count == len(summary.created)
+    assert not summary.ok
+
+
+def test_delete_all_variables_stops_at_the_deadline(mock_client: MagicMock) -> None:
+    def slow_delete(*args: Any) -> bool:
+        time.sleep(0.05)
+        return True
+
+    mock_client.iter_variables.return_value = [
+        _make_api_var(f"var-{i}", f"key_{i}") for i in range(20)
+    ]
+    mock_client.delete_variable.side_effect = slow_delete
+
+    manager = VariableManager(client=mock_client, concurrency=2, operation_timeout=0.2)
+
+    assert manager.delete_all_variables("ws-1") is False
+    assert mock_client.delete_variable.call_count < 20
+
+
+def test_download_workspaces_lists_workspaces_cut_off_by_the_deadline(
+    mock_client: MagicMock, tmp_path: Any
+) -> None:
+    """A workspace whose fetch hit the deadline is cancelled, not failed."""
+
+    def iter_variables(workspace_id: str, *args: Any, **kwargs: Any) -> Any:
+        if workspace_id == "ws-2":
+            raise DeadlineExceeded("Operation deadline of 1s exceeded")
+        return iter([_make_api_var("var-1", "a")])
+
+    mock_client.iter_variables.side_effect = iter_variables
+
+    manager = VariableManager(client=mock_client)
+    summary = manager.download_workspaces(
+        {"ws-1": "one.tfvars", "ws-2": "two.tfvars"}, str(tmp_path)
+    )
+
+    assert summary.downloaded == ["ws-1"]
+    assert summary.cancelled == ["ws-2"]
+    assert summary.failed == {}
+    assert not summary.ok
+    assert not (tmp_path / "two.tfvars").exists()
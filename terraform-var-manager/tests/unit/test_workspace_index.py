@@ -0,0 +1,156 @@
+"""
+Unit tests for the on-disk WorkspaceIndex.
+
+Indexes live in pytest's tmp_path, so no real cache directory is touched.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from terraform_var_manager.workspace_index import WorkspaceIndex, default_index_dir
+
+HOST = "app.terraform.io"
+
+
+class FakeClock:
+    """Wall clock that only moves when told to."""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ---------------------------------------------------------------------------
+# Listings and lookups
+# ---------------------------------------------------------------------------
+
+
+def test_replace_then_lookup(tmp_path: Path) -> None:
+    """A stored listing answers lookups and is fresh."""
+    index = WorkspaceIndex(str(tmp_path))
+    index.replace(HOST, "acme", {"app": "ws-1"})
+
+    assert index.is_fresh(HOST, "acme")
+    assert index.lookup(HOST, "acme", "app") == "ws-1"
+    assert index.lookup(HOST, "acme", "other") is None
+
+
+def test_listing_is_shared_between_indexes(tmp_path: Path) -> None:
+    """A listing written by one process is used by another."""
+    WorkspaceIndex(str(tmp_path)).replace(HOST, "acme", {"app": "ws-1"})
+
+    assert WorkspaceIndex(str(tmp_path)).lookup(HOST, "acme", "app") == "ws-1"
+
+
+def test_organizations_and_hosts_are_separate(tmp_path: Path) -> None:
+    """The same name in another organization or on another host is not found."""
+    index = WorkspaceIndex(str(tmp_path))
+    index.replace(HOST, "acme", {"app": "ws-1"})
+
+    assert index.lookup(HOST, "other", "app") is None
+    assert index.lookup("tfe.example.com", "acme", "app") is None
+
+
+def test_listing_goes_stale_after_ttl(tmp_path: Path) -> None:
+    """Past its TTL a listing is stale, but its entries are still readable."""
+    clock = FakeClock()
+    index = WorkspaceIndex(str(tmp_path), ttl=60, clock=clock)
+    index.replace(HOST, "acme", {"app": "ws-1"})
+
+    clock.now += 61
+
+    assert not index.is_fresh(HOST, "acme")
+    assert index.lookup(HOST, "acme", "app") == "ws-1"
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates
+# ---------------------------------------------------------------------------
+
+
+def test_add_keeps_the_listing_and_its_age(tmp_path: Path) -> None:
+    """Adding one workspace neither drops others nor makes the listing newer."""
+    clock = FakeClock()
+    index = WorkspaceIndex(str(tmp_path), ttl=60, clock=clock)
+    index.replace(HOST, "acme", {"app": "ws-1"})
+
+    clock.now += 50
+    index.add(HOST, "acme", "new", "ws-2")
+    clock.now += 20
+
+    assert index.lookup(HOST, "acme", "app") == "ws-1"
+    assert index.lookup(HOST, "acme", "new") == "ws-2"
+    assert not index.is_fresh(HOST, "acme")
+
+
+def test_add_without_listing_is_not_fresh(tmp_path: Path) -> None:
+    """A single lookup never stands in for a full listing."""
+    index = WorkspaceIndex(str(tmp_path))
+    index.add(HOST, "acme", "app", "ws-1")
+
+    assert index.lookup(HOST, "acme", "app") == "ws-1"
+    assert not index.is_fresh(HOST, "acme")
+
+
+def test_forget_drops_one_workspace(tmp_path: Path) -> None:
+    index = WorkspaceIndex(str(tmp_path))
+    index.replace(HOST, "acme", {"app": "ws-1", "db": "ws-2"})
+
+    index.forget(HOST, "acme", "app")
+
+    assert index.lookup(HOST, "acme", "app") is None
+    assert index.lookup(HOST, "acme", "db") == "ws-2"
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+def test_unreadable_index_is_ignored(tmp_path: Path) -> None:
+    """A corrupt file behaves like a missing listing."""
+    index = WorkspaceIndex(str(tmp_path))
+    index.replace(HOST, "acme", {"app": "ws-1"})
+    for path in tmp_path.iterdir():
+        path.write_text("{not json")
+
+    assert index.lookup(HOST, "acme", "app") is None
+    assert not index.is_fresh(HOST, "acme")
+
+
+def test_files_are_private(tmp_path: Path) -> None:
+    index = WorkspaceIndex(str(tmp_path / "index"))
+    index.replace(HOST, "acme", {"app": "ws-1"})
+
+    (path,) = (tmp_path / "index").iterdir()
+    assert path.stat().st_mode & 0o077 == 0
+
+
+def test_least_recently_used_organizations_are_evicted(tmp_path: Path) -> None:
+    clock = FakeClock()
+    index = WorkspaceIndex(str(tmp_path), clock=clock, max_entries=2)
+    for organization in ("acme", "beta", "gamma"):
+        index.replace(HOST, organization, {"app": f"ws-{organization}"})
+        clock.now += 1
+
+    assert index.lookup(HOST, "acme", "app") is None
+    assert index.lookup(HOST, "gamma", "app") == "ws-gamma"
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_negative_ttl_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        WorkspaceIndex(str(tmp_path), ttl=-1)
+
+
+def test_default_dir_follows_xdg_cache_home(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """XDG_CACHE_HOME decides where the index lives by default."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert default_index_dir() == str(tmp_path / "terraform-var-manager" / "workspaces")